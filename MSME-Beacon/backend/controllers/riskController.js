@@ -1,8 +1,9 @@
 const asyncHandler = require('express-async-handler');
 const axios = require('axios');
 
-// FastAPI ML service endpoint
+// FastAPI ML service endpoints
 const ML_SERVICE_URL = 'http://localhost:8000/predict';
+const ML_HISTORY_URL = 'http://localhost:8000/history';
 
 // @desc    Get current risk score
 // @route   GET /api/risk/current
@@ -44,15 +45,27 @@ const getCurrentRisk = asyncHandler(async (req, res) => {
 // @route   GET /api/risk/history
 // @access  Private
 const getRiskHistory = asyncHandler(async (req, res) => {
-  // Mock data for frontend development
-  res.status(200).json([
-    { date: '2023-01-01', score: 65, category: 'High Risk' },
-    { date: '2023-02-01', score: 68, category: 'Moderate Risk' },
-    { date: '2023-03-01', score: 70, category: 'Moderate Risk' },
-    { date: '2023-04-01', score: 72, category: 'Moderate Risk' },
-    { date: '2023-05-01', score: 75, category: 'Moderate Risk' },
-    { date: '2023-06-01', score: 78, category: 'Low Risk' }
-  ]);
+  try {
+    // Monthly rollups of this user's recorded predictions
+    const response = await axios.get(ML_HISTORY_URL, {
+      params: { businessId: req.user._id.toString(), limit: 1 },
+      timeout: 10000,
+    });
+
+    res.status(200).json(response.data.monthly.map((month) => ({
+      date: `${month.month}-01`,
+      score: Math.round(month.avg_risk_score * 100), // Convert to percentage
+      category: month.risk_level,
+      predictions: month.predictions
+    })));
+  } catch (error) {
+    console.error('Error fetching risk history:', error.message);
+    res.status(503).json({
+      error: 'ML service is unavailable',
+      message: 'Risk history is recorded by the ML service on http://localhost:8000',
+      details: error.message
+    });
+  }
 });
 
 // @desc    Calculate new risk score
@@ -151,7 +164,8 @@ const getRiskTrends = asyncHandler(async (req, res) => {
 // @access  Private
 const predictRisk = asyncHandler(async (req, res) => {
   try {
-    const businessData = req.body;
+    // Tag the prediction with the user so the ML service records it in their history
+    const businessData = req.user ? { ...req.body, businessId: req.user._id.toString() } : req.body;
     
     console.log('Sending data to ML service:', businessData);
     console.log('ML Service URL:', ML_SERVICE_URL);
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Training Pipeline Benchmark
+===========================
+
+Times and memory-profiles the stages of ``SophisticatedMSMEPredictor`` on
+synthetic Lending-Club-shaped data (``synthetic_data.py``), at 10k, 1M
+and 10M accepted rows, so scaling can be measured without the real files.
+
+Stages: ``load`` (reading and parsing both CSVs, including the rejected
+reservoir), ``engineer`` (derived features, appending the rejected
+sample), ``preprocess``, ``resample``, ``train`` and ``evaluate``. They run
+through the training code's ``StagePipeline`` with the ``MemoryProfiler``
+(peak RSS, and tracemalloc top allocators with ``--trace-allocations``,
+which slows the run) and the ``ResourceScheduler`` (CPU utilization) as
+monitors, exactly as in a training run. Distillation, calibration, saving
+and plots are not benchmarked.
+
+Each size writes ``benchmark_<size>_<timestamp>.json`` (per-stage seconds,
+memory, CPU, test metrics and the generator manifest) to ``--report-dir``.
+Generated data is cached in ``--data-dir`` and reused across runs.
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from synthetic_data import SIZES, generate_dataset, parse_rows
+from training_memory import MemoryBudget, MemoryProfiler
+from training_checkpoints import StagePipeline
+from xgboost_train import ACCEPTED_FEATURES, SophisticatedMSMEPredictor
+
+BENCHMARK_STAGES = ['load', 'engineer', 'preprocess', 'resample', 'train', 'evaluate']
+BENCHMARK_DEPENDENCIES = {stage: BENCHMARK_STAGES[i - 1:i] for i, stage in enumerate(BENCHMARK_STAGES)}
+
+
+def size_label(rows: int) -> str:
+    return next((name for name, n in SIZES.items() if n == rows), str(rows))
+
+
+def benchmark_predictor(predictor: SophisticatedMSMEPredictor, accepted_path: str,
+                        rejected_path: str, trace_allocations: bool = False) -> Dict[str, Any]:
+    """Run the benchmark stages once; returns per-stage timings, memory, CPU and test metrics"""
+    if predictor.memory_budget_gb:
+        predictor.memory_plan = MemoryBudget(predictor.memory_budget_gb).plan_for_csv(
+            accepted_path, len(ACCEPTED_FEATURES))
+        predictor.compact_dtypes = predictor.compact_dtypes or predictor.memory_plan['downcast_float32']
+    predictor.scheduler.apply_env_limits()
+    profiler = MemoryProfiler(trace_allocations=trace_allocations)
+    pipeline = StagePipeline(BENCHMARK_STAGES, BENCHMARK_DEPENDENCIES, profiler=profiler,
+                             monitors=[predictor.scheduler])
+
+    def load():
+        loaded = predictor.load_datasets(accepted_path, rejected_path)
+        if loaded is None:
+            raise RuntimeError(f"Failed to load {accepted_path}")
+        return {'accepted': loaded[0], 'rejected': loaded[1]}
+
+    # Frames nothing reads again are dropped as soon as they are used, so they
+    # do not inflate the peak memory of later stages
+    def engineer():
+        loaded = pipeline.outputs.pop('load')
+        return {'df': predictor.engineer_features(loaded['accepted'], loaded['rejected'])}
+
+    def preprocess():
+        df = pipeline.outputs.pop('engineer')['df']
+        X, y = predictor.advanced_preprocessing(df)
+        return {'X': X, 'y': y, 'rows': len(df), 'columns': df.shape[1]}
+
+    def resample():
+        X, y = predictor.handle_class_imbalance(pipeline.get('preprocess', 'X'), pipeline.get('preprocess', 'y'))
+        return {'X': X, 'y': y}
+
+    def train():
+        predictor.train_ensemble_models(pipeline.get('resample', 'X'), pipeline.get('resample', 'y'))
+        return {}
+
+    def evaluate():
+        return {'metrics': predictor.comprehensive_evaluation()}
+
+    for stage, func in zip(BENCHMARK_STAGES, [load, engineer, preprocess, resample, train, evaluate]):
+        pipeline.run(stage, func)
+
+    y = pipeline.get('preprocess', 'y')
+    memory = {record['stage']: record for record in profiler.report()['stages']}
+    cpu = predictor.scheduler.report()
+    return {
+        'stages': [{**memory[stage], 'seconds': round(pipeline.timings[stage], 3)}
+                   for stage in BENCHMARK_STAGES],
+        'total_seconds': round(sum(pipeline.timings.values()), 3),
+        'peak_rss_mb': profiler.report()['peak_rss_mb'],
+        'engineered_rows': pipeline.get('preprocess', 'rows'),
+        'engineered_columns': pipeline.get('preprocess', 'columns'),
+        'failure_rate': float(y.mean()),
+        'resampled_rows': len(pipeline.get('resample', 'y')),
+        'parse_report': predictor.parse_report,
+        'memory_plan': predictor.memory_plan,
+        'cpu': cpu,
+        'test_metrics': pipeline.get('evaluate', 'metrics'),
+    }
+
+
+def run_benchmark(rows: int, data_dir: str = 'benchmark_data', report_dir: str = 'benchmark_reports',
+                  seed: int = 42, rejected_ratio: float = 1.0, trace_allocations: bool = False,
+                  predictor_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Generate (or reuse) the data for one size, benchmark it and write the JSON report"""
+    label = size_label(rows)
+    print(f"\n📏 BENCHMARK: {label} accepted rows")
+    print("=" * 80)
+    dataset = generate_dataset(os.path.join(data_dir, label), rows, seed=seed, rejected_ratio=rejected_ratio)
+    predictor = SophisticatedMSMEPredictor(models_dir=os.path.join(report_dir, 'models'), metrics_only=True,
+                                           **(predictor_options or {}))
+    start = time.time()
+    results = benchmark_predictor(predictor, dataset['accepted_path'], dataset['rejected_path'],
+                                  trace_allocations=trace_allocations)
+    report = {'size': label, 'rows': rows, 'started': datetime.fromtimestamp(start).isoformat(),
+              'dataset': dataset, 'options': predictor_options or {}, **results}
+
+    os.makedirs(report_dir, exist_ok=True)
+    path = os.path.join(report_dir, f"benchmark_{label}_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\n⏱️ {label}: {report['total_seconds']:,.1f}s, peak RSS {report['peak_rss_mb']:,.0f} MB")
+    for stage in report['stages']:
+        print(f"   {stage['stage']:<11} {stage['seconds']:>9,.1f}s  {stage['peak_rss_mb']:>9,.0f} MB")
+    print(f"   📝 Benchmark report written to {path}")
+    return report
+
+
+def summary_table(reports: List[Dict[str, Any]]) -> str:
+    """Seconds per stage (rows) and size (columns)"""
+    header = f"{'stage':<11}" + ''.join(f"{report['size']:>12}" for report in reports)
+    lines = [header]
+    for i, stage in enumerate(BENCHMARK_STAGES):
+        lines.append(f"{stage:<11}" + ''.join(f"{report['stages'][i]['seconds']:>11,.1f}s" for report in reports))
+    lines.append(f"{'total':<11}" + ''.join(f"{report['total_seconds']:>11,.1f}s" for report in reports))
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and memory-profile the training stages on synthetic data")
+    parser.add_argument('--rows', type=parse_rows, nargs='+', default=[SIZES['10k']],
+                        help=f"accepted rows per run: {', '.join(SIZES)} or integers")
+    parser.add_argument('--data-dir', default='benchmark_data', help="where generated CSVs are cached")
+    parser.add_argument('--report-dir', default='benchmark_reports', help="where JSON reports are written")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--rejected-ratio', type=float, default=1.0,
+                        help="rejected rows per accepted row in the generated data")
+    parser.add_argument('--trace-allocations', action='store_true',
+                        help="record tracemalloc top allocators per stage (slows every stage)")
+    parser.add_argument('--memory-budget-gb', type=float,
+                        help="benchmark with the training memory budget (chunked reads, float32, row sampling)")
+    parser.add_argument('--compact-dtypes', action='store_true',
+                        help="int8 flags, float32 ratios and float32 model matrices")
+    parser.add_argument('--cpu-cores', type=int, help="core budget for the searches and estimators")
+    args = parser.parse_args()
+
+    options = {'memory_budget_gb': args.memory_budget_gb, 'compact_dtypes': args.compact_dtypes,
+               'cpu_cores': args.cpu_cores}
+    reports = [run_benchmark(rows, args.data_dir, args.report_dir, seed=args.seed,
+                             rejected_ratio=args.rejected_ratio, trace_allocations=args.trace_allocations,
+                             predictor_options=options)
+               for rows in args.rows]
+    print("\n📊 BENCHMARK SUMMARY (seconds)")
+    print(summary_table(reports))
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Binned-Feature Tree Inference
+=============================
+
+Tree ensembles only ever compare a feature against split thresholds, so
+two values that fall between the same pair of thresholds take the same
+path through every tree. ``BinnedTrees`` exports the split thresholds of
+the trained XGBoost, LightGBM and Random Forest members as sorted
+per-feature bin edges, and scores a batch by:
+
+1. binning it once with ``np.searchsorted`` into a ``uint8`` matrix
+   (``uint16`` when a feature has more than 254 edges; NaN gets the top
+   code of the dtype),
+2. traversing every tree of every member on bin-index comparisons over
+   flat node tables, all rows and trees of a chunk at once, and
+3. summing the leaves and applying each member's link exactly as the
+   library does (float32 for XGBoost, float64 for LightGBM and the
+   forest), then combining the members like ``PrefitVotingEnsemble``.
+
+Each library's own comparison (``x < t`` on float32 for XGBoost,
+``x <= t`` on float64 for LightGBM, ``x <= t`` on float32 for the forest)
+is converted into an exact ``x <= edge`` on float64, so the binned
+predictions equal the library predictions. Missing values follow each
+node's default direction. LightGBM categorical and zero-as-missing splits
+are not supported.
+"""
+
+import json
+import math
+import pickle
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from distillation import _ms_per_10k
+from ensembles import _log_odds
+
+BIN_DTYPES = (np.uint8, np.uint16, np.uint32)
+
+# Rows per traversal chunk: rows x trees node indices stay cache resident
+CHUNK_ROWS = 2048
+
+
+def _float32_le_edge(t32: np.ndarray) -> np.ndarray:
+    """Largest float64 ``e`` with ``float32(x) <= t32`` exactly when ``x <= e`` (round to nearest even)"""
+    t32 = np.asarray(t32, dtype=np.float32)
+    above = np.nextafter(t32, np.float32(np.inf))
+    midpoint = (t32.astype(np.float64) + above.astype(np.float64)) / 2
+    ties_down = (t32.view(np.uint32) & 1) == 0
+    edge = np.where(ties_down, midpoint, np.nextafter(midpoint, -np.inf))
+    return np.where(np.isfinite(above), edge, np.inf)
+
+
+def _float32_floor(t: np.ndarray) -> np.ndarray:
+    """Largest float32 not above each float64 ``t``"""
+    t32 = np.asarray(t, dtype=np.float64).astype(np.float32)
+    return np.where(t32.astype(np.float64) > t, np.nextafter(t32, np.float32(-np.inf)), t32)
+
+
+class TreeMember:
+    """
+    Flat node table of one tree model.
+
+    Node ``i`` sends a row left when ``x[feature[i]] <= edge[i]`` (or, for
+    NaN, when ``nan_left[i]``). Leaves have ``feature == -1`` and their
+    output in ``value``.
+    """
+
+    def __init__(self, kind: str, feature: np.ndarray, edge: np.ndarray, nan_left: np.ndarray,
+                 left: np.ndarray, right: np.ndarray, value: np.ndarray, roots: np.ndarray,
+                 base: float = 0.0, scale: float = 1.0):
+        self.kind = kind
+        self.feature = feature.astype(np.int32)
+        self.edge = edge.astype(np.float64)
+        self.nan_left = nan_left.astype(bool)
+        self.left = left.astype(np.int32)
+        self.right = right.astype(np.int32)
+        self.value = value
+        self.roots = roots.astype(np.int64)
+        self.base = base
+        self.scale = scale
+        self.depth = _max_depth(self.left, self.right, self.roots)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def link(self, leaf_sums: np.ndarray) -> np.ndarray:
+        """Positive-class probability from the summed leaf outputs"""
+        if self.kind == 'xgboost':
+            return np.float32(1) / (np.float32(1) + np.exp(-leaf_sums.astype(np.float64)).astype(np.float32))
+        if self.kind == 'lightgbm':
+            return 1.0 / (1.0 + np.exp(-self.scale * leaf_sums))
+        return leaf_sums / self.n_trees
+
+
+def _max_depth(left: np.ndarray, right: np.ndarray, roots: np.ndarray) -> int:
+    depth, level = 0, roots
+    while True:
+        level = level[left[level] >= 0]
+        if not len(level):
+            return depth
+        level = np.concatenate([left[level], right[level]])
+        depth += 1
+
+
+def _concat_trees(kind: str, trees: List[Dict[str, np.ndarray]], value_dtype: Any, **link) -> TreeMember:
+    """One node table from per-tree arrays with tree-local child indices"""
+    offsets = np.cumsum([0] + [len(tree['feature']) for tree in trees])
+    columns = {}
+    for name in ('feature', 'edge', 'nan_left', 'value'):
+        columns[name] = np.concatenate([tree[name] for tree in trees])
+    for name in ('left', 'right'):
+        columns[name] = np.concatenate([np.where(tree[name] >= 0, tree[name] + offset, -1)
+                                        for tree, offset in zip(trees, offsets)])
+    columns['value'] = columns['value'].astype(value_dtype)
+    return TreeMember(kind, roots=offsets[:-1], **columns, **link)
+
+
+def export_xgboost(model: Any) -> TreeMember:
+    """Node table of a binary ``XGBClassifier`` (``gbtree`` booster)"""
+    booster = model.get_booster()
+    config = json.loads(booster.save_config())
+    learner = config['learner']
+    if learner['gradient_booster']['name'] != 'gbtree' or learner['objective']['name'] != 'binary:logistic':
+        raise ValueError("Only binary:logistic gbtree XGBoost models can be binned")
+    base_score = np.float32(float(learner['learner_model_param']['base_score'].strip('[]')))
+    # logf rounding: the log in float64, then rounded once
+    base_margin = np.float32(-math.log(float(np.float32(1) / base_score - np.float32(1))))
+
+    trees_json = json.loads(booster.save_raw('json'))['learner']['gradient_booster']['model']['trees']
+    best_iteration = getattr(model, 'best_iteration', None)
+    if best_iteration is not None:
+        trees_json = trees_json[:best_iteration + 1]
+    trees = []
+    for tree in trees_json:
+        left = np.asarray(tree['left_children'])
+        leaf = left < 0
+        split = np.asarray(tree['split_conditions'], dtype=np.float32)
+        # x < t on float32 is x <= (the float32 below t)
+        edge = _float32_le_edge(np.nextafter(split, np.float32(-np.inf)))
+        trees.append({
+            'feature': np.where(leaf, -1, np.asarray(tree['split_indices'])),
+            'edge': np.where(leaf, np.inf, edge),
+            'nan_left': np.asarray(tree['default_left'], dtype=bool),
+            'left': left,
+            'right': np.asarray(tree['right_children']),
+            'value': np.where(leaf, split, 0),
+        })
+    return _concat_trees('xgboost', trees, np.float32, base=base_margin)
+
+
+def export_lightgbm(model: Any) -> TreeMember:
+    """Node table of a binary ``LGBMClassifier``"""
+    booster = getattr(model, 'booster_', model)
+    best_iteration = booster.best_iteration if booster.best_iteration > 0 else None
+    dump = booster.dump_model(num_iteration=best_iteration)
+    objective = dump['objective'].split()
+    if objective[0] != 'binary':
+        raise ValueError(f"Only binary LightGBM models can be binned, not {dump['objective']}")
+    scale = float(next((part.split(':')[1] for part in objective if part.startswith('sigmoid:')), 1.0))
+
+    trees = []
+    for info in dump['tree_info']:
+        nodes = {name: [] for name in ('feature', 'edge', 'nan_left', 'left', 'right', 'value')}
+
+        def add(node: Dict[str, Any]) -> int:
+            index = len(nodes['feature'])
+            for column in nodes.values():
+                column.append(None)
+            if 'leaf_value' in node:
+                nodes['feature'][index], nodes['edge'][index], nodes['nan_left'][index] = -1, np.inf, False
+                nodes['left'][index] = nodes['right'][index] = -1
+                nodes['value'][index] = node['leaf_value']
+                return index
+            if node['decision_type'] != '<=' or node['missing_type'] == 'Zero':
+                raise ValueError("LightGBM categorical and zero-as-missing splits cannot be binned")
+            threshold = float(node['threshold'])
+            nodes['feature'][index] = node['split_feature']
+            nodes['edge'][index] = threshold
+            # Without NaN handling, LightGBM reads NaN as 0
+            nodes['nan_left'][index] = (node['default_left'] if node['missing_type'] == 'NaN'
+                                        else 0.0 <= threshold)
+            nodes['value'][index] = 0.0
+            nodes['left'][index] = add(node['left_child'])
+            nodes['right'][index] = add(node['right_child'])
+            return index
+
+        add(info['tree_structure'])
+        trees.append({name: np.asarray(column) for name, column in nodes.items()})
+    return _concat_trees('lightgbm', trees, np.float64, scale=scale)
+
+
+def export_forest(model: Any) -> TreeMember:
+    """Node table of a binary ``RandomForestClassifier``"""
+    trees = []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        leaf = tree.children_left < 0
+        value = tree.value[:, 0, :]
+        missing_left = getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=np.uint8))
+        trees.append({
+            'feature': np.where(leaf, -1, tree.feature),
+            # sklearn compares float32(x) <= t
+            'edge': np.where(leaf, np.inf, _float32_le_edge(_float32_floor(tree.threshold))),
+            'nan_left': missing_left.astype(bool),
+            'left': tree.children_left,
+            'right': tree.children_right,
+            'value': np.where(leaf, value[:, 1] / value.sum(axis=1), 0.0),
+        })
+    return _concat_trees('forest', trees, np.float64)
+
+
+def export_member(model: Any) -> TreeMember:
+    if hasattr(model, 'get_booster'):
+        return export_xgboost(model)
+    if hasattr(model, 'booster_'):
+        return export_lightgbm(model)
+    if hasattr(model, 'estimators_') and hasattr(model.estimators_[0], 'tree_'):
+        return export_forest(model)
+    raise ValueError(f"Cannot bin a {type(model).__name__}")
+
+
+class BinnedTrees:
+    """A tree model or voting ensemble scored on pre-binned features"""
+
+    def __init__(self, members: List[TreeMember], n_features: int, weights: Optional[Sequence[float]] = None,
+                 meta_learner: Any = None):
+        self.members = members
+        self.n_features = n_features
+        self.weights = weights
+        self.meta_learner = meta_learner
+        self.classes_ = np.array([0, 1])
+
+        edges = {f: [] for f in range(n_features)}
+        for member in members:
+            split = member.feature >= 0
+            for f in range(n_features):
+                edges[f].append(member.edge[split & (member.feature == f)])
+        self.edges = [np.unique(np.concatenate(edges[f])) for f in range(n_features)]
+        widest = max((len(e) for e in self.edges), default=0)
+        self.bin_dtype = next(dtype for dtype in BIN_DTYPES if widest < np.iinfo(dtype).max)
+        self.nan_bin = np.iinfo(self.bin_dtype).max
+        self.tables = [self._table(member) for member in members]
+
+    @classmethod
+    def from_model(cls, model: Any, n_features: Optional[int] = None) -> 'BinnedTrees':
+        """Export the split thresholds of a tree model or a ``PrefitVotingEnsemble`` of them"""
+        members = model.estimators_ if hasattr(model, 'combine') else [model]
+        n_features = n_features or max(member.n_features_in_ for member in members)
+        if hasattr(model, 'combine'):
+            return cls([export_member(member) for member in model.estimators_], n_features,
+                       model.weights, model.meta_learner_)
+        return cls([export_member(model)], n_features)
+
+    def _table(self, member: TreeMember) -> Dict[str, np.ndarray]:
+        """
+        Traversal arrays: ``threshold`` is the bin index of each node's edge
+        and ``children[2 * i + go_right]`` the next node (leaves loop on themselves)
+        """
+        leaf = member.feature < 0
+        threshold = np.zeros(len(leaf), dtype=self.bin_dtype)
+        for f in range(self.n_features):
+            nodes = member.feature == f
+            threshold[nodes] = np.searchsorted(self.edges[f], member.edge[nodes])
+        index = np.arange(len(leaf))
+        children = np.empty(2 * len(leaf), dtype=np.int32)
+        children[0::2] = np.where(leaf, index, member.left)
+        children[1::2] = np.where(leaf, index, member.right)
+        return {
+            'feature': np.where(leaf, 0, member.feature).astype(np.int32),
+            'threshold': np.where(leaf, self.nan_bin, threshold).astype(self.bin_dtype),
+            'nan_right': (~member.nan_left & ~leaf).astype(np.int32),
+            'children': children,
+        }
+
+    def bin(self, X: np.ndarray) -> np.ndarray:
+        """Bin index of every value: the number of the feature's edges below it"""
+        X = np.asarray(X, dtype=np.float64)
+        bins = np.empty(X.shape, dtype=self.bin_dtype)
+        for f, edges in enumerate(self.edges):
+            bins[:, f] = np.searchsorted(edges, X[:, f])
+            bins[np.isnan(X[:, f]), f] = self.nan_bin
+        return bins
+
+    def _leaves(self, member: TreeMember, table: Dict[str, np.ndarray], bins: np.ndarray,
+                has_nan: bool) -> np.ndarray:
+        """Leaf node reached in every tree, shape (rows, trees)"""
+        n_rows, n_features = bins.shape
+        node = np.broadcast_to(member.roots, (n_rows, member.n_trees)).copy()
+        row_offset = (np.arange(n_rows, dtype=np.int64) * n_features)[:, None]
+        flat_bins = bins.ravel()
+        feature, threshold, children = table['feature'], table['threshold'], table['children']
+        for _ in range(member.depth):
+            b = flat_bins[row_offset + feature[node]]
+            go_right = b > threshold[node]
+            if has_nan:
+                missing = b == self.nan_bin
+                go_right = np.where(missing, table['nan_right'][node].astype(bool), go_right)
+            node = children[2 * node + go_right]
+        return node
+
+    def member_probabilities(self, bins: np.ndarray) -> np.ndarray:
+        """Positive-class probability of every member, shape (n_samples, n_members)"""
+        has_nan = bool((bins == self.nan_bin).any())
+        proba = np.empty((len(bins), len(self.members)))
+        for m, (member, table) in enumerate(zip(self.members, self.tables)):
+            for start in range(0, len(bins), CHUNK_ROWS):
+                chunk = bins[start:start + CHUNK_ROWS]
+                values = member.value[self._leaves(member, table, chunk, has_nan)]
+                if member.kind == 'xgboost':
+                    values = np.concatenate([np.full((len(chunk), 1), member.base, dtype=np.float32), values],
+                                            axis=1)
+                # cumsum adds the trees in order, like the libraries
+                proba[start:start + CHUNK_ROWS, m] = member.link(np.cumsum(values, axis=1)[:, -1])
+        return proba
+
+    def combine(self, member_proba: np.ndarray) -> np.ndarray:
+        if self.meta_learner is not None:
+            return self.meta_learner.predict_proba(_log_odds(member_proba))[:, 1]
+        if len(self.members) == 1:
+            return member_proba[:, 0]
+        weights = np.ones(member_proba.shape[1]) if self.weights is None else np.asarray(self.weights)
+        return member_proba @ (weights / weights.sum())
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        positive = self.combine(self.member_probabilities(self.bin(X)))
+        return np.column_stack([1 - positive, positive])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[(self.predict_proba(X)[:, 1] > 0.5).astype(int)]
+
+
+def binned_report(model: Any, binned: BinnedTrees, X_test: np.ndarray, latency_rows: int = 20_000) -> Dict[str, Any]:
+    """Agreement, latency and input size of the binned path against the library predictions"""
+    X_latency = X_test[:latency_rows]
+    native_proba = model.predict_proba(X_latency)[:, 1]
+    binned_proba = binned.predict_proba(X_latency)[:, 1]
+    bins = binned.bin(X_latency)
+    native_ms = _ms_per_10k(model.predict_proba, X_latency)
+    binned_ms = _ms_per_10k(binned.predict_proba, X_latency)
+    return {
+        'bin_dtype': np.dtype(binned.bin_dtype).name,
+        'edges_per_feature': [len(edges) for edges in binned.edges],
+        'identical_fraction': float(np.mean(binned_proba == native_proba)),
+        'max_abs_diff': float(np.abs(binned_proba - native_proba).max()) if len(X_latency) else 0.0,
+        'native_ms_per_10k': native_ms,
+        'binned_ms_per_10k': binned_ms,
+        'speedup': native_ms / max(binned_ms, 1e-9),
+        'input_bytes_per_row': np.asarray(X_latency, dtype=np.float64).itemsize * X_latency.shape[1],
+        'binned_bytes_per_row': bins.itemsize * bins.shape[1],
+        'binned_model_bytes': len(pickle.dumps(binned)),
+    }
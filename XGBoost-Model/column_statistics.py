@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Single-Pass Column Statistics for MSME Preprocessing
+====================================================
+
+Fused statistics engine used by ``advanced_preprocessing``. One streaming
+pass over the feature frame collects, for every column at once:
+
+- null counts
+- running moments (mean, variance, skewness) merged chunk by chunk
+- approximate quantiles from a shared bottom-k row sample
+- min/max (constant-feature detection)
+- category counts and a HyperLogLog cardinality sketch for categoricals
+
+The fitted object is saved with the model artifacts so serving can apply
+exactly the same imputation values used during training.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class HyperLogLog:
+    """Mergeable HyperLogLog distinct-count sketch over pandas values"""
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values: pd.Series):
+        """Add a batch of (non-null) values to the sketch"""
+        if len(values) == 0:
+            return
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy(np.uint64)
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << (64 - p)) - 1)
+        # frexp gives the exact bit length for integers below 2**53
+        _, bit_length = np.frexp(remainder.astype(np.float64))
+        rank = ((64 - p) - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: 'HyperLogLog'):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros > 0:
+            return m * np.log(m / zeros)  # linear counting for small cardinalities
+        return float(raw)
+
+
+class ColumnStatistics:
+    """
+    Streaming per-column statistics for imputation and feature pruning.
+
+    Numeric columns are processed as one float64 block per chunk, so every
+    statistic for every column comes out of a single scan of the data.
+    """
+
+    def __init__(self, chunk_size: int = 1_000_000, quantile_sample_size: int = 100_000,
+                 max_tracked_categories: int = 10_000, random_state: int = 42):
+        self.chunk_size = chunk_size
+        self.quantile_sample_size = quantile_sample_size
+        self.max_tracked_categories = max_tracked_categories
+        self.random_state = random_state
+
+        self.numerical_columns: List[str] = []
+        self.categorical_columns: List[str] = []
+        self.n_rows = 0
+
+        # Numeric accumulators (one entry per numerical column)
+        self.null_counts: Dict[str, int] = {}
+        self._count = None
+        self._mean = None
+        self._m2 = None
+        self._m3 = None
+        self._min = None
+        self._max = None
+        self._sample_keys = None
+        self._sample_values = None
+
+        # Categorical accumulators
+        self.category_counts: Dict[str, pd.Series] = {}
+        self.counts_truncated: Dict[str, bool] = {}
+        self.cardinality_sketches: Dict[str, HyperLogLog] = {}
+
+        self._rng = np.random.default_rng(random_state)
+
+    # ------------------------------------------------------------------
+    # Fitting
+    # ------------------------------------------------------------------
+    def fit(self, X: pd.DataFrame) -> 'ColumnStatistics':
+        """Collect all statistics in one chunked pass over ``X``"""
+        return self.update(X)
+
+    def update(self, X: pd.DataFrame) -> 'ColumnStatistics':
+        """Fold new rows into already fitted statistics (schema is kept from the first fit)"""
+        if self.numerical_columns or self.categorical_columns:
+            X = X.reindex(columns=self.numerical_columns + self.categorical_columns)
+        for start in range(0, max(len(X), 1), self.chunk_size):
+            self.partial_fit(X.iloc[start:start + self.chunk_size])
+        return self
+
+    def partial_fit(self, chunk: pd.DataFrame) -> 'ColumnStatistics':
+        """Fold one chunk of rows into the running statistics"""
+        if self._count is None:
+            self._initialize(chunk)
+
+        self.n_rows += len(chunk)
+        if self.numerical_columns:
+            self._update_numeric(chunk[self.numerical_columns]
+                                 .to_numpy(dtype=np.float64, na_value=np.nan))
+        for col in self.categorical_columns:
+            self._update_categorical(col, chunk[col])
+        return self
+
+    def _initialize(self, chunk: pd.DataFrame):
+        self.numerical_columns = chunk.select_dtypes(include=[np.number]).columns.tolist()
+        self.categorical_columns = chunk.select_dtypes(include=['object', 'category']).columns.tolist()
+
+        n_num = len(self.numerical_columns)
+        self._count = np.zeros(n_num, dtype=np.int64)
+        self._mean = np.zeros(n_num)
+        self._m2 = np.zeros(n_num)
+        self._m3 = np.zeros(n_num)
+        self._min = np.full(n_num, np.inf)
+        self._max = np.full(n_num, -np.inf)
+        self._sample_keys = np.empty(0)
+        self._sample_values = np.empty((0, n_num))
+
+        for col in self.numerical_columns + self.categorical_columns:
+            self.null_counts[col] = 0
+        for col in self.categorical_columns:
+            self.category_counts[col] = pd.Series(dtype=np.int64)
+            self.counts_truncated[col] = False
+            self.cardinality_sketches[col] = HyperLogLog()
+
+    def _update_numeric(self, values: np.ndarray):
+        missing = np.isnan(values)
+        n_b = (~missing).sum(axis=0)
+        for col, nulls in zip(self.numerical_columns, missing.sum(axis=0)):
+            self.null_counts[col] += int(nulls)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_b = np.where(n_b > 0, np.nansum(values, axis=0) / np.maximum(n_b, 1), 0.0)
+            dev = np.where(missing, 0.0, values - mean_b)
+            m2_b = np.sum(dev ** 2, axis=0)
+            m3_b = np.sum(dev ** 3, axis=0)
+            if len(values):
+                self._min = np.fmin(self._min, np.nanmin(np.where(missing, np.inf, values), axis=0))
+                self._max = np.fmax(self._max, np.nanmax(np.where(missing, -np.inf, values), axis=0))
+
+        self._merge_moments(n_b, mean_b, m2_b, m3_b)
+        self._update_sample(self._rng.random(len(values)), values)
+
+    def _merge_moments(self, n_b, mean_b, m2_b, m3_b):
+        """Combine central moments of two partitions (Chan / Pebay update)"""
+        n_a, mean_a, m2_a, m3_a = self._count, self._mean, self._m2, self._m3
+        n = n_a + n_b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            safe_n = np.maximum(n, 1).astype(np.float64)
+            delta = mean_b - mean_a
+            mean = mean_a + delta * n_b / safe_n
+            m2 = m2_a + m2_b + delta ** 2 * n_a * n_b / safe_n
+            m3 = (m3_a + m3_b
+                  + delta ** 3 * n_a * n_b * (n_a - n_b) / safe_n ** 2
+                  + 3 * delta * (n_a * m2_b - n_b * m2_a) / safe_n)
+        self._count = n
+        self._mean = np.where(n > 0, mean, 0.0)
+        self._m2 = np.where(n > 0, m2, 0.0)
+        self._m3 = np.where(n > 0, m3, 0.0)
+
+    def _update_sample(self, keys: np.ndarray, values: np.ndarray):
+        """Bottom-k row sampling: keep the rows with the smallest random keys"""
+        keys = np.concatenate([self._sample_keys, keys])
+        values = np.concatenate([self._sample_values, values])
+        if len(keys) > self.quantile_sample_size:
+            keep = np.argpartition(keys, self.quantile_sample_size)[:self.quantile_sample_size]
+            keys, values = keys[keep], values[keep]
+        self._sample_keys, self._sample_values = keys, values
+
+    def _update_categorical(self, col: str, values: pd.Series):
+        self.null_counts[col] += int(values.isna().sum())
+        present = values.dropna()
+        if isinstance(present.dtype, pd.CategoricalDtype):
+            present = present.astype(present.cat.categories.dtype)
+
+        counts = present.value_counts(sort=False)
+        merged = self.category_counts[col].add(counts, fill_value=0).astype(np.int64)
+        if len(merged) > self.max_tracked_categories:
+            merged = merged.nlargest(self.max_tracked_categories)
+            self.counts_truncated[col] = True
+        self.category_counts[col] = merged
+        self.cardinality_sketches[col].update(present)
+
+    def merge(self, other: 'ColumnStatistics') -> 'ColumnStatistics':
+        """Merge statistics fitted on another partition of the same schema"""
+        if other._count is None:
+            return self
+        if self._count is None:
+            self.__dict__.update(other.__dict__)
+            return self
+
+        self.n_rows += other.n_rows
+        for col, nulls in other.null_counts.items():
+            self.null_counts[col] = self.null_counts.get(col, 0) + nulls
+        self._merge_moments(other._count, other._mean, other._m2, other._m3)
+        self._min = np.fmin(self._min, other._min)
+        self._max = np.fmax(self._max, other._max)
+        self._update_sample(other._sample_keys, other._sample_values)
+
+        for col in self.categorical_columns:
+            merged = self.category_counts[col].add(other.category_counts[col], fill_value=0).astype(np.int64)
+            truncated = self.counts_truncated[col] or other.counts_truncated[col]
+            if len(merged) > self.max_tracked_categories:
+                merged = merged.nlargest(self.max_tracked_categories)
+                truncated = True
+            self.category_counts[col] = merged
+            self.counts_truncated[col] = truncated
+            self.cardinality_sketches[col].merge(other.cardinality_sketches[col])
+        return self
+
+    # ------------------------------------------------------------------
+    # Derived statistics
+    # ------------------------------------------------------------------
+    def _index(self, col: str) -> int:
+        return self.numerical_columns.index(col)
+
+    def mean(self, col: str) -> float:
+        i = self._index(col)
+        return float(self._mean[i]) if self._count[i] > 0 else np.nan
+
+    def skew(self, col: str) -> float:
+        """Bias-adjusted Fisher-Pearson skewness (matches ``Series.skew``)"""
+        i = self._index(col)
+        n, m2, m3 = float(self._count[i]), self._m2[i], self._m3[i]
+        if n < 3:
+            return np.nan
+        if m2 <= 1e-14 * max(abs(self._mean[i]), 1.0) ** 2 * n:
+            return 0.0
+        g1 = (m3 / n) / (m2 / n) ** 1.5
+        return float(np.sqrt(n * (n - 1)) / (n - 2) * g1)
+
+    def quantile(self, col: str, q: float) -> float:
+        """Approximate quantile from the shared row sample (exact when it holds every row)"""
+        sample = self._sample_values[:, self._index(col)]
+        sample = sample[~np.isnan(sample)]
+        return float(np.quantile(sample, q)) if len(sample) else np.nan
+
+    def median(self, col: str) -> float:
+        return self.quantile(col, 0.5)
+
+    def n_unique(self, col: str) -> int:
+        """Number of distinct non-null values (HyperLogLog estimate once counts are truncated)"""
+        if col in self.category_counts:
+            if self.counts_truncated[col]:
+                return int(round(self.cardinality_sketches[col].estimate()))
+            return len(self.category_counts[col])
+        i = self._index(col)
+        if self._count[i] == 0:
+            return 0
+        return 1 if self._min[i] == self._max[i] else 2  # only constant-ness is tracked
+
+    def mode(self, col: str) -> Any:
+        """Most frequent value, smallest value on ties (matches ``Series.mode()[0]``)"""
+        counts = self.category_counts[col]
+        if counts.empty:
+            return 'Unknown'
+        top = counts[counts == counts.max()].index
+        return sorted(top)[0]
+
+    def imputation_values(self) -> Dict[str, Any]:
+        """Fill value for every column that had missing values during fitting"""
+        fills = {}
+        for col in self.numerical_columns:
+            if self.null_counts[col] > 0:
+                # Use median for skewed distributions, mean for normal
+                fills[col] = self.median(col) if abs(self.skew(col)) > 1 else self.mean(col)
+        for col in self.categorical_columns:
+            if self.null_counts[col] > 0:
+                fills[col] = self.mode(col)
+        return fills
+
+    def imputed_category_counts(self, col: str) -> pd.Series:
+        """Category counts after imputation (missing values counted under the mode)"""
+        counts = self.category_counts[col].copy()
+        nulls = self.null_counts[col]
+        if nulls > 0:
+            mode_val = self.mode(col)
+            counts[mode_val] = counts.get(mode_val, 0) + nulls
+        return counts
+
+    def constant_features(self) -> List[str]:
+        """Columns with at most one distinct value once missing values are imputed"""
+        return [col for col in self.numerical_columns + self.categorical_columns
+                if self.n_unique(col) <= 1]
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        """Apply the fitted imputation values (used at serving time)"""
+        fills = {col: val for col, val in self.imputation_values().items() if col in X.columns}
+        return fill_missing(X, fills)
+
+    def summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Per-column statistics as plain Python values"""
+        summary = {}
+        for col in self.numerical_columns:
+            i = self._index(col)
+            summary[col] = {
+                'nulls': self.null_counts[col],
+                'mean': self.mean(col),
+                'skew': self.skew(col),
+                'median': self.median(col),
+                'min': float(self._min[i]) if self._count[i] else None,
+                'max': float(self._max[i]) if self._count[i] else None,
+            }
+        for col in self.categorical_columns:
+            summary[col] = {
+                'nulls': self.null_counts[col],
+                'n_unique': self.n_unique(col),
+                'mode': self.mode(col),
+            }
+        return summary
+
+
+def fill_missing(X: pd.DataFrame, fills: Dict[str, Any]) -> pd.DataFrame:
+    """``X.fillna(fills)`` that also works when a fill value is not yet a category of the column"""
+    X = X.copy(deep=False)
+    for col, value in fills.items():
+        if col in X.columns and isinstance(X[col].dtype, pd.CategoricalDtype) \
+                and value not in X[col].cat.categories:
+            X[col] = X[col].cat.add_categories([value])
+    return X.fillna(value=fills)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Compact Dtypes for the Training Matrix
+======================================
+
+Helpers for the compact-dtype training mode: engineered binary flags are
+kept as int8, integer columns are downcast to the smallest integer type
+that holds them and floating-point ratios become float32. The final model
+matrix is float32, which is what XGBoost, LightGBM and the sklearn trees use
+internally anyway.
+"""
+
+from typing import Any, Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+# Engineered 0/1 indicators (plus the target) created in load_and_engineer_features
+FLAG_COLUMNS = ['emp_stability', 'has_delinq_history', 'high_risk_purpose', 'is_prime_grade',
+                'survival_status']
+
+
+def compact_frame(df: pd.DataFrame, flag_columns: Iterable[str] = FLAG_COLUMNS) -> Dict[str, Any]:
+    """Downcast ``df`` in place and return a before/after memory report"""
+    bytes_before = int(df.memory_usage(deep=True).sum())
+    flag_columns = set(flag_columns)
+
+    for col in df.columns:
+        series = df[col]
+        if col in flag_columns and series.notna().all():
+            df[col] = series.astype(np.int8)
+        elif pd.api.types.is_float_dtype(series):
+            df[col] = series.astype(np.float32)
+        elif pd.api.types.is_integer_dtype(series) and not pd.api.types.is_extension_array_dtype(series):
+            df[col] = pd.to_numeric(series, downcast='integer')
+
+    bytes_after = int(df.memory_usage(deep=True).sum())
+    return {
+        'frame_bytes_before': bytes_before,
+        'frame_bytes_after': bytes_after,
+        'frame_saved_pct': round(100 * (1 - bytes_after / max(bytes_before, 1)), 1),
+    }
+
+
+def matrix_report(X: np.ndarray) -> Dict[str, Any]:
+    """Size of the model matrix compared to its float64 equivalent"""
+    float64_bytes = X.size * 8
+    return {
+        'matrix_dtype': str(X.dtype),
+        'matrix_bytes': int(X.nbytes),
+        'matrix_bytes_float64': int(float64_bytes),
+        'matrix_saved_pct': round(100 * (1 - X.nbytes / max(float64_bytes, 1)), 1),
+    }
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Drift Reference Distributions
+=============================
+
+Summarizes the distributions the model was trained on, for the API's input
+drift monitor (``ml_api/drift_monitor.py``) to compare live traffic
+against. The reference is a dict of plain dicts and numpy arrays, keyed by
+the name of the input it describes:
+
+- numeric feature: ``{'kind': 'numeric', 'count': n, 'quantiles': q}``,
+  with ``q`` the values at ``REFERENCE_QUANTILES`` evenly spaced
+  probabilities from 0 to 1 (so its CDF is known to 0.1%).
+- label-encoded feature: ``{'kind': 'categorical', 'count': n,
+  'counts': {category: rows}}``, keyed by the encoder's class names, which
+  are what ``modelInputs`` carries.
+- ``model_score``: the numeric distribution of the ensemble's (calibrated)
+  failure probability over a sample of the preprocessed rows.
+
+Features are summarized from the preprocessed matrix before class
+resampling, so the reference is the population the model will see, not
+the balanced one it was fitted on.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+REFERENCE_QUANTILES = 1001
+
+# Preprocessed rows scored for the model_score reference
+SCORE_SAMPLE_ROWS = 100_000
+
+
+def numeric_reference(values: np.ndarray) -> Dict[str, Any]:
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    quantiles = (np.quantile(values, np.linspace(0, 1, REFERENCE_QUANTILES)) if len(values)
+                 else np.empty(0))
+    return {'kind': 'numeric', 'count': len(values), 'quantiles': quantiles}
+
+
+def categorical_reference(codes: np.ndarray, classes: np.ndarray) -> Dict[str, Any]:
+    counts = np.bincount(np.asarray(codes).astype(np.int64), minlength=len(classes))
+    return {'kind': 'categorical', 'count': int(counts.sum()),
+            'counts': {str(category): int(n) for category, n in zip(classes, counts) if n}}
+
+
+def build_drift_reference(X: np.ndarray, feature_names: list, label_encoders: Dict[str, Any],
+                          model_score: Optional[np.ndarray] = None) -> Dict[str, Dict[str, Any]]:
+    """Reference distribution of every column of the preprocessed matrix ``X`` (and of ``model_score``)"""
+    reference = {}
+    for i, name in enumerate(feature_names):
+        encoder = label_encoders.get(name)
+        reference[name] = (categorical_reference(X[:, i], encoder.classes_) if encoder is not None
+                           else numeric_reference(X[:, i]))
+    if model_score is not None:
+        reference['model_score'] = numeric_reference(model_score)
+    return reference
+
+
+def drift_reference_summary(reference: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    kinds = [entry['kind'] for name, entry in reference.items() if name != 'model_score']
+    return {
+        'numeric': kinds.count('numeric'),
+        'categorical': kinds.count('categorical'),
+        'quantiles': REFERENCE_QUANTILES,
+        'rows': max((entry['count'] for entry in reference.values()), default=0),
+        'model_score': 'model_score' in reference,
+    }
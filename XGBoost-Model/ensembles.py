@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Prefit Ensemble Combiner
+========================
+
+``PrefitVotingEnsemble`` combines members that are already fitted (the
+GridSearch ``best_estimator_`` objects and the trained LightGBM model)
+without cloning or refitting them, unlike ``VotingClassifier.fit``.
+
+Soft-voting weights are uniform by default, which reproduces the old
+VotingClassifier output. Optionally, on a small holdout slice the members
+never saw, the ensemble can learn:
+- 'auc' weights, proportional to each member's lift over a random ranker
+- 'stacking', a logistic-regression meta-learner on member log-odds
+
+The ensemble is saved as a plain dict (``to_dict``) of its members, weights
+and meta-learner, so loading it needs only sklearn, xgboost and lightgbm,
+not this module (the API rebuilds the combiner from the dict).
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from sklearn.utils import Bunch
+
+ENSEMBLE_WEIGHTINGS = ['uniform', 'auc', 'stacking']
+ENSEMBLE_FORMAT = 'prefit_voting_ensemble'
+
+
+class PrefitVotingEnsemble(ClassifierMixin, BaseEstimator):
+    """Soft-voting (or stacked) ensemble over already fitted binary classifiers"""
+
+    def __init__(self, estimators: List[Tuple[str, Any]], weights: Optional[Sequence[float]] = None):
+        self.estimators = estimators
+        self.weights = weights
+        self.estimators_ = [est for _, est in estimators]
+        self.named_estimators_ = Bunch(**dict(estimators))
+        self.classes_ = np.asarray(getattr(self.estimators_[0], 'classes_', [0, 1]))
+        self.meta_learner_ = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Members, weights and meta-learner as plain objects, for pickling"""
+        return {'format': ENSEMBLE_FORMAT, 'estimators': list(self.estimators),
+                'weights': self.weights, 'meta_learner': self.meta_learner_}
+
+    @classmethod
+    def from_dict(cls, saved: Dict[str, Any]) -> 'PrefitVotingEnsemble':
+        ensemble = cls(saved['estimators'], saved['weights'])
+        ensemble.meta_learner_ = saved['meta_learner']
+        return ensemble
+
+    def member_probabilities(self, X: np.ndarray) -> np.ndarray:
+        """Positive-class probability of every member, shape (n_samples, n_members)"""
+        return np.column_stack([est.predict_proba(X)[:, 1] for est in self.estimators_])
+
+    def combine(self, member_proba: np.ndarray) -> np.ndarray:
+        """Positive-class probability of the ensemble from member probabilities"""
+        if self.meta_learner_ is not None:
+            return self.meta_learner_.predict_proba(_log_odds(member_proba))[:, 1]
+        weights = np.ones(member_proba.shape[1]) if self.weights is None else np.asarray(self.weights)
+        return member_proba @ (weights / weights.sum())
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        positive = self.combine(self.member_probabilities(X))
+        return np.column_stack([1 - positive, positive])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[(self.predict_proba(X)[:, 1] > 0.5).astype(int)]
+
+    def fit(self, X: np.ndarray, y: np.ndarray, method: str = 'uniform') -> 'PrefitVotingEnsemble':
+        """
+        Learn combination weights on holdout data; the members are never refit.
+
+        ``X``/``y`` must not overlap the members' training data.
+        """
+        if method not in ENSEMBLE_WEIGHTINGS:
+            raise ValueError(f"Unknown weighting '{method}'. Choose from: {', '.join(ENSEMBLE_WEIGHTINGS)}")
+        self.meta_learner_ = None
+        if method == 'uniform':
+            self.weights = None
+            return self
+
+        member_proba = self.member_probabilities(X)
+        if method == 'auc':
+            aucs = np.array([roc_auc_score(y, member_proba[:, i]) for i in range(member_proba.shape[1])])
+            self.weights = np.maximum(aucs - 0.5, 1e-3).tolist()
+        else:
+            self.meta_learner_ = LogisticRegression(max_iter=1000).fit(_log_odds(member_proba), y)
+            self.weights = self.meta_learner_.coef_[0].tolist()
+        return self
+
+
+def saved_form(model: Any) -> Any:
+    """``model`` as it is pickled: a dict for an ensemble, otherwise unchanged"""
+    return model.to_dict() if isinstance(model, PrefitVotingEnsemble) else model
+
+
+def from_saved_form(saved: Any) -> Any:
+    """Inverse of ``saved_form``"""
+    if isinstance(saved, dict) and saved.get('format') == ENSEMBLE_FORMAT:
+        return PrefitVotingEnsemble.from_dict(saved)
+    return saved
+
+
+def _log_odds(proba: np.ndarray) -> np.ndarray:
+    clipped = np.clip(proba, 1e-6, 1 - 1e-6)
+    return np.log(clipped / (1 - clipped))
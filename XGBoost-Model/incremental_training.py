@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Incremental (Warm-Start) Retraining Helpers
+===========================================
+
+Building blocks for ``SophisticatedMSMEPredictor.run_incremental_training``:
+
+- an append-only label encoder, so categories seen in a new loan quarter get
+  new codes without renumbering the ones the trees were trained on (saved
+  back as a plain ``LabelEncoder`` with the same classes, for the API)
+- warm-start continuation for the XGBoost, LightGBM and Random Forest members
+- the voting ensemble rebuilt over the refreshed members, with its weights
+  (or stacking meta-learner) relearned on a holdout of the new partitions
+- a validation gate comparing the refreshed model against the previous one
+
+Everything that defines the model's input space (the fitted scaler and the
+frequency maps) is kept frozen so the existing trees stay valid; only
+imputation statistics and newly seen categories are refreshed.
+"""
+
+import copy
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+import lightgbm as lgb
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.preprocessing import LabelEncoder
+
+from ensembles import PrefitVotingEnsemble
+
+
+class AppendOnlyLabelEncoder(LabelEncoder):
+    """LabelEncoder whose existing codes never change when categories are added"""
+
+    @classmethod
+    def from_label_encoder(cls, encoder: LabelEncoder) -> 'AppendOnlyLabelEncoder':
+        if isinstance(encoder, cls):
+            return encoder
+        refreshed = cls()
+        refreshed.classes_ = np.asarray(encoder.classes_, dtype=object)
+        return refreshed
+
+    def to_label_encoder(self) -> LabelEncoder:
+        """Plain LabelEncoder with the same codes, for saving (the API cannot import this class)"""
+        plain = LabelEncoder()
+        plain.classes_ = np.asarray(self.classes_, dtype=object)
+        return plain
+
+    def partial_fit(self, values) -> 'AppendOnlyLabelEncoder':
+        """Append unseen categories after the existing ones"""
+        values = pd.Series(values).astype(str)
+        known = pd.Index(self.classes_)
+        unseen = sorted(set(values.unique()) - set(known))
+        if unseen:
+            self.classes_ = np.concatenate([np.asarray(self.classes_, dtype=object),
+                                            np.asarray(unseen, dtype=object)])
+        return self
+
+    def transform(self, values) -> np.ndarray:
+        codes = pd.Index(self.classes_).get_indexer(pd.Series(values).astype(str))
+        if (codes < 0).any():
+            raise ValueError("y contains previously unseen labels; call partial_fit first")
+        return codes
+
+
+def plain_label_encoders(encoders: Dict[str, LabelEncoder]) -> Dict[str, LabelEncoder]:
+    """``encoders`` with every append-only encoder converted back to a plain LabelEncoder"""
+    return {col: le.to_label_encoder() if isinstance(le, AppendOnlyLabelEncoder) else le
+            for col, le in encoders.items()}
+
+
+def continue_xgboost(model: xgb.XGBClassifier, X: np.ndarray, y: np.ndarray,
+                     n_rounds: int, n_jobs: Optional[int] = None) -> xgb.XGBClassifier:
+    """Add ``n_rounds`` boosting rounds on top of an existing XGBoost booster"""
+    params = model.get_params()
+    params['n_estimators'] = n_rounds
+    if n_jobs:
+        params['n_jobs'] = n_jobs
+    refreshed = xgb.XGBClassifier(**params)
+    refreshed.fit(X, y, xgb_model=model.get_booster())
+    return refreshed
+
+
+def continue_lightgbm(model: lgb.LGBMClassifier, X: np.ndarray, y: np.ndarray,
+                      n_rounds: int, n_jobs: Optional[int] = None) -> lgb.LGBMClassifier:
+    """Add ``n_rounds`` boosting rounds on top of an existing LightGBM booster"""
+    params = model.get_params()
+    params['n_estimators'] = n_rounds
+    if n_jobs:
+        params['n_jobs'] = n_jobs
+    refreshed = lgb.LGBMClassifier(**params)
+    refreshed.fit(X, y, init_model=model.booster_)
+    return refreshed
+
+
+def extend_random_forest(model: RandomForestClassifier, X: np.ndarray, y: np.ndarray,
+                         n_trees: int, n_jobs: Optional[int] = None) -> RandomForestClassifier:
+    """Grow ``n_trees`` additional trees on the new data, keeping the existing ones"""
+    refreshed = copy.deepcopy(model)
+    refreshed.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_trees)
+    if n_jobs:
+        refreshed.set_params(n_jobs=n_jobs)
+    refreshed.fit(X, y)
+    refreshed.set_params(warm_start=False)
+    return refreshed
+
+
+def reassemble_voting_ensemble(voting: Any, members: Dict[str, Any], X_holdout: Optional[np.ndarray] = None,
+                               y_holdout: Optional[np.ndarray] = None,
+                               method: str = 'uniform') -> PrefitVotingEnsemble:
+    """
+    Rebuild the voting ensemble over the refreshed members (same member order).
+
+    The old weights or meta-learner were learned on the old members'
+    outputs, so none are carried over: with ``X_holdout``/``y_holdout``
+    (rows the members did not train on) they are relearned with ``method``,
+    otherwise the members are averaged uniformly.
+    """
+    name_to_member = {'xgb': members['XGBoost'], 'lgb': members['LightGBM'],
+                      'rf': members['RandomForest']}
+    refreshed = PrefitVotingEnsemble([(name, name_to_member[name]) for name, _ in voting.estimators])
+    if X_holdout is not None:
+        refreshed.fit(X_holdout, y_holdout, method=method)
+    return refreshed
+
+
+def validation_gate(previous_model: Any, candidate_model: Any, X_val: np.ndarray,
+                    y_val: np.ndarray, tolerance: float = 0.005) -> Dict[str, Any]:
+    """Accept the candidate only if its ROC-AUC is not worse than the previous model's"""
+    previous_auc = roc_auc_score(y_val, previous_model.predict_proba(X_val)[:, 1])
+    candidate_auc = roc_auc_score(y_val, candidate_model.predict_proba(X_val)[:, 1])
+    return {
+        'previous_auc': float(previous_auc),
+        'candidate_auc': float(candidate_auc),
+        'tolerance': tolerance,
+        'accepted': bool(candidate_auc >= previous_auc - tolerance),
+    }
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Offline Batch Scoring for Portfolio Runs
+========================================
+
+Scores a whole portfolio of businesses with the same feature engineering
+and risk rules as the ``/predict`` endpoint, without going through HTTP.
+
+Inputs are split into shards (Parquet row groups, or newline-aligned byte
+ranges of CSV files) that a process pool scores independently. Every
+worker loads the saved model artifacts once. Each shard becomes one
+``part-XXXXX.parquet`` file with ``risk_score``, ``risk_level``,
+``confidence`` and ``key_factors``. When the input also carries the saved
+model's feature columns, a ``model_score`` column is added (calibrated
+when the model has a calibration table), with its ``model_confidence``,
+the ``model_spread`` of the ensemble members and their ``member_scores``. Rows that
+``/predict`` would reject get null scores, and ``validation_errors`` maps
+each of their invalid fields to the message ``/predict`` would give (the
+columns are validated whole, not row by row). ``--explain`` derives
+``key_factors`` from exact Shapley contributions, like ``/predict?explain=true``.
+It also adds ``model_factors``, the input columns with the largest TreeSHAP
+contributions to ``model_score``. ``--cascade`` scores with the two-tier
+cascade instead: the model scores only the rows whose rule score is near a
+risk level threshold, and replaces their ``risk_score`` (``tier`` says
+which tier scored each row); with ``--explain``, the ``key_factors`` of
+those rows come from the model's contributions. ``--model-tier fast`` uses the distilled
+student model instead of the full ensemble.
+
+Finished parts are written atomically, so ``--resume`` rescores only the
+shards that are missing after an interrupted run.
+
+Usage:
+    python batch_score.py portfolio/ --output-dir scored/ --workers 8
+    python batch_score.py portfolio/ --output-dir scored/ --resume
+    python batch_score.py portfolio/ --output-dir scored/ --cascade --cascade-bands 0.35-0.45,0.65-0.75
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from main import (BUSINESS_FIELDS, calculate_risk_scores_batch, determine_risk_levels,
+                  explain_risk_scores_batch, extract_business_features_batch,
+                  key_factors_from_contributions, validate_business_frame)
+from cascade import ScoringCascade, TIERS, parse_bands
+from model_artifacts import ARTIFACT_FILES, DEFAULT_MODEL_DIR, MODEL_TIERS, ModelArtifacts, model_factors
+
+MANIFEST_FILE = '_manifest.json'
+REPORT_FILE = '_report.json'
+INPUT_EXTENSIONS = ('.parquet', '.csv')
+
+# Output column types, fixed so every shard writes the same schema
+SCORE_TYPES = {
+    'risk_score': pa.float64(),
+    'risk_level': pa.string(),
+    'confidence': pa.float64(),
+    'key_factors': pa.list_(pa.string()),
+    'model_score': pa.float64(),
+    'model_confidence': pa.float64(),
+    'model_spread': pa.float64(),
+    'member_scores': pa.map_(pa.string(), pa.float64()),
+    'model_factors': pa.list_(pa.string()),
+    'tier': pa.string(),
+    'validation_errors': pa.map_(pa.string(), pa.string()),
+}
+
+# Set once per worker process by _init_worker
+_artifacts: Optional[ModelArtifacts] = None
+
+
+def list_inputs(paths: List[str]) -> List[str]:
+    """Input files, expanding directories to their Parquet/CSV files"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                         if name.endswith(INPUT_EXTENSIONS))
+        else:
+            files.append(path)
+    return files
+
+
+def _csv_shards(path: str, shard_rows: int) -> List[Dict[str, Any]]:
+    """Byte ranges of roughly ``shard_rows`` lines, each starting at a line boundary"""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        data_start = f.tell()
+        sample = f.read(1 << 20)
+        lines = max(sample.count(b'\n'), 1)
+        step = max(1, int(len(sample) / lines * shard_rows))
+
+        offsets = [data_start]
+        while offsets[-1] + step < size:
+            f.seek(offsets[-1] + step)
+            f.readline()
+            if f.tell() >= size:
+                break
+            offsets.append(f.tell())
+    offsets.append(size)
+    columns = list(pd.read_csv(io.BytesIO(header), nrows=0).columns)
+    return [{'path': path, 'kind': 'csv', 'start': start, 'end': end, 'columns': columns}
+            for start, end in zip(offsets[:-1], offsets[1:]) if end > start]
+
+
+def _parquet_shards(path: str, shard_rows: int) -> List[Dict[str, Any]]:
+    """Consecutive row groups holding roughly ``shard_rows`` rows"""
+    metadata = pq.ParquetFile(path).metadata
+    shards, groups, rows = [], [], 0
+    for i in range(metadata.num_row_groups):
+        groups.append(i)
+        rows += metadata.row_group(i).num_rows
+        if rows >= shard_rows:
+            shards.append({'path': path, 'kind': 'parquet', 'row_groups': groups})
+            groups, rows = [], 0
+    if groups:
+        shards.append({'path': path, 'kind': 'parquet', 'row_groups': groups})
+    return shards
+
+
+def plan_shards(files: List[str], shard_rows: int) -> List[Dict[str, Any]]:
+    shards = []
+    for path in files:
+        shards.extend(_parquet_shards(path, shard_rows) if path.endswith('.parquet')
+                      else _csv_shards(path, shard_rows))
+    for i, shard in enumerate(shards):
+        shard['part'] = f"part-{i:05d}.parquet"
+    return shards
+
+
+def read_shard(shard: Dict[str, Any]) -> pd.DataFrame:
+    if shard['kind'] == 'parquet':
+        return pq.ParquetFile(shard['path']).read_row_groups(shard['row_groups']).to_pandas()
+    with open(shard['path'], 'rb') as f:
+        f.seek(shard['start'])
+        data = f.read(shard['end'] - shard['start'])
+    return pd.read_csv(io.BytesIO(data), header=None, names=shard['columns'])
+
+
+def score_frame(df: pd.DataFrame, artifacts: Optional[ModelArtifacts] = None,
+                id_column: Optional[str] = None, explain: bool = False,
+                cascade: Optional[ScoringCascade] = None, model_tier: str = 'full') -> pd.DataFrame:
+    """Risk assessment for every row of ``df`` (null scores and validation errors for invalid rows)"""
+    out = pd.DataFrame(index=df.index)
+    if id_column and id_column in df.columns:
+        out[id_column] = df[id_column].astype('string')
+
+    df, valid, errors = validate_business_frame(df)
+    risk_score = np.full(len(df), np.nan)
+    confidence = np.full(len(df), np.nan)
+    risk_level = np.full(len(df), None, dtype=object)
+    key_factors = np.full(len(df), None, dtype=object)
+    tier = np.full(len(df), None, dtype=object)
+    model_score = np.full(len(df), np.nan)
+    model_spread = np.full(len(df), np.nan)
+    member_scores = np.full(len(df), None, dtype=object)
+    if valid.any():
+        rows = df.loc[valid, BUSINESS_FIELDS]
+        if cascade is not None:
+            scores = cascade.score(df.loc[valid], model_tier)
+            tier[valid] = scores['tier'].to_numpy()
+            model_score[valid] = scores['model_score'].to_numpy()
+            model_spread[valid] = scores['model_spread'].to_numpy()
+            member_scores[valid] = scores['member_scores'].to_numpy()
+        else:
+            scores = calculate_risk_scores_batch(extract_business_features_batch(rows))
+        risk_score[valid] = scores['risk_score'].to_numpy()
+        confidence[valid] = scores['confidence'].to_numpy()
+        risk_level[valid] = determine_risk_levels(risk_score[valid])
+        key_factors[valid] = scores['key_factors'].to_numpy()
+
+    # Rows the cascade escalated were scored by the model: explain them with its TreeSHAP
+    # contributions, and the rule-scored rows with the rule engine's Shapley values
+    escalated = np.isin(tier, TIERS[1:])
+    factors = np.full(len(df), None, dtype=object)
+    if explain:
+        ruled = valid & ~escalated
+        if ruled.any():
+            contributions = explain_risk_scores_batch(df.loc[ruled, BUSINESS_FIELDS])
+            key_factors[ruled] = key_factors_from_contributions(contributions)
+        if escalated.any():
+            factors[escalated] = model_factors(artifacts.explain(df.loc[escalated], model_tier))
+            for i in np.flatnonzero(escalated):
+                key_factors[i] = factors[i] or ["Overall Business Performance"]
+
+    out['risk_score'] = risk_score
+    out['risk_level'] = risk_level
+    out['confidence'] = confidence
+    out['key_factors'] = key_factors
+    out['validation_errors'] = errors
+    if cascade is not None:
+        out['tier'] = tier
+        out['model_score'] = model_score
+        out['model_spread'] = model_spread
+        out['member_scores'] = member_scores
+        if explain and escalated.any():
+            out['model_factors'] = factors
+    elif artifacts is not None and artifacts.covers(df.columns):
+        model = artifacts.score(df, model_tier)
+        out['model_score'] = model['model_score']
+        out['model_confidence'] = artifacts.confidence(model['model_score'].to_numpy(),
+                                                       model['model_spread'].to_numpy())
+        out['model_spread'] = model['model_spread']
+        members = model.columns[2:]
+        out['member_scores'] = model[members].to_dict('records') if len(members) else None
+        if explain:
+            out['model_factors'] = model_factors(artifacts.explain(df, model_tier))
+    return out
+
+
+def scored_table(scored: pd.DataFrame) -> pa.Table:
+    """Arrow table of ``score_frame`` output with the fixed column types"""
+    schema = pa.schema([pa.field(col, SCORE_TYPES.get(col, pa.string())) for col in scored.columns])
+    return pa.Table.from_pandas(scored, schema=schema, preserve_index=False)
+
+
+def _init_worker(model_dir: Optional[str]):
+    global _artifacts
+    logging.disable(logging.INFO)
+    try:
+        _artifacts = ModelArtifacts.load(model_dir)
+    except FileNotFoundError:
+        _artifacts = None
+
+
+def _write_parquet(df: pd.DataFrame, path: str):
+    """Write via a temporary file so a part is either complete or absent"""
+    tmp = f"{path}.tmp-{os.getpid()}"
+    pq.write_table(scored_table(df), tmp)
+    os.replace(tmp, path)
+
+
+def score_shard(shard: Dict[str, Any], output_dir: str, id_column: Optional[str],
+                explain: bool = False, cascade_bands: Optional[List[Tuple[float, float]]] = None,
+                cascade: bool = False, model_tier: str = 'full') -> Dict[str, Any]:
+    start = time.perf_counter()
+    df = read_shard(shard)
+    scoring_cascade = ScoringCascade(_artifacts, cascade_bands) if cascade else None
+    scored = score_frame(df, _artifacts, id_column, explain, scoring_cascade, model_tier)
+    _write_parquet(scored, os.path.join(output_dir, shard['part']))
+    result = {
+        'part': shard['part'],
+        'rows': len(scored),
+        'invalid_rows': int(scored['risk_score'].isna().sum()),
+        'seconds': time.perf_counter() - start,
+    }
+    if scoring_cascade is not None:
+        result['cascade'] = scoring_cascade.metrics.snapshot()
+    return result
+
+
+def _plan_signature(shards: List[Dict[str, Any]], options: Dict[str, Any]) -> str:
+    inputs = sorted({(s['path'], os.path.getsize(s['path']), os.path.getmtime(s['path'])) for s in shards})
+    layout = [{k: v for k, v in s.items() if k != 'columns'} for s in shards]
+    return hashlib.sha256(json.dumps([inputs, layout, options], default=str).encode()).hexdigest()
+
+
+def run(inputs: List[str], output_dir: str, workers: int = 1, shard_rows: int = 250_000,
+        model_dir: Optional[str] = None, id_column: Optional[str] = 'businessId',
+        resume: bool = False, explain: bool = False, cascade: bool = False,
+        cascade_bands: Optional[List[Tuple[float, float]]] = None, model_tier: str = 'full') -> Dict[str, Any]:
+    if model_tier == 'fast':
+        model_dir = model_dir or os.getenv('MODEL_DIR') or DEFAULT_MODEL_DIR
+        if not os.path.exists(os.path.join(model_dir, ARTIFACT_FILES['student'])):
+            raise FileNotFoundError(f"--model-tier fast needs a distilled student model in {model_dir}")
+    files = list_inputs(inputs)
+    if not files:
+        raise FileNotFoundError(f"No Parquet/CSV inputs found in {inputs}")
+    shards = plan_shards(files, shard_rows)
+    options = {'id_column': id_column, 'explain': explain}
+    if cascade:
+        options['cascade'] = cascade_bands or 'default'
+    if model_tier != 'full':
+        options['model_tier'] = model_tier
+    signature = _plan_signature(shards, options)
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            previous = json.load(f)
+        if previous.get('signature') != signature:
+            raise ValueError(f"{output_dir} holds parts from a different run; use a new output directory")
+        if not resume:
+            raise ValueError(f"{output_dir} already holds a run; pass --resume to finish it")
+    with open(manifest_path, 'w') as f:
+        json.dump({'signature': signature, 'inputs': files, 'shards': len(shards)}, f, indent=2)
+
+    todo = [s for s in shards if not os.path.exists(os.path.join(output_dir, s['part']))]
+    print(f"📦 {len(files)} input file(s), {len(shards)} shard(s), "
+          f"{len(shards) - len(todo)} already scored, {workers} worker(s)")
+
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_dir,)) as pool:
+        futures = [pool.submit(score_shard, shard, output_dir, id_column, explain, cascade_bands, cascade,
+                               model_tier) for shard in todo]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"   ✅ {result['part']}: {result['rows']:,} rows "
+                  f"({result['rows'] / max(result['seconds'], 1e-9):,.0f} rows/sec)")
+    elapsed = time.perf_counter() - start
+
+    rows = sum(r['rows'] for r in results)
+    report = {
+        'shards_scored': len(results),
+        'shards_skipped': len(shards) - len(todo),
+        'rows': rows,
+        'invalid_rows': sum(r['invalid_rows'] for r in results),
+        'seconds': round(elapsed, 3),
+        'rows_per_sec': round(rows / max(elapsed, 1e-9), 1),
+        'workers': workers,
+        'shards': sorted(results, key=lambda r: r['part']),
+    }
+    if cascade:
+        report['cascade'] = cascade_report(results)
+    with open(os.path.join(output_dir, REPORT_FILE), 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"🎯 Scored {rows:,} rows in {elapsed:,.1f}s ({report['rows_per_sec']:,.0f} rows/sec), "
+          f"{report['invalid_rows']:,} invalid")
+    if cascade:
+        print(f"🪜 Escalated {report['cascade']['escalated_fraction']:.1%} of valid rows to the model")
+    return report
+
+
+def cascade_report(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Cascade metrics of every scored shard, combined"""
+    metrics = [r['cascade'] for r in results]
+    rows = sum(m['rows'] for m in metrics)
+    escalated = sum(m['escalated'] for m in metrics)
+    tiers = {}
+    for tier in TIERS:
+        tier_rows = sum(m['tiers'][tier]['rows'] for m in metrics)
+        seconds = sum(m['tiers'][tier]['seconds'] for m in metrics)
+        tiers[tier] = {'rows': tier_rows, 'seconds': round(seconds, 3),
+                       'rows_per_sec': round(tier_rows / seconds, 1) if seconds else None}
+    return {
+        'rows': rows,
+        'escalated': escalated,
+        'escalated_fraction': escalated / rows if rows else 0.0,
+        'escalation_unavailable': sum(m['escalation_unavailable'] for m in metrics),
+        'tiers': tiers,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Score a portfolio of businesses offline')
+    parser.add_argument('inputs', nargs='+', help='Parquet/CSV files or directories of them')
+    parser.add_argument('--output-dir', required=True, help='Directory for the scored part-*.parquet files')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+    parser.add_argument('--shard-rows', type=int, default=250_000, help='Approximate rows per shard')
+    parser.add_argument('--model-dir', default=None, help='Saved model directory (default: $MODEL_DIR or ../model)')
+    parser.add_argument('--id-column', default='businessId', help='Input column copied to the output')
+    parser.add_argument('--resume', action='store_true', help='Only score shards missing from the output')
+    parser.add_argument('--explain', action='store_true', help='Key factors from Shapley/TreeSHAP contributions')
+    parser.add_argument('--cascade', action='store_true',
+                        help='Score rows near a risk level threshold with the saved model')
+    parser.add_argument('--cascade-bands', type=parse_bands, default=None,
+                        help='Routing bands, e.g. 0.35-0.45,0.65-0.75 (default: $CASCADE_BANDS or ±0.05)')
+    parser.add_argument('--model-tier', choices=MODEL_TIERS, default='full',
+                        help='Score with the full ensemble or its distilled student (fast)')
+    args = parser.parse_args(argv)
+
+    run(args.inputs, args.output_dir, workers=args.workers, shard_rows=args.shard_rows,
+        model_dir=args.model_dir, id_column=args.id_column, resume=args.resume,
+        explain=args.explain, cascade=args.cascade, cascade_bands=args.cascade_bands,
+        model_tier=args.model_tier)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Two-Tier Scoring Cascade
+========================
+
+Scores every business with the rule engine first and sends only the
+ambiguous ones to the saved ensemble.
+
+- Tier 1 (rules): the vectorized ``calculate_advanced_risk_score``.
+- A row is escalated when its rule score falls in a routing band around a
+  risk level threshold (default 0.4 ± 0.05 and 0.7 ± 0.05, configurable
+  with ``CASCADE_BANDS``, e.g. ``"0.35-0.45,0.65-0.75"``), unless it is
+  clear-cut: more than two of the four critical risks, or every tiered
+  component at its floor.
+- Tier 2 (ensemble, or its distilled ``student`` with ``model_tier='fast'``):
+  the model's failure probability replaces the rule score of escalated
+  rows. It needs a value for every model input of the row; rows without
+  them (e.g. businesses sent without ``modelInputs`` in a batch with
+  others) keep the rule score and are counted as unavailable. The model's score is
+  calibrated when the tier has a calibration table, and the row's
+  confidence comes from the model (the probability of the predicted label,
+  discounted by the spread of the ensemble's members) instead of the rule
+  engine's fixed values.
+
+``CascadeMetrics`` counts rows, the fraction escalated and the latency of
+each tier.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from main import (COMPONENT_WEIGHTS, RISK_THRESHOLDS, calculate_risk_components_batch,
+                  calculate_risk_scores_batch, extract_business_features_batch)
+
+DEFAULT_MARGIN = 0.05
+
+# Lowest value of each tiered risk component (see calculate_advanced_risk_score)
+COMPONENT_FLOORS = {'cash_flow': 0.1, 'debt_ratio': 0.15, 'profitability': 0.1, 'maturity': 0.1}
+
+TIERS = ('rules', 'ensemble', 'student')
+
+# Cascade tier that scores escalated rows for each model tier
+MODEL_TIER_NAMES = {'full': 'ensemble', 'fast': 'student'}
+
+
+def parse_bands(spec: str) -> List[Tuple[float, float]]:
+    """Routing bands from ``"lo-hi,lo-hi"``"""
+    bands = []
+    for part in spec.split(','):
+        low, high = (float(x) for x in part.split('-'))
+        if low > high:
+            raise ValueError(f"Routing band {part} is empty")
+        bands.append((low, high))
+    return bands
+
+
+def default_bands() -> List[Tuple[float, float]]:
+    spec = os.getenv('CASCADE_BANDS')
+    if spec:
+        return parse_bands(spec)
+    return [(round(threshold - DEFAULT_MARGIN, 4), round(threshold + DEFAULT_MARGIN, 4))
+            for threshold in RISK_THRESHOLDS]
+
+
+def clear_cut(features: pd.DataFrame, components: pd.DataFrame) -> np.ndarray:
+    """Rows the rule engine is confident about whatever their score"""
+    critical = features['multiple_critical_risks'].to_numpy(dtype=float) > 0.5
+    at_floor = np.ones(len(components), dtype=bool)
+    for component, floor in COMPONENT_FLOORS.items():
+        at_floor &= components[component].to_numpy() == floor
+    return critical | at_floor
+
+
+def in_bands(risk_scores: np.ndarray, bands: List[Tuple[float, float]]) -> np.ndarray:
+    mask = np.zeros(len(risk_scores), dtype=bool)
+    for low, high in bands:
+        mask |= (risk_scores >= low) & (risk_scores <= high)
+    return mask
+
+
+class CascadeMetrics:
+    """Thread-safe row counts and per-tier latency"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rows = 0
+        self.escalated = 0
+        self.unavailable = 0
+        self.tier_rows = {tier: 0 for tier in TIERS}
+        self.tier_seconds = {tier: 0.0 for tier in TIERS}
+        self.tier_calls = {tier: 0 for tier in TIERS}
+
+    def record(self, rows: int, escalated: int, unavailable: int, seconds: Dict[str, float]):
+        """Count one scored batch; ``seconds`` holds the time spent in each tier used"""
+        with self.lock:
+            self.rows += rows
+            self.escalated += escalated
+            self.unavailable += unavailable
+            for tier, elapsed in seconds.items():
+                self.tier_rows[tier] += rows if tier == 'rules' else escalated - unavailable
+                self.tier_seconds[tier] += elapsed
+                self.tier_calls[tier] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'rows': self.rows,
+                'escalated': self.escalated,
+                'escalated_fraction': self.escalated / self.rows if self.rows else 0.0,
+                'escalation_unavailable': self.unavailable,
+                'tiers': {tier: {
+                    'calls': self.tier_calls[tier],
+                    'rows': self.tier_rows[tier],
+                    'seconds': round(self.tier_seconds[tier], 6),
+                    'mean_ms_per_call': (1000 * self.tier_seconds[tier] / self.tier_calls[tier]
+                                         if self.tier_calls[tier] else None),
+                } for tier in TIERS},
+            }
+
+
+class ScoringCascade:
+    """Rule engine first, the saved ensemble only for rows near a risk level threshold"""
+
+    def __init__(self, artifacts: Any = None, bands: Optional[List[Tuple[float, float]]] = None,
+                 metrics: Optional[CascadeMetrics] = None):
+        self.artifacts = artifacts
+        self.bands = default_bands() if bands is None else bands
+        self.metrics = metrics or CascadeMetrics()
+
+    def score(self, data: pd.DataFrame, model_tier: str = 'full', artifacts: Any = None,
+              weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+        """
+        risk_score, confidence, key_factors, tier, model_score, model_spread
+        and member_scores (a dict per escalated row, for an ensemble) for
+        valid ``BusinessData`` rows (plus the model's input columns, if any).
+        
+        ``artifacts`` and ``weights`` replace the cascade's model and the
+        global component weights (e.g. with those of a segment).
+        """
+        artifacts = self.artifacts if artifacts is None else artifacts
+        start = time.perf_counter()
+        features = extract_business_features_batch(data)
+        scores = calculate_risk_scores_batch(features, COMPONENT_WEIGHTS if weights is None else weights)
+        risk_score = scores['risk_score'].to_numpy().copy()
+        escalate = in_bands(risk_score, self.bands) & ~clear_cut(features, calculate_risk_components_batch(features))
+        seconds = {'rules': time.perf_counter() - start}
+
+        tier = np.full(len(data), 'rules', dtype=object)
+        model_score = np.full(len(data), np.nan)
+        model_spread = np.full(len(data), np.nan)
+        member_scores = np.full(len(data), None, dtype=object)
+        confidence = scores['confidence'].to_numpy().copy()
+        available = (artifacts.rows_covered(data) if artifacts is not None
+                     else np.zeros(len(data), dtype=bool))
+        n_escalated = int(escalate.sum())
+        n_unavailable = int((escalate & ~available).sum())
+        escalate &= available
+        if escalate.any():
+            start = time.perf_counter()
+            model = artifacts.score(data[escalate], model_tier)
+            seconds[MODEL_TIER_NAMES[model_tier]] = time.perf_counter() - start
+            model_score[escalate] = model['model_score'].to_numpy()
+            model_spread[escalate] = model['model_spread'].to_numpy()
+            members = model.columns[2:]
+            if len(members):
+                member_scores[escalate] = model[members].to_dict('records')
+            risk_score[escalate] = model_score[escalate]
+            tier[escalate] = MODEL_TIER_NAMES[model_tier]
+            confidence[escalate] = artifacts.confidence(model_score[escalate], model_spread[escalate])
+
+        self.metrics.record(len(data), n_escalated, n_unavailable, seconds)
+        return pd.DataFrame({
+            'risk_score': risk_score,
+            'confidence': confidence,
+            'key_factors': scores['key_factors'].to_numpy(),
+            'tier': tier,
+            'model_score': model_score,
+            'model_spread': model_spread,
+            'member_scores': member_scores,
+        }, index=data.index)
@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+Input Drift Monitoring
+======================
+
+Compares the inputs the API is serving with the data the model was trained
+on, in constant memory however much traffic arrives.
+
+- Every numeric input (the ``BusinessData`` fields, the model's numeric
+  inputs, ``risk_score`` and ``model_score``) feeds a KLL quantile sketch:
+  a stack of compactors whose capacities shrink geometrically below the
+  top, each holding items of weight ``2 ** level``. A full compactor sorts
+  its items and promotes every other one (random offset) to the level
+  above, so a sketch holds about ``3 * DRIFT_SKETCH_K`` items whatever the
+  row count, and any quantile is within about 1% of rank.
+- ``industryType``, ``location`` and the model's label-encoded inputs feed a
+  count-min sketch (``depth`` rows of ``width`` counters, each row with its
+  own hash) plus the ``CMS_TOP_K`` most frequent categories seen, so a
+  category's frequency is overestimated by at most ``e / width`` of the
+  rows with probability ``1 - e ** -depth``.
+- Both sketches merge exactly as if one sketch had seen both streams, so
+  each worker persists its sketches to ``DRIFT_DIR/worker-<pid>.pkl``
+  (every ``DRIFT_FLUSH_SECONDS``) and ``/drift`` merges all workers'.
+- Sketches are kept per time window (``DRIFT_WINDOW_SECONDS``, default one
+  hour, aligned to the epoch so workers agree), for the current and the
+  previous window only.
+- ``record`` only puts the rows on an in-memory queue. A background thread
+  updates the sketches a batch at a time, so ``/predict`` never waits on
+  them. When the queue is full, rows are dropped and counted rather than
+  blocking.
+
+``report`` gives, per input, the PSI (over the reference's deciles, or its
+categories) and, for numeric inputs, the KS statistic against the training
+reference (``drift_reference.pkl``, written by training as
+``sophisticated_drift_reference.pkl``) and against the previous window.
+Inputs without a training reference (the ``BusinessData`` fields) are only
+compared with the previous window. PSI below 0.1 is ``stable``, below 0.25
+``moderate`` and above that ``significant``.
+"""
+
+import glob
+import os
+import pickle
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from main import BUSINESS_FIELDS, BusinessData
+from model_artifacts import DEFAULT_MODEL_DIR
+
+DEFAULT_DRIFT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'drift')
+REFERENCE_FILE = 'drift_reference.pkl'
+
+DRIFT_SKETCH_K = 200
+CMS_WIDTH = 2048
+CMS_DEPTH = 4
+CMS_TOP_K = 100
+
+# One 16-byte siphash key per count-min row
+HASH_KEYS = [f'msme-drift-{row:05d}' for row in range(CMS_DEPTH)]
+
+PSI_BINS = 10
+PSI_FLOOR = 1e-4
+PSI_THRESHOLDS = ((0.1, 'stable'), (0.25, 'moderate'))
+
+# Inputs that are categorical without a training reference saying so
+CATEGORICAL_FIELDS = [name for name in BUSINESS_FIELDS if BusinessData.model_fields[name].annotation is str]
+SCORE_FIELDS = ['risk_score', 'model_score']
+
+
+class KLLSketch:
+    """Mergeable quantile sketch of a stream of numbers"""
+
+    kind = 'numeric'
+
+    def __init__(self, k: int = DRIFT_SKETCH_K):
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.count = 0
+        self.rng = np.random.default_rng()
+
+    def _capacity(self, level: int) -> int:
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - 1 - level))))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                odd = len(items) % 2
+                promoted = items[odd:][self.rng.integers(2)::2]
+                self.levels[level] = items[:odd]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values):
+            self.count += len(values)
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2.0 ** level)
+                                  for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def cdf(self, x: np.ndarray) -> np.ndarray:
+        """Fraction of the stream <= each of ``x``"""
+        items, cumulative = self._weighted()
+        if not len(items):
+            return np.zeros(len(x))
+        index = np.searchsorted(items, x, side='right')
+        return np.where(index > 0, cumulative[np.maximum(index - 1, 0)], 0.0) / cumulative[-1]
+
+    def quantiles(self, q: np.ndarray) -> np.ndarray:
+        items, cumulative = self._weighted()
+        if not len(items):
+            return np.full(len(q), np.nan)
+        index = np.searchsorted(cumulative, np.asarray(q) * cumulative[-1], side='left')
+        return items[np.minimum(index, len(items) - 1)]
+
+    def support(self) -> np.ndarray:
+        return np.concatenate(self.levels)
+
+    @property
+    def size(self) -> int:
+        return sum(len(items) for items in self.levels)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'kind': self.kind, 'k': self.k, 'count': self.count, 'levels': [items.copy() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'KLLSketch':
+        sketch = cls(state['k'])
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in state['levels']]
+        sketch.count = state['count']
+        return sketch
+
+
+def hash_rows(keys: pd.Series, width: int) -> np.ndarray:
+    """(depth, len(keys)) counter columns of each key in each count-min row"""
+    keys = pd.Series(np.asarray(keys, dtype=object), dtype=object)
+    return np.stack([pd.util.hash_pandas_object(keys, index=False, hash_key=hash_key).to_numpy() % np.uint64(width)
+                     for hash_key in HASH_KEYS]).astype(np.int64)
+
+
+class CountMinSketch:
+    """Mergeable frequency sketch of a stream of categories, with its most frequent categories"""
+
+    kind = 'categorical'
+
+    def __init__(self, width: int = CMS_WIDTH, top_k: int = CMS_TOP_K):
+        self.width = width
+        self.top_k = top_k
+        self.table = np.zeros((CMS_DEPTH, width), dtype=np.int64)
+        self.count = 0
+        self.top: List[str] = []
+
+    def estimate(self, keys: List[str]) -> np.ndarray:
+        if not len(keys):
+            return np.zeros(0, dtype=np.int64)
+        columns = hash_rows(pd.Series(keys), self.width)
+        return self.table[np.arange(CMS_DEPTH)[:, None], columns].min(axis=0)
+
+    def _keep_top(self, candidates: List[str]):
+        candidates = list(dict.fromkeys(candidates))
+        estimates = self.estimate(candidates)
+        order = np.argsort(-estimates, kind='stable')[:self.top_k]
+        self.top = [candidates[i] for i in order]
+
+    def update(self, values: pd.Series):
+        values = values.dropna().astype(str)
+        if not len(values):
+            return
+        counts = values.value_counts(sort=False)
+        columns = hash_rows(counts.index.to_series(), self.width)
+        for row in range(CMS_DEPTH):
+            np.add.at(self.table[row], columns[row], counts.to_numpy())
+        self.count += len(values)
+        self._keep_top(self.top + counts.nlargest(self.top_k).index.tolist())
+
+    def merge(self, other: 'CountMinSketch') -> 'CountMinSketch':
+        self.table += other.table
+        self.count += other.count
+        self._keep_top(self.top + other.top)
+        return self
+
+    def frequencies(self, keys: List[str]) -> np.ndarray:
+        return self.estimate(keys) / self.count if self.count else np.zeros(len(keys))
+
+    @property
+    def size(self) -> int:
+        return self.table.size + len(self.top)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'kind': self.kind, 'width': self.width, 'top_k': self.top_k, 'count': self.count,
+                'table': self.table.copy(), 'top': list(self.top)}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'CountMinSketch':
+        sketch = cls(state['width'], state['top_k'])
+        sketch.table = np.asarray(state['table'], dtype=np.int64)
+        sketch.count = state['count']
+        sketch.top = list(state['top'])
+        return sketch
+
+
+SKETCHES = {'numeric': KLLSketch, 'categorical': CountMinSketch}
+Sketch = Union[KLLSketch, CountMinSketch]
+
+
+def sketch_from_dict(state: Dict[str, Any]) -> Sketch:
+    return SKETCHES[state['kind']].from_dict(state)
+
+
+class ReferenceQuantiles:
+    """Training distribution of a numeric input, from its quantiles at evenly spaced probabilities"""
+
+    kind = 'numeric'
+
+    def __init__(self, entry: Dict[str, Any]):
+        self.values = np.asarray(entry['quantiles'], dtype=np.float64)
+        self.count = entry['count']
+        self.levels = np.linspace(0, 1, len(self.values))
+
+    def cdf(self, x: np.ndarray) -> np.ndarray:
+        index = np.searchsorted(self.values, x, side='right')
+        return np.where(index >= len(self.values), 1.0, self.levels[np.maximum(index - 1, 0)] * (index > 0))
+
+    def quantiles(self, q: np.ndarray) -> np.ndarray:
+        return np.interp(q, self.levels, self.values)
+
+    def support(self) -> np.ndarray:
+        return self.values
+
+
+class ReferenceCounts:
+    """Training distribution of a categorical input"""
+
+    kind = 'categorical'
+
+    def __init__(self, entry: Dict[str, Any]):
+        self.counts = entry['counts']
+        self.count = entry['count']
+        self.top = sorted(self.counts, key=self.counts.get, reverse=True)
+
+    def frequencies(self, keys: List[str]) -> np.ndarray:
+        return np.array([self.counts.get(key, 0) for key in keys], dtype=np.float64) / max(self.count, 1)
+
+
+REFERENCES = {'numeric': ReferenceQuantiles, 'categorical': ReferenceCounts}
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray) -> float:
+    expected = np.maximum(expected, PSI_FLOOR)
+    actual = np.maximum(actual, PSI_FLOOR)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def psi_status(psi: float) -> str:
+    for threshold, status in PSI_THRESHOLDS:
+        if psi < threshold:
+            return status
+    return 'significant'
+
+
+def compare(expected: Any, actual: Any) -> Dict[str, Any]:
+    """PSI (and KS, for numeric inputs) of ``actual`` against ``expected``"""
+    if expected.kind == 'numeric':
+        edges = np.unique(expected.quantiles(np.arange(1, PSI_BINS) / PSI_BINS))
+        bins = lambda distribution: np.diff(np.concatenate([[0.0], distribution.cdf(edges), [1.0]]))
+        psi = population_stability_index(bins(expected), bins(actual))
+        points = np.concatenate([expected.support(), actual.support()])
+        ks = float(np.abs(expected.cdf(points) - actual.cdf(points)).max())
+    else:
+        categories = list(dict.fromkeys(expected.top + actual.top))
+        expected_share, actual_share = expected.frequencies(categories), actual.frequencies(categories)
+        # Everything else, as one more bin
+        expected_share = np.append(expected_share, max(1 - expected_share.sum(), 0.0))
+        actual_share = np.append(actual_share, max(1 - actual_share.sum(), 0.0))
+        psi, ks = population_stability_index(expected_share, actual_share), None
+    return {'psi': round(psi, 4), 'ks': None if ks is None else round(ks, 4), 'status': psi_status(psi)}
+
+
+def describe(sketch: Sketch) -> Dict[str, Any]:
+    if sketch.kind == 'numeric':
+        quantiles = sketch.quantiles(np.array([0.05, 0.25, 0.5, 0.75, 0.95]))
+        return {name: round(float(value), 4) for name, value in zip(('p05', 'p25', 'p50', 'p75', 'p95'), quantiles)}
+    top = sketch.top[:5]
+    return {'top': {category: round(float(share), 4) for category, share in zip(top, sketch.frequencies(top))}}
+
+
+class DriftMonitor:
+    """Per-window input sketches for one worker, with the training reference and the other workers' sketches"""
+
+    def __init__(self, reference: Optional[Dict[str, Dict[str, Any]]] = None, drift_dir: Optional[str] = None,
+                 window_seconds: Optional[float] = None, flush_seconds: Optional[float] = None,
+                 max_queue: int = 10_000):
+        self.reference = {name: REFERENCES[entry['kind']](entry) for name, entry in (reference or {}).items()}
+        self.drift_dir = drift_dir or os.getenv('DRIFT_DIR') or DEFAULT_DRIFT_DIR
+        os.makedirs(self.drift_dir, exist_ok=True)
+        self.path = os.path.join(self.drift_dir, f'worker-{os.getpid()}.pkl')
+        self.window_seconds = window_seconds or float(os.getenv('DRIFT_WINDOW_SECONDS', 3600))
+        self.flush_seconds = flush_seconds or float(os.getenv('DRIFT_FLUSH_SECONDS', 10))
+        # Only these inputs are sketched, so arbitrary modelInputs keys cannot grow memory
+        self.fields = {name: ('categorical' if name in CATEGORICAL_FIELDS else 'numeric')
+                       for name in BUSINESS_FIELDS + SCORE_FIELDS}
+        self.fields.update({name: entry.kind for name, entry in self.reference.items()})
+        self.windows: Dict[int, Dict[str, Sketch]] = {}
+        self.lock = threading.Lock()
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.rows = 0
+        self.dirty = False
+        self.writer = threading.Thread(target=self._write_loop, name='drift-monitor', daemon=True)
+        self.writer.start()
+
+    @classmethod
+    def load(cls, model_dir: Optional[str] = None, **kwargs) -> 'DriftMonitor':
+        """Monitor with the training reference in ``model_dir``, if there is one"""
+        path = os.path.join(model_dir or os.getenv('MODEL_DIR') or DEFAULT_MODEL_DIR, REFERENCE_FILE)
+        reference = None
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                reference = pickle.load(f)
+        return cls(reference, **kwargs)
+
+    def window_of(self, ts: float) -> int:
+        return int(ts // self.window_seconds)
+
+    def record(self, rows: Union[pd.DataFrame, List[Dict[str, Any]]], ts: Optional[float] = None):
+        """
+        Queue scored rows (inputs plus risk_score/model_score), as a frame or
+        a list of dicts, for the sketches (never blocks)
+        """
+        try:
+            self.queue.put_nowait((time.time() if ts is None else ts, rows))
+        except queue.Full:
+            self.dropped += len(rows)
+
+    def _update(self, window: int, rows: pd.DataFrame):
+        with self.lock:
+            sketches = self.windows.setdefault(window, {})
+            for name, kind in self.fields.items():
+                if name not in rows.columns:
+                    continue
+                sketch = sketches.get(name)
+                if sketch is None:
+                    sketch = sketches[name] = SKETCHES[kind]()
+                if kind == 'numeric':
+                    sketch.update(pd.to_numeric(rows[name], errors='coerce').to_numpy(dtype=np.float64))
+                else:
+                    sketch.update(rows[name])
+            for old in [old for old in self.windows if old < window - 1]:
+                del self.windows[old]
+            self.rows += len(rows)
+            self.dirty = True
+
+    def _write_loop(self):
+        last_persist = time.monotonic()
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.flush_seconds)]
+            except queue.Empty:
+                batch = []
+            while batch and batch[-1] is not None:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = bool(batch) and batch[-1] is None
+            windows: Dict[int, List[pd.DataFrame]] = {}
+            for ts, rows in (item for item in batch if item is not None):
+                windows.setdefault(self.window_of(ts), []).append(
+                    rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows))
+            for window, frames in sorted(windows.items()):
+                self._update(window, pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0])
+            for _ in batch:
+                self.queue.task_done()
+            if stop:
+                self.persist()
+                return
+            if time.monotonic() - last_persist >= self.flush_seconds:
+                self.persist()
+                last_persist = time.monotonic()
+
+    def flush(self):
+        """Block until every queued row is in the sketches"""
+        self.queue.join()
+
+    def snapshot(self) -> Dict[int, Dict[str, Dict[str, Any]]]:
+        with self.lock:
+            return {window: {name: sketch.to_dict() for name, sketch in sketches.items()}
+                    for window, sketches in self.windows.items()}
+
+    def persist(self):
+        """Write this worker's sketches for the other workers (atomically)"""
+        if not self.dirty:
+            return
+        self.dirty = False
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self.snapshot(), f)
+        os.replace(tmp_path, self.path)
+
+    def merged(self, window: int) -> Dict[str, Any]:
+        """Sketches of ``window`` merged over this worker (live) and every other worker (persisted)"""
+        workers = 1
+        merged = {name: sketch_from_dict(state) for name, state in self.snapshot().get(window, {}).items()}
+        for path in glob.glob(os.path.join(self.drift_dir, 'worker-*.pkl')):
+            if os.path.abspath(path) == os.path.abspath(self.path):
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    states = pickle.load(f).get(window)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                continue
+            if not states:
+                continue
+            workers += 1
+            for name, state in states.items():
+                sketch = sketch_from_dict(state)
+                if name in merged:
+                    merged[name].merge(sketch)
+                else:
+                    merged[name] = sketch
+        return {'workers': workers, 'sketches': merged}
+
+    def report(self, window: str = 'current') -> Dict[str, Any]:
+        """Drift of every sketched input in the current (or previous) window"""
+        current = self.window_of(time.time()) - (window == 'previous')
+        this, previous = self.merged(current), self.merged(current - 1)
+        inputs = {}
+        for name, sketch in sorted(this['sketches'].items()):
+            if not sketch.count:
+                continue
+            reference = self.reference.get(name)
+            baseline = previous['sketches'].get(name)
+            inputs[name] = {
+                'kind': sketch.kind,
+                'count': sketch.count,
+                'summary': describe(sketch),
+                'reference': compare(reference, sketch) if reference is not None and reference.count else None,
+                'previous_window': compare(baseline, sketch) if baseline is not None and baseline.count else None,
+            }
+        drifted = [name for name, entry in inputs.items()
+                   if entry['reference'] is not None and entry['reference']['status'] == 'significant']
+        return {
+            'window': {'start': current * self.window_seconds, 'end': (current + 1) * self.window_seconds,
+                       'seconds': self.window_seconds},
+            'workers': this['workers'],
+            'rows_recorded': self.rows,
+            'rows_dropped': self.dropped,
+            'reference_inputs': sorted(self.reference),
+            'drifted': drifted,
+            'inputs': inputs,
+        }
+
+    def close(self):
+        self.queue.put(None)
+        self.writer.join()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Bulk Scoring Job Queue
+======================
+
+Background scoring of uploaded portfolios, so large files never have to be
+scored inside one HTTP request.
+
+- Jobs and their progress live in a SQLite database (WAL mode), so status
+  survives a restart. Queued or interrupted jobs are resubmitted on startup.
+- A fixed pool of worker threads bounds how many jobs are scored at once.
+  The number of jobs waiting for a worker is also capped.
+- Uploads are split into shards with ``batch_score.plan_shards``. Progress
+  is reported per shard, and cancellation is checked between shards.
+- Results are appended shard by shard to one Parquet file, which is
+  renamed into place only when the job completes.
+"""
+
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import pyarrow.parquet as pq
+
+from batch_score import plan_shards, read_shard, score_frame, scored_table
+from model_artifacts import ModelArtifacts
+
+DEFAULT_JOB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs')
+
+# Job states; a job ends in exactly one of the terminal ones
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED = 'queued', 'running', 'completed', 'failed', 'cancelled'
+TERMINAL_STATES = (COMPLETED, FAILED, CANCELLED)
+
+UPLOAD_FORMATS = ('csv', 'parquet')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    format TEXT NOT NULL,
+    id_column TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    total_chunks INTEGER,
+    done_chunks INTEGER NOT NULL DEFAULT 0,
+    rows INTEGER NOT NULL DEFAULT 0,
+    invalid_rows INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+)
+"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job was cancelled"""
+
+
+class QueueFullError(Exception):
+    """Raised when the number of waiting jobs is at its limit"""
+
+
+class JobStore:
+    """SQLite-backed job records; one short-lived connection per call"""
+
+    def __init__(self, job_dir: str):
+        self.job_dir = job_dir
+        os.makedirs(job_dir, exist_ok=True)
+        self.db_path = os.path.join(job_dir, 'jobs.sqlite')
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def create(self, job_id: str, fmt: str, id_column: Optional[str]):
+        with self._connect() as conn:
+            conn.execute('INSERT INTO jobs (id, status, format, id_column, created_at) VALUES (?, ?, ?, ?, ?)',
+                         (job_id, QUEUED, fmt, id_column, time.time()))
+
+    def update(self, job_id: str, **fields):
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f'UPDATE jobs SET {assignments} WHERE id = ?', (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def with_status(self, *statuses: str) -> List[Dict[str, Any]]:
+        marks = ', '.join('?' for _ in statuses)
+        with self._connect() as conn:
+            rows = conn.execute(f'SELECT * FROM jobs WHERE status IN ({marks}) ORDER BY created_at',
+                                statuses).fetchall()
+        return [dict(row) for row in rows]
+
+    def request_cancel(self, job_id: str) -> bool:
+        """Flag a job for cancellation; False if it already finished"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status NOT IN "
+                f"({', '.join('?' for _ in TERMINAL_STATES)})", (job_id, *TERMINAL_STATES))
+        return cursor.rowcount > 0
+
+
+class JobQueue:
+    """Bounded pool of workers scoring jobs from a ``JobStore``"""
+
+    def __init__(self, job_dir: Optional[str] = None, workers: Optional[int] = None,
+                 max_pending: Optional[int] = None, shard_rows: int = 50_000,
+                 artifacts: Optional[ModelArtifacts] = None):
+        self.store = JobStore(job_dir or os.getenv('JOB_DIR') or DEFAULT_JOB_DIR)
+        self.workers = workers or int(os.getenv('JOB_WORKERS', 2))
+        self.max_pending = max_pending or int(os.getenv('JOB_MAX_PENDING', 100))
+        self.shard_rows = shard_rows
+        self.artifacts = artifacts
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='scoring-job')
+        self.lock = threading.Lock()
+        self.pending = 0
+
+    def job_path(self, job_id: str, name: str) -> str:
+        return os.path.join(self.store.job_dir, job_id, name)
+
+    def input_path(self, job_id: str, fmt: str) -> str:
+        return self.job_path(job_id, f'input.{fmt}')
+
+    def result_path(self, job_id: str) -> str:
+        return self.job_path(job_id, 'result.parquet')
+
+    def new_job_id(self) -> str:
+        job_id = uuid.uuid4().hex
+        os.makedirs(os.path.join(self.store.job_dir, job_id))
+        return job_id
+
+    def submit(self, job_id: str, fmt: str, id_column: Optional[str] = 'businessId') -> Dict[str, Any]:
+        """Queue an uploaded input (already written to ``input_path``)"""
+        if fmt not in UPLOAD_FORMATS:
+            raise ValueError(f"Unsupported format '{fmt}'. Choose from: {', '.join(UPLOAD_FORMATS)}")
+        with self.lock:
+            if self.pending >= self.max_pending:
+                raise QueueFullError(f"{self.pending} jobs are already waiting")
+            self.pending += 1
+        self.store.create(job_id, fmt, id_column)
+        self.pool.submit(self._run, job_id)
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a job; queued jobs stop before starting, running ones after the current shard"""
+        if self.store.request_cancel(job_id):
+            job = self.store.get(job_id)
+            if job['status'] == QUEUED:
+                self.store.update(job_id, status=CANCELLED, finished_at=time.time())
+        return self.store.get(job_id)
+
+    def recover(self) -> int:
+        """Resubmit jobs left queued or running by a previous process"""
+        jobs = self.store.with_status(QUEUED, RUNNING)
+        for job in jobs:
+            self.store.update(job['id'], status=QUEUED, done_chunks=0, rows=0, invalid_rows=0)
+            with self.lock:
+                self.pending += 1
+            self.pool.submit(self._run, job['id'])
+        return len(jobs)
+
+    def delete_files(self, job_id: str):
+        shutil.rmtree(os.path.join(self.store.job_dir, job_id), ignore_errors=True)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job_id: str):
+        with self.lock:
+            self.pending -= 1
+        job = self.store.get(job_id)
+        if job is None or job['status'] in TERMINAL_STATES:
+            return
+        if job['cancel_requested']:
+            self.store.update(job_id, status=CANCELLED, finished_at=time.time())
+            return
+
+        tmp_path = self.result_path(job_id) + '.tmp'
+        try:
+            shards = plan_shards([self.input_path(job_id, job['format'])], self.shard_rows)
+            if not shards:
+                raise ValueError("Upload contains no rows")
+            self.store.update(job_id, status=RUNNING, started_at=time.time(), total_chunks=len(shards))
+            self._score(job_id, job['id_column'], shards, tmp_path)
+            os.replace(tmp_path, self.result_path(job_id))
+            self.store.update(job_id, status=COMPLETED, finished_at=time.time())
+        except JobCancelled:
+            self.store.update(job_id, status=CANCELLED, finished_at=time.time())
+        except Exception as e:
+            self.store.update(job_id, status=FAILED, finished_at=time.time(), error=str(e))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _score(self, job_id: str, id_column: Optional[str], shards: List[Dict[str, Any]], path: str):
+        writer, rows, invalid = None, 0, 0
+        try:
+            for done, shard in enumerate(shards, start=1):
+                if self.store.get(job_id)['cancel_requested']:
+                    raise JobCancelled(job_id)
+                scored = score_frame(read_shard(shard), self.artifacts, id_column)
+                table = scored_table(scored)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                rows += len(scored)
+                invalid += int(scored['risk_score'].isna().sum())
+                self.store.update(job_id, done_chunks=done, rows=rows, invalid_rows=invalid)
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+def job_status(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a job record"""
+    total = job['total_chunks']
+    return {
+        'job_id': job['id'],
+        'status': job['status'],
+        'format': job['format'],
+        'chunks_done': job['done_chunks'],
+        'chunks_total': total,
+        'progress': round(job['done_chunks'] / total, 4) if total else (1.0 if job['status'] == COMPLETED else 0.0),
+        'rows_scored': job['rows'],
+        'invalid_rows': job['invalid_rows'],
+        'cancel_requested': bool(job['cancel_requested']),
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at'],
+    }
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Live Re-scoring Sessions
+========================
+
+Incremental risk scoring for forms that are edited field by field.
+
+- A session keeps the validated field values and every intermediate value
+  of the risk score (features, risk components, weighted terms, the
+  compound-risk multiplier).
+- Each intermediate value is a node of a dependency graph over the
+  ``BusinessData`` fields. When fields change, only the nodes downstream
+  of them are recomputed; e.g. ``digitalPresence`` touches only
+  ``operational_risk``, ``growth_potential`` and their components and
+  weighted terms.
+- ``serve`` runs a session over a WebSocket. Field updates that arrive in
+  a burst are coalesced and scored once, ``debounce`` seconds after the
+  last one (and at most ``max_delay`` seconds after the first).
+
+The node formulas are those of ``calculate_advanced_risk_score``, and the
+terms are weighted with the risk weights of the business's segment, so a
+session's score equals ``/predict`` for the same fields.
+"""
+
+import asyncio
+import os
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+import main
+from main import (BUSINESS_FIELDS, BusinessData, COMPONENT_WEIGHTS, KEY_FACTOR_COMPONENTS,
+                  determine_risk_level)
+
+LIVE_DEBOUNCE = float(os.getenv('LIVE_DEBOUNCE_SECONDS', 0.15))
+LIVE_MAX_DELAY = float(os.getenv('LIVE_MAX_DELAY_SECONDS', 1.0))
+
+
+def _segment_weights(industry: str, location: str) -> Tuple[str, Dict[str, float]]:
+    """(segment key, component weights), read from the router created at startup"""
+    if main.segment_router is None:
+        return 'global', COMPONENT_WEIGHTS
+    return main.segment_router.weights(industry, location)
+
+
+def _tiered(value: float, tiers: List[Tuple[Callable[[float], bool], float]], default: float) -> float:
+    for test, risk in tiers:
+        if test(value):
+            return risk
+    return default
+
+
+# Every intermediate value of the risk score: name -> (inputs, formula), in dependency order.
+# Inputs are BusinessData fields or earlier nodes; formulas read them from the session values.
+NODES: Dict[str, Tuple[Tuple[str, ...], Callable[[Dict[str, Any]], float]]] = {
+    # Features
+    'profitability_ratio': (('revenue', 'expenses'),
+                            lambda v: (v['revenue'] - v['expenses']) / max(v['revenue'], 1)),
+    'debt_to_asset_ratio': (('debt', 'assets'), lambda v: v['debt'] / max(v['assets'], 1)),
+    'cash_flow_ratio': (('cashFlow', 'revenue'), lambda v: (v['cashFlow'] * 12) / max(v['revenue'], 1)),
+    'business_maturity_score': (('yearsInBusiness',), lambda v: min(v['yearsInBusiness'] / 10, 1.0)),
+    'market_risk_score': (('competitionLevel', 'marketGrowth'),
+                          lambda v: v['competitionLevel'] * (100 - v['marketGrowth']) / 100),
+    'operational_risk': (('customerRetention', 'digitalPresence'),
+                         lambda v: (100 - v['customerRetention']) + (10 - v['digitalPresence'])),
+    'is_cash_flow_negative': (('cashFlow',), lambda v: 1.0 if v['cashFlow'] < 0 else 0.0),
+    'is_unprofitable': (('revenue', 'expenses'), lambda v: 1.0 if v['revenue'] <= v['expenses'] else 0.0),
+    'is_overleveraged': (('debt', 'assets'), lambda v: 1.0 if v['debt'] > v['assets'] else 0.0),
+    'is_new_business': (('yearsInBusiness',), lambda v: 1.0 if v['yearsInBusiness'] < 2 else 0.0),
+    'multiple_critical_risks': (('is_cash_flow_negative', 'is_unprofitable', 'is_overleveraged', 'is_new_business'),
+                                lambda v: (v['is_cash_flow_negative'] + v['is_unprofitable'] +
+                                           v['is_overleveraged'] + v['is_new_business']) / 4.0),
+    'growth_potential': (('innovationScore', 'digitalPresence'),
+                         lambda v: (v['innovationScore'] + v['digitalPresence']) / 20),
+
+    # Risk components
+    'cash_flow': (('is_cash_flow_negative', 'cash_flow_ratio'),
+                  lambda v: 0.9 if v['is_cash_flow_negative'] == 1.0 else
+                  _tiered(v['cash_flow_ratio'], [(lambda x: x < 0.05, 0.7), (lambda x: x < 0.1, 0.4)], 0.1)),
+    'debt_ratio': (('debt_to_asset_ratio',),
+                   lambda v: _tiered(v['debt_to_asset_ratio'], [(lambda x: x > 3.0, 0.95), (lambda x: x > 1.5, 0.85),
+                                                                 (lambda x: x > 1.0, 0.7), (lambda x: x > 0.5, 0.4)],
+                                     0.15)),
+    'profitability': (('is_unprofitable', 'profitability_ratio'),
+                      lambda v: 0.8 if v['is_unprofitable'] == 1.0 else
+                      _tiered(v['profitability_ratio'], [(lambda x: x < 0.05, 0.6), (lambda x: x < 0.1, 0.3)], 0.1)),
+    'maturity': (('is_new_business', 'business_maturity_score'),
+                 lambda v: 0.7 if v['is_new_business'] == 1.0 else
+                 _tiered(v['business_maturity_score'], [(lambda x: x < 0.3, 0.5), (lambda x: x < 0.5, 0.3)], 0.1)),
+    'market': (('market_risk_score',), lambda v: min(v['market_risk_score'] / 100, 0.8)),
+    'operational': (('operational_risk',), lambda v: min(v['operational_risk'] / 100, 0.8)),
+    'growth': (('growth_potential',), lambda v: 1.0 - v['growth_potential']),
+
+    # Compound-risk multiplier and confidence
+    'critical_multiplier': (('multiple_critical_risks',),
+                            lambda v: _tiered(v['multiple_critical_risks'], [(lambda x: x > 0.5, 1.2),
+                                                                             (lambda x: x > 0.25, 1.1)], 1.0)),
+    'confidence': (('multiple_critical_risks',),
+                   lambda v: _tiered(v['multiple_critical_risks'], [(lambda x: x > 0.5, 0.95),
+                                                                    (lambda x: x == 0, 0.90)], 0.85)),
+}
+
+# Segment and its component weights, then the weighted term of each risk component
+NODES['segment'] = (('industryType', 'location'), lambda v: _segment_weights(v['industryType'], v['location']))
+NODES.update({f'{component}_term': ((component, 'segment'), lambda v, c=component: v[c] * v['segment'][1][c])
+              for component in COMPONENT_WEIGHTS})
+
+TERMS = [f'{component}_term' for component in COMPONENT_WEIGHTS]
+
+
+def _downstream(changed: Set[str]) -> List[str]:
+    """Nodes that depend (directly or not) on ``changed``, in dependency order"""
+    dirty = set(changed)
+    order = []
+    for name, (inputs, _) in NODES.items():
+        if dirty.intersection(inputs):
+            dirty.add(name)
+            order.append(name)
+    return order
+
+
+# Nodes to recompute when each field changes
+FIELD_DEPENDENTS = {field: _downstream({field}) for field in BUSINESS_FIELDS}
+
+
+class LiveSession:
+    """Validated field values and cached intermediate values of one form"""
+
+    def __init__(self):
+        self.business = BusinessData.model_construct()
+        self.values: Dict[str, Any] = {}
+        self.missing = set(BUSINESS_FIELDS)
+        self.updates = 0
+
+    def set_fields(self, fields: Dict[str, Any]) -> Tuple[Set[str], Dict[str, str]]:
+        """Validate and store changed fields; returns (changed fields, errors by field)"""
+        changed, errors = set(), {}
+        for name, value in fields.items():
+            if name not in FIELD_DEPENDENTS:
+                errors[name] = "Unknown field"
+                continue
+            try:
+                BusinessData.__pydantic_validator__.validate_assignment(self.business, name, value)
+            except ValidationError as e:
+                errors[name] = e.errors()[0]['msg']
+                continue
+            value = getattr(self.business, name)
+            if name in self.missing or self.values[name] != value:
+                self.values[name] = value
+                self.missing.discard(name)
+                changed.add(name)
+        return changed, errors
+
+    def recompute(self, changed: Set[str]) -> List[str]:
+        """Recompute the nodes downstream of ``changed``; returns their names"""
+        if self.missing:
+            return []
+        if len(self.values) == len(BUSINESS_FIELDS):
+            nodes = list(NODES)  # first complete form: compute everything
+        else:
+            dirty = set().union(*(FIELD_DEPENDENTS[field] for field in changed))
+            nodes = [name for name in NODES if name in dirty]
+        for name in nodes:
+            self.values[name] = NODES[name][1](self.values)
+        return nodes
+
+    def prediction(self) -> Dict[str, Any]:
+        """Current risk score, from the cached terms"""
+        total_risk = 0.0
+        for term in TERMS:
+            total_risk += self.values[term]
+        risk_score = min(total_risk * self.values['critical_multiplier'], 1.0)
+        key_factors = [label for component, label in KEY_FACTOR_COMPONENTS if self.values[component] > 0.6]
+        # Rounded like the /predict response (the level is taken from the exact score, as there)
+        return {
+            'segment': self.values['segment'][0],
+            'risk_score': round(risk_score, 4),
+            'risk_level': determine_risk_level(risk_score),
+            'confidence': round(self.values['confidence'], 4),
+            'key_factors': key_factors or ["Overall Business Performance"],
+        }
+
+    def update(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply field changes and return the message for the client"""
+        changed, errors = self.set_fields(fields)
+        recomputed = self.recompute(changed) if changed else []
+        self.updates += 1
+        message: Dict[str, Any] = {'update': self.updates, 'changed': sorted(changed), 'recomputed': recomputed}
+        if errors:
+            message['errors'] = errors
+        if self.missing:
+            message['missing'] = [name for name in BUSINESS_FIELDS if name in self.missing]
+        else:
+            message.update(self.prediction())
+        return message
+
+
+async def serve(websocket: WebSocket, debounce: Optional[float] = None, max_delay: Optional[float] = None):
+    """
+    Score a form live over ``websocket``.
+
+    The client sends JSON objects of changed fields (the first may hold the
+    whole form). Updates are merged, later values winning, and scored once
+    the client pauses for ``debounce`` seconds.
+    """
+    debounce = LIVE_DEBOUNCE if debounce is None else debounce
+    max_delay = LIVE_MAX_DELAY if max_delay is None else max_delay
+    loop = asyncio.get_running_loop()
+    inbox: 'asyncio.Queue[Optional[Any]]' = asyncio.Queue()
+
+    async def read():
+        try:
+            while True:
+                await inbox.put(await websocket.receive_json())
+        except (WebSocketDisconnect, ValueError):
+            await inbox.put(None)
+
+    reader = asyncio.create_task(read())
+    session = LiveSession()
+    pending: Dict[str, Any] = {}
+    first_at = 0.0
+    try:
+        while True:
+            timeout = None
+            if pending:
+                timeout = max(0.0, min(debounce, first_at + max_delay - loop.time()))
+            try:
+                message = await asyncio.wait_for(inbox.get(), timeout)
+            except asyncio.TimeoutError:
+                await websocket.send_json(session.update(pending))
+                pending = {}
+                continue
+            if message is None:
+                return
+            if not isinstance(message, dict):
+                await websocket.send_json({'errors': {'message': "Expected a JSON object of field values"}})
+                continue
+            if not pending:
+                first_at = loop.time()
+            pending.update(message)
+    finally:
+        reader.cancel()
@@ -15,14 +15,20 @@ import pickle
 import logging
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, List
+from functools import lru_cache
+from math import factorial
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, validator
 import uvicorn
 
+from prediction_history import PredictionHistory
+from model_artifacts import model_factors
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -65,6 +71,10 @@ CRITICAL_THRESHOLDS = {
     'competition_level': 7               # >7/10 = high risk
 }
 
+# Financial fields BusinessData rejects when negative, and its message
+NON_NEGATIVE_FINANCIALS = ('revenue', 'expenses', 'debt', 'assets')
+NON_NEGATIVE_MESSAGE = "Financial values must be non-negative"
+
 class BusinessData(BaseModel):
     """
     Input data model for business risk prediction.
@@ -90,16 +100,21 @@ class BusinessData(BaseModel):
     customerRetention: float = Field(ge=0, le=100, description="Customer retention rate (%)")
     digitalPresence: int = Field(ge=1, le=10, description="Digital presence score (1-10)")
     innovationScore: int = Field(ge=1, le=10, description="Innovation score (1-10)")
+    
+    # Tracking
+    businessId: Optional[str] = Field(default=None, description="Business identifier, used to record prediction history")
+    modelInputs: Optional[Dict[str, Any]] = Field(
+        default=None, description="Inputs of the saved ensemble, scored when the cascade escalates (mode=cascade)")
 
     @validator('cashFlow')
     def validate_cash_flow(cls, v):
         # Cash flow can be negative, no restrictions
         return v
     
-    @validator('revenue', 'expenses', 'debt', 'assets')
+    @validator(*NON_NEGATIVE_FINANCIALS)
     def validate_positive_financials(cls, v):
         if v < 0:
-            raise ValueError("Financial values must be non-negative")
+            raise ValueError(NON_NEGATIVE_MESSAGE)
         return v
 
 class PredictionResponse(BaseModel):
@@ -109,6 +124,40 @@ class PredictionResponse(BaseModel):
     confidence: float = Field(description="Model confidence score")
     key_factors: List[str] = Field(description="Most important risk contributors")
     timestamp: str = Field(description="Prediction timestamp")
+    explanation: Optional[Dict[str, float]] = Field(
+        default=None, description="Contribution of each input field to the risk score (explain=true); "
+                                  "log-odds contribution of each modelInputs column when the model scored")
+    baseline_risk_score: Optional[float] = Field(
+        default=None, description="Risk score of the reference business the explanation is relative to")
+    tier: Optional[str] = Field(default=None, description="Scoring tier that produced the score (mode=cascade)")
+    segment: Optional[str] = Field(default=None, description="Industry/location segment whose model and weights were used")
+    model_spread: Optional[float] = Field(
+        default=None, description="Spread (standard deviation) of the ensemble members' probabilities, when the model scored")
+    member_scores: Optional[Dict[str, float]] = Field(
+        default=None, description="Failure probability of each ensemble member, when the model scored")
+
+class RowErrors(BaseModel):
+    """Validation errors of one business of a batch"""
+    row: int = Field(description="Position of the business in the request")
+    errors: Dict[str, str] = Field(description="Field -> validation message, the same as /predict reports")
+
+class BatchPredictionResponse(BaseModel):
+    """Response model for batch risk prediction"""
+    predictions: List[Optional[PredictionResponse]] = Field(
+        description="One prediction per business, in request order (null for invalid businesses)")
+    segments: Dict[str, int] = Field(description="Businesses scored by each segment")
+    errors: List[RowErrors] = Field(default=[], description="Validation errors of the businesses not scored")
+
+class WhatIfRange(BaseModel):
+    """Values to try for one field: ``steps`` evenly spaced values from ``min`` to ``max``"""
+    min: float
+    max: float
+    steps: int = Field(default=11, ge=2, le=101, description="Number of values in the range")
+
+class WhatIfRequest(BaseModel):
+    """A business plus the fields to vary for what-if analysis"""
+    business: BusinessData
+    ranges: Dict[str, WhatIfRange] = Field(description="Field name -> range of values to try")
 
 def extract_business_features(business_data: BusinessData) -> Dict[str, float]:
     """
@@ -167,7 +216,8 @@ def extract_business_features(business_data: BusinessData) -> Dict[str, float]:
         logger.error(f"❌ Feature extraction error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Feature extraction failed: {str(e)}")
 
-def calculate_advanced_risk_score(features: Dict[str, float]) -> Dict[str, Any]:
+def calculate_advanced_risk_score(features: Dict[str, float],
+                                  risk_weights: Dict[str, float] = RISK_WEIGHTS) -> Dict[str, Any]:
     """
     Calculate risk score using weighted ensemble approach
     """
@@ -236,13 +286,13 @@ def calculate_advanced_risk_score(features: Dict[str, float]) -> Dict[str, Any]:
         
         # Calculate weighted risk score
         total_risk = (
-            risk_components['cash_flow'] * RISK_WEIGHTS['cash_flow_negative'] +
-            risk_components['debt_ratio'] * RISK_WEIGHTS['debt_to_asset_ratio'] +
-            risk_components['profitability'] * RISK_WEIGHTS['profitability'] +
-            risk_components['maturity'] * RISK_WEIGHTS['business_maturity'] +
-            risk_components['market'] * RISK_WEIGHTS['market_conditions'] +
-            risk_components['operational'] * RISK_WEIGHTS['operational_efficiency'] +
-            risk_components['growth'] * RISK_WEIGHTS['growth_potential']
+            risk_components['cash_flow'] * risk_weights['cash_flow_negative'] +
+            risk_components['debt_ratio'] * risk_weights['debt_to_asset_ratio'] +
+            risk_components['profitability'] * risk_weights['profitability'] +
+            risk_components['maturity'] * risk_weights['business_maturity'] +
+            risk_components['market'] * risk_weights['market_conditions'] +
+            risk_components['operational'] * risk_weights['operational_efficiency'] +
+            risk_components['growth'] * risk_weights['growth_potential']
         )
         
         # Apply critical risk multipliers
@@ -299,12 +349,646 @@ def determine_risk_level(risk_score: float) -> str:
     else:
         return "Low Risk"
 
+# Risk score thresholds between levels (see determine_risk_level)
+RISK_THRESHOLDS = {0.4: ("Low Risk", "Medium Risk"), 0.7: ("Medium Risk", "High Risk")}
+
+# Largest what-if grid scored in one request
+MAX_WHATIF_POINTS = int(os.getenv("MAX_WHATIF_POINTS", 250000))
+
+# Business input fields in BusinessData order (the columns batch scoring reads)
+BUSINESS_FIELDS = [name for name in BusinessData.model_fields if name not in ('businessId', 'modelInputs')]
+
+# Key risk factors in reporting order, with the component that triggers each (> 0.6)
+KEY_FACTOR_COMPONENTS = [
+    ('cash_flow', "Negative Cash Flow"),
+    ('debt_ratio', "High Debt-to-Asset Ratio"),
+    ('profitability', "Poor Profitability"),
+    ('maturity', "New Business"),
+    ('market', "Challenging Market Conditions"),
+    ('operational', "Operational Inefficiencies"),
+]
+
+# Factor lists for every combination of triggered components (bit i = component i)
+KEY_FACTOR_LISTS = np.empty(2 ** len(KEY_FACTOR_COMPONENTS), dtype=object)
+for _mask in range(len(KEY_FACTOR_LISTS)):
+    KEY_FACTOR_LISTS[_mask] = [label for i, (_, label) in enumerate(KEY_FACTOR_COMPONENTS)
+                               if _mask >> i & 1] or ["Overall Business Performance"]
+
+# Marks a field absent from a row (a missing JSON key) in frames built by business_rows_frame
+MISSING = type('Missing', (), {'__repr__': lambda self: 'MISSING'})()
+
+# Pydantic's messages for the BusinessData checks validate_business_frame makes on whole columns
+FIELD_REQUIRED = "Field required"
+FINITE_MESSAGE = "Input should be a finite number"
+FRACTION_MESSAGE = "Input should be a valid integer, got a number with a fractional part"
+PARSE_MESSAGES = {int: "Input should be a valid integer, unable to parse string as an integer",
+                  float: "Input should be a valid number, unable to parse string as a number"}
+STRING_TYPE_MESSAGE = "Input should be a valid string"
+DICT_TYPE_MESSAGE = "Input should be a valid dictionary"
+
+# Cells that are not numbers are validated one at a time by pydantic itself
+CELL_ADAPTERS = {int: TypeAdapter(int), float: TypeAdapter(float)}
+NUMBER_TYPES = (int, float, np.integer, np.floating, np.bool_)
+NUMERIC_INFERRED = ('integer', 'floating', 'mixed-integer-float', 'boolean')
+
+class FieldErrors:
+    """Error message of each row for one field, as codes into a list of messages (0 = valid)"""
+
+    def __init__(self, n: int):
+        self.codes = np.zeros(n, dtype=np.int16)
+        self.messages: List[Optional[str]] = [None]
+
+    def code(self, message: str) -> int:
+        if message not in self.messages:
+            self.messages.append(message)
+        return self.messages.index(message)
+
+    def set(self, rows: np.ndarray, message: str):
+        """Give ``rows`` (a mask) ``message``, unless they already have an error"""
+        rows = rows & (self.codes == 0)
+        if rows.any():
+            self.codes[rows] = self.code(message)
+
+    @property
+    def valid(self) -> np.ndarray:
+        return self.codes == 0
+
+def _numeric_column(column: Optional[pd.Series], kind: type, tabular: bool, errors: FieldErrors) -> np.ndarray:
+    """Values (float) of an int or float field, setting the pydantic error of each bad cell"""
+    n = len(errors.codes)
+    if column is None:
+        errors.set(np.ones(n, dtype=bool), FIELD_REQUIRED)
+        return np.full(n, np.nan)
+    cells = None if pd.api.types.is_numeric_dtype(column.dtype) else column.to_numpy(dtype=object)
+    if cells is None or pd.api.types.infer_dtype(cells, skipna=False) in NUMERIC_INFERRED:
+        values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+        if tabular:
+            errors.set(np.isnan(values), FIELD_REQUIRED)
+        # A number in a file is text: "3.5" or "inf" does not parse as an integer
+        text = tabular
+    else:
+        values = np.full(n, np.nan)
+        absent = cells == MISSING
+        if tabular:
+            absent |= pd.isna(cells)
+        errors.set(absent, FIELD_REQUIRED)
+        number = ~absent & np.fromiter((isinstance(cell, NUMBER_TYPES) for cell in cells), dtype=bool, count=n)
+        values[number] = cells[number].astype(np.float64)
+        parsed = {}
+        for i in np.flatnonzero(~absent & ~number):
+            cell = cells[i]
+            key = cell if isinstance(cell, str) else None
+            if key is None or key not in parsed:
+                try:
+                    result = (float(CELL_ADAPTERS[kind].validate_python(cell)), 0)
+                except ValidationError as e:
+                    result = (np.nan, errors.code(e.errors()[0]['msg']))
+                if key is not None:
+                    parsed[key] = result
+            else:
+                result = parsed[key]
+            values[i], errors.codes[i] = result
+        text = False
+    if kind is int:
+        finite = np.isfinite(values)
+        errors.set(~finite, PARSE_MESSAGES[int] if text else FINITE_MESSAGE)
+        fraction = finite & (values != np.round(np.where(finite, values, 0)))
+        errors.set(fraction, PARSE_MESSAGES[int] if text else FRACTION_MESSAGE)
+    return values
+
+def _string_column(column: Optional[pd.Series], tabular: bool, errors: FieldErrors):
+    n = len(errors.codes)
+    if column is None:
+        errors.set(np.ones(n, dtype=bool), FIELD_REQUIRED)
+        return
+    absent = column.isna().to_numpy() if tabular else np.zeros(n, dtype=bool)
+    if column.dtype == object or not tabular:
+        cells = column.to_numpy(dtype=object)
+        absent |= cells == MISSING
+        if not tabular and pd.api.types.infer_dtype(cells, skipna=False) != 'string':
+            is_string = np.fromiter((isinstance(cell, str) for cell in cells), dtype=bool, count=n)
+            errors.set(~absent & ~is_string, STRING_TYPE_MESSAGE)
+    errors.set(absent, FIELD_REQUIRED)
+
+def validate_business_frame(data: pd.DataFrame,
+                            tabular: bool = True) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """
+    Check the BusinessData fields of every row with whole-column array
+    operations, as pydantic would check ``BusinessData(**row)``.
+    
+    Returns the frame with its numeric fields parsed to floats, the mask of
+    valid rows, and per row either None or a dict of field -> pydantic error
+    message, in field order (one message per field, as pydantic reports).
+    With ``tabular`` the cells come from a file: an empty cell is a missing
+    field and every cell is the file's text, so a number is also a valid
+    string. Otherwise ``MISSING`` marks absent fields and values are checked
+    with their JSON types.
+    """
+    n = len(data)
+    parsed = data.copy(deep=False)
+    field_errors = {}
+    for name in BUSINESS_FIELDS:
+        field = BusinessData.model_fields[name]
+        column = data[name] if name in data.columns else None
+        errors = field_errors[name] = FieldErrors(n)
+        if field.annotation is str:
+            _string_column(column, tabular, errors)
+            continue
+        values = _numeric_column(column, field.annotation, tabular, errors)
+        for bound in field.metadata:
+            if getattr(bound, 'ge', None) is not None:
+                errors.set(values < bound.ge, f"Input should be greater than or equal to {bound.ge}")
+            if getattr(bound, 'le', None) is not None:
+                errors.set(~(values <= bound.le), f"Input should be less than or equal to {bound.le}")
+        if name in NON_NEGATIVE_FINANCIALS:
+            errors.set(values < 0, f"Value error, {NON_NEGATIVE_MESSAGE}")
+        parsed[name] = values
+    valid = np.ones(n, dtype=bool)
+    for errors in field_errors.values():
+        valid &= errors.valid
+    row_messages = np.full(n, None, dtype=object)
+    for i in np.flatnonzero(~valid):
+        row_messages[i] = {name: errors.messages[errors.codes[i]]
+                           for name, errors in field_errors.items() if errors.codes[i]}
+    return parsed, valid, row_messages
+
+def valid_business_rows(data: pd.DataFrame) -> np.ndarray:
+    """Rows of a table that BusinessData would accept"""
+    return validate_business_frame(data)[1]
+
+def row_errors(errors: np.ndarray) -> List[Dict[str, Any]]:
+    """Compact error list of validate_business_frame: ``{"row": i, "errors": {field: message}}`` per bad row"""
+    return [{'row': int(i), 'errors': errors[i]} for i in np.flatnonzero(~np.equal(errors, None))]
+
+def extract_business_features_batch(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vectorized ``extract_business_features`` over a frame of BusinessData columns
+    """
+    revenue = data['revenue'].to_numpy(dtype=float)
+    expenses = data['expenses'].to_numpy(dtype=float)
+    cash_flow = data['cashFlow'].to_numpy(dtype=float)
+    debt = data['debt'].to_numpy(dtype=float)
+    assets = data['assets'].to_numpy(dtype=float)
+    employees = data['employeeCount'].to_numpy(dtype=float)
+    years = data['yearsInBusiness'].to_numpy(dtype=float)
+    market_growth = data['marketGrowth'].to_numpy(dtype=float)
+    competition = data['competitionLevel'].to_numpy(dtype=float)
+    retention = data['customerRetention'].to_numpy(dtype=float)
+    digital = data['digitalPresence'].to_numpy(dtype=float)
+    innovation = data['innovationScore'].to_numpy(dtype=float)
+    
+    features = {}
+    
+    # 1. Core Financial Health Features
+    features['profitability_ratio'] = (revenue - expenses) / np.maximum(revenue, 1)
+    features['debt_to_asset_ratio'] = debt / np.maximum(assets, 1)
+    features['cash_flow_ratio'] = (cash_flow * 12) / np.maximum(revenue, 1)
+    features['monthly_burn_rate'] = expenses / 12
+    
+    # 2. Business Sustainability Features
+    features['cash_runway'] = np.where(cash_flow > 0, assets / np.maximum(np.abs(cash_flow), 1), 0.0)
+    features['revenue_per_employee'] = revenue / np.maximum(employees, 1)
+    features['asset_efficiency'] = revenue / np.maximum(assets, 1)
+    
+    # 3. Business Maturity and Risk Factors
+    features['business_maturity_score'] = np.minimum(years / 10, 1.0)
+    features['market_risk_score'] = competition * (100 - market_growth) / 100
+    features['operational_risk'] = (100 - retention) + (10 - digital)
+    
+    # 4. Critical Risk Flags (binary features)
+    features['is_cash_flow_negative'] = (cash_flow < 0).astype(float)
+    features['is_unprofitable'] = (revenue <= expenses).astype(float)
+    features['is_overleveraged'] = (debt > assets).astype(float)
+    features['is_new_business'] = (years < 2).astype(float)
+    features['is_high_competition'] = (competition > 7).astype(float)
+    features['is_low_retention'] = (retention < 40).astype(float)
+    
+    # 5. Interaction Features (compound risks)
+    features['multiple_critical_risks'] = (
+        features['is_cash_flow_negative'] +
+        features['is_unprofitable'] +
+        features['is_overleveraged'] +
+        features['is_new_business']
+    ) / 4.0
+    
+    # 6. Growth and Innovation Potential
+    features['growth_potential'] = (innovation + digital) / 20
+    features['market_position'] = (retention / 100) * (1 - competition / 10)
+    
+    return pd.DataFrame(features, index=data.index)
+
+def calculate_risk_components_batch(features: pd.DataFrame) -> pd.DataFrame:
+    """Vectorized risk components of ``calculate_advanced_risk_score``"""
+    f = {col: features[col].to_numpy(dtype=float) for col in features.columns}
+    components = {}
+    
+    components['cash_flow'] = np.select(
+        [f['is_cash_flow_negative'] == 1.0, f['cash_flow_ratio'] < 0.05, f['cash_flow_ratio'] < 0.1],
+        [0.9, 0.7, 0.4], default=0.1)
+    
+    debt_ratio = f['debt_to_asset_ratio']
+    components['debt_ratio'] = np.select(
+        [debt_ratio > 3.0, debt_ratio > 1.5, debt_ratio > 1.0, debt_ratio > 0.5],
+        [0.95, 0.85, 0.7, 0.4], default=0.15)
+    
+    components['profitability'] = np.select(
+        [f['is_unprofitable'] == 1.0, f['profitability_ratio'] < 0.05, f['profitability_ratio'] < 0.1],
+        [0.8, 0.6, 0.3], default=0.1)
+    
+    components['maturity'] = np.select(
+        [f['is_new_business'] == 1.0, f['business_maturity_score'] < 0.3, f['business_maturity_score'] < 0.5],
+        [0.7, 0.5, 0.3], default=0.1)
+    
+    components['market'] = np.minimum(f['market_risk_score'] / 100, 0.8)
+    components['operational'] = np.minimum(f['operational_risk'] / 100, 0.8)
+    components['growth'] = 1.0 - f['growth_potential']
+    
+    return pd.DataFrame(components, index=features.index)
+
+# RISK_WEIGHTS key of each risk component (summed in this order)
+COMPONENT_WEIGHT_KEYS = {
+    'cash_flow': 'cash_flow_negative',
+    'debt_ratio': 'debt_to_asset_ratio',
+    'profitability': 'profitability',
+    'maturity': 'business_maturity',
+    'market': 'market_conditions',
+    'operational': 'operational_efficiency',
+    'growth': 'growth_potential',
+}
+
+def component_weights(risk_weights: Dict[str, float]) -> Dict[str, float]:
+    """Weight of each risk component in the total risk, from ``RISK_WEIGHTS``-style weights"""
+    return {component: risk_weights[key] for component, key in COMPONENT_WEIGHT_KEYS.items()}
+
+COMPONENT_WEIGHTS = component_weights(RISK_WEIGHTS)
+
+class SegmentLoadError(RuntimeError):
+    """A segment's saved model could not be loaded (answered with 503)"""
+
+def critical_risk_multiplier(critical: np.ndarray) -> np.ndarray:
+    """Compound-risk multiplier applied to the weighted total"""
+    return np.select([critical > 0.5, critical > 0.25], [1.2, 1.1], default=1.0)
+
+def calculate_risk_scores_batch(features: pd.DataFrame,
+                                weights: Dict[str, float] = COMPONENT_WEIGHTS) -> pd.DataFrame:
+    """
+    Vectorized ``calculate_advanced_risk_score``: risk_score, confidence and key_factors per row
+    """
+    components = calculate_risk_components_batch(features)
+    c = {col: components[col].to_numpy() for col in components.columns}
+    
+    total_risk = 0.0
+    for component, weight in weights.items():
+        total_risk = total_risk + c[component] * weight
+    
+    critical = features['multiple_critical_risks'].to_numpy(dtype=float)
+    risk_score = np.minimum(total_risk * critical_risk_multiplier(critical), 1.0)
+    
+    mask = np.zeros(len(features), dtype=np.int64)
+    for i, (component, _) in enumerate(KEY_FACTOR_COMPONENTS):
+        mask |= (c[component] > 0.6).astype(np.int64) << i
+    
+    confidence = np.select([critical > 0.5, critical == 0], [0.95, 0.90], default=0.85)
+    
+    return pd.DataFrame({
+        'risk_score': risk_score,
+        'confidence': confidence,
+        'key_factors': KEY_FACTOR_LISTS[mask],
+    }, index=features.index)
+
+def determine_risk_levels(risk_scores: np.ndarray) -> np.ndarray:
+    """Vectorized ``determine_risk_level``"""
+    risk_scores = np.asarray(risk_scores, dtype=float)
+    return np.select([risk_scores >= 0.7, risk_scores >= 0.4], ["High Risk", "Medium Risk"],
+                     default="Low Risk").astype(object)
+
+# Raw fields read by each term of the risk score ('critical' is the compound-risk multiplier).
+# employeeCount, industryType and location do not affect the score.
+RULE_TERM_FIELDS = {
+    'cash_flow': ['cashFlow', 'revenue'],
+    'debt_ratio': ['debt', 'assets'],
+    'profitability': ['revenue', 'expenses'],
+    'maturity': ['yearsInBusiness'],
+    'market': ['competitionLevel', 'marketGrowth'],
+    'operational': ['customerRetention', 'digitalPresence'],
+    'growth': ['innovationScore', 'digitalPresence'],
+    'critical': ['cashFlow', 'revenue', 'expenses', 'debt', 'assets', 'yearsInBusiness'],
+}
+
+# The financial terms share their fields with the multiplier; the market terms read disjoint fields
+FINANCIAL_TERMS = ['cash_flow', 'debt_ratio', 'profitability', 'maturity']
+MARKET_TERMS = ['market', 'operational', 'growth']
+FINANCIAL_FIELDS = [name for name in BUSINESS_FIELDS
+                    if any(name in RULE_TERM_FIELDS[t] for t in FINANCIAL_TERMS + ['critical'])]
+MARKET_FIELDS = [name for name in BUSINESS_FIELDS if any(name in RULE_TERM_FIELDS[t] for t in MARKET_TERMS)]
+RULE_FIELDS = FINANCIAL_FIELDS + MARKET_FIELDS
+
+# Explanations are relative to this typical business (its risk score is the baseline)
+REFERENCE_BUSINESS = {
+    'revenue': 2000000, 'expenses': 1800000, 'cashFlow': 15000, 'debt': 1000000, 'assets': 1500000,
+    'employeeCount': 10, 'yearsInBusiness': 3, 'industryType': 'Retail', 'location': 'Chennai',
+    'marketGrowth': 5, 'competitionLevel': 5, 'customerRetention': 60, 'digitalPresence': 6,
+    'innovationScore': 5,
+}
+
+def reference_risk_score(weights: Dict[str, float] = COMPONENT_WEIGHTS) -> float:
+    """Risk score of the reference business under ``weights``"""
+    if weights == COMPONENT_WEIGHTS:
+        return REFERENCE_RISK_SCORE
+    return float(calculate_risk_scores_batch(
+        extract_business_features_batch(pd.DataFrame([REFERENCE_BUSINESS])), weights)['risk_score'].iloc[0])
+
+REFERENCE_RISK_SCORE = float(calculate_risk_scores_batch(
+    extract_business_features_batch(pd.DataFrame([REFERENCE_BUSINESS])))['risk_score'].iloc[0])
+
+FIELD_LABELS = {
+    'revenue': "Revenue", 'expenses': "Expenses", 'cashFlow': "Cash Flow", 'debt': "Debt",
+    'assets': "Assets", 'employeeCount': "Employee Count", 'yearsInBusiness': "Years in Business",
+    'industryType': "Industry", 'location': "Location", 'marketGrowth': "Market Growth",
+    'competitionLevel': "Competition Level", 'customerRetention': "Customer Retention",
+    'digitalPresence': "Digital Presence", 'innovationScore': "Innovation",
+}
+
+def _coalition_members(n_players: int) -> np.ndarray:
+    """(2^n, n) 0/1 matrix: bit i of the coalition index = player i present"""
+    return (np.arange(2 ** n_players)[:, None] >> np.arange(n_players)) & 1
+
+def _shapley_weight(n_players: int, size: int) -> float:
+    """Weight of a coalition of ``size`` others in a player's Shapley value"""
+    return factorial(size) * factorial(n_players - size - 1) / factorial(n_players)
+
+def _shapley_matrix(n_players: int) -> np.ndarray:
+    """Matrix W with phi = V @ W, where V holds the value of every coalition"""
+    present = _coalition_members(n_players)
+    size = present.sum(axis=1, keepdims=True)
+    weight = np.array([_shapley_weight(n_players, s) for s in range(n_players)] + [0.0])
+    return np.where(present == 1, weight[np.maximum(size - 1, 0)], -weight[size])
+
+@lru_cache(maxsize=None)
+def _marginal_matrices(n_players: int) -> np.ndarray:
+    """
+    D[s] with (V @ D[s])[:, i] = sum over coalitions S of size s without i
+    of v(S + i) - v(S)
+    """
+    present = _coalition_members(n_players)
+    size = present.sum(axis=1)
+    return np.stack([np.where(present == 1, 1.0 * (size == s + 1)[:, None], -1.0 * (size == s)[:, None])
+                     for s in range(n_players)])
+
+@lru_cache(maxsize=None)
+def _size_totals(n_players: int) -> np.ndarray:
+    """(2^n, n + 1) matrix summing coalition values by coalition size"""
+    size = _coalition_members(n_players).sum(axis=1)
+    return (size[:, None] == np.arange(n_players + 1)).astype(float)
+
+def _product_shapley(u: np.ndarray, v: np.ndarray, n_total: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Shapley values of the game u(S_A) * v(S_B) over disjoint player sets A and B.
+    
+    A player's marginal contribution only depends on its own side's
+    coalition, so the other side enters through its value totals per
+    coalition size.
+    """
+    a, b = int(np.log2(u.shape[1])), int(np.log2(v.shape[1]))
+    weights = np.array([[_shapley_weight(n_total, s + r) if s + r < n_total else 0.0
+                         for r in range(n_total + 1)] for s in range(n_total + 1)])
+    u_totals, v_totals = u @ _size_totals(a), v @ _size_totals(b)
+    # Weight of each own-side coalition size, summed over the other side's coalitions
+    u_weights = v_totals @ weights[:a, :b + 1].T
+    v_weights = u_totals @ weights[:b, :a + 1].T
+    phi_a = sum(u_weights[:, [s]] * (u @ d) for s, d in enumerate(_marginal_matrices(a)))
+    phi_b = sum(v_weights[:, [s]] * (v @ d) for s, d in enumerate(_marginal_matrices(b)))
+    return phi_a, phi_b
+
+FINANCIAL_SHAPLEY_MATRIX = _shapley_matrix(len(FINANCIAL_FIELDS))
+RULE_SHAPLEY_MATRIX = _shapley_matrix(len(RULE_FIELDS))
+
+def _side_games(X: np.ndarray, ref_values: np.ndarray, numeric: List[str],
+                weights: Dict[str, float] = COMPONENT_WEIGHTS) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Coalition values of the multiplier M and financial total F (over financial
+    coalitions) and of the market total K (over market coalitions).
+    
+    Absent fields take the reference value. The two field sets are disjoint,
+    so hybrid h carries financial coalition h and market coalition h mod
+    2^|market|, and 64 hybrids per row cover both games.
+    """
+    n_hybrids = 2 ** len(FINANCIAL_FIELDS)
+    present = np.ones((n_hybrids, len(numeric)), dtype=bool)
+    for players, coalitions in ((FINANCIAL_FIELDS, np.arange(n_hybrids)),
+                                (MARKET_FIELDS, np.arange(n_hybrids) % 2 ** len(MARKET_FIELDS))):
+        for j, name in enumerate(players):
+            present[:, numeric.index(name)] = (coalitions >> j) & 1
+    hybrids = np.where(present[:, None, :], X[None, :, :], ref_values[None, None, :])
+    
+    features = extract_business_features_batch(pd.DataFrame(hybrids.reshape(-1, len(numeric)), columns=numeric))
+    components = calculate_risk_components_batch(features)
+    
+    def by_coalition(values: np.ndarray) -> np.ndarray:
+        return values.reshape(n_hybrids, len(X)).T
+    
+    multiplier = by_coalition(critical_risk_multiplier(features['multiple_critical_risks'].to_numpy(dtype=float)))
+    financial = by_coalition(sum(components[t].to_numpy() * weights[t] for t in FINANCIAL_TERMS))
+    market = by_coalition(sum(components[t].to_numpy() * weights[t] for t in MARKET_TERMS))
+    return multiplier, financial, market[:, :2 ** len(MARKET_FIELDS)]
+
+def explain_risk_scores_batch(data: pd.DataFrame, reference: Optional[Dict[str, Any]] = None,
+                              chunk_rows: int = 4096,
+                              weights: Dict[str, float] = COMPONENT_WEIGHTS) -> pd.DataFrame:
+    """
+    Exact Shapley contribution of every BusinessData field to the risk score.
+    
+    The players are the raw fields, and absent fields take the reference
+    business's value. Each row's contributions therefore sum to its risk
+    score minus the reference score.
+    
+    The score is min(M * (F + K), 1). The multiplier M and the financial
+    terms F are games on the six financial fields. The market terms K form
+    a game on the five disjoint market fields. All three are tabulated with
+    64 evaluations per row. Where the cap cannot bind, the Shapley values
+    follow in closed form from M * F (6 players) and the product game M * K.
+    Rows that may hit the cap are solved over all 2^11 coalitions.
+    """
+    reference = {**REFERENCE_BUSINESS, **(reference or {})}
+    numeric = [name for name in BUSINESS_FIELDS if BusinessData.model_fields[name].annotation is not str]
+    ref_values = np.array([float(reference[name]) for name in numeric])
+    n_financial = len(FINANCIAL_FIELDS)
+    output_columns = [BUSINESS_FIELDS.index(name) for name in RULE_FIELDS]
+    
+    contributions = np.zeros((len(data), len(BUSINESS_FIELDS)))
+    for start in range(0, len(data), chunk_rows):
+        X = data[numeric].iloc[start:start + chunk_rows].to_numpy(dtype=float)
+        multiplier, financial, market = _side_games(X, ref_values, numeric, weights)
+        
+        phi = np.empty((len(X), len(RULE_FIELDS)))
+        capped = multiplier.max(axis=1) * (financial.max(axis=1) + market.max(axis=1)) > 1.0
+        free = ~capped
+        if free.any():
+            phi_financial, phi_market = _product_shapley(multiplier[free], market[free], len(RULE_FIELDS))
+            phi[free, :n_financial] = (multiplier[free] * financial[free]) @ FINANCIAL_SHAPLEY_MATRIX + phi_financial
+            phi[free, n_financial:] = phi_market
+        if capped.any():
+            coalitions = np.arange(len(RULE_SHAPLEY_MATRIX))
+            fin, mkt = coalitions & (2 ** n_financial - 1), coalitions >> n_financial
+            values = np.minimum(multiplier[capped][:, fin]
+                                * (financial[capped][:, fin] + market[capped][:, mkt]), 1.0)
+            phi[capped] = values @ RULE_SHAPLEY_MATRIX
+        contributions[start:start + len(X), output_columns] = phi
+    
+    return pd.DataFrame(contributions, columns=BUSINESS_FIELDS, index=data.index)
+
+def key_factors_from_contributions(contributions: pd.DataFrame, top: int = 3) -> np.ndarray:
+    """Labels of the fields that raise each row's risk the most (largest positive contributions)"""
+    values = contributions.to_numpy()
+    order = np.argsort(-values, axis=1)[:, :top]
+    labels = np.array([FIELD_LABELS[name] for name in contributions.columns], dtype=object)
+    factors = np.empty(len(values), dtype=object)
+    for i, (row, cols) in enumerate(zip(values, order)):
+        factors[i] = [labels[c] for c in cols if row[c] > 1e-9] or ["Overall Business Performance"]
+    return factors
+
+def whatif_values(name: str, value_range: WhatIfRange) -> np.ndarray:
+    """Values to try for a field (integers rounded, duplicates dropped)"""
+    if value_range.max < value_range.min:
+        raise HTTPException(status_code=400, detail=f"Range for {name}: max is below min")
+    values = np.linspace(value_range.min, value_range.max, value_range.steps)
+    if BusinessData.model_fields[name].annotation is int:
+        values = np.unique(np.round(values))
+    return values
+
+def analyze_whatif(base: Dict[str, Any], ranges: Dict[str, np.ndarray],
+                   weights: Dict[str, float] = COMPONENT_WEIGHTS) -> Dict[str, Any]:
+    """
+    Score the full grid over ``ranges`` and each field's own line in one
+    vectorized call with the component ``weights``, then find the nearest
+    point across every risk threshold.
+    
+    Distance is the sum of each field's change divided by the width of its
+    range, so changes to different fields are comparable.
+    """
+    fields = list(ranges)
+    grid_axes = np.meshgrid(*ranges.values(), indexing='ij')
+    n_grid = grid_axes[0].size
+    
+    # Full grid first, then one line per field with the others at their base values
+    columns = {name: np.repeat(base[name], n_grid + sum(len(v) for v in ranges.values())) for name in BUSINESS_FIELDS}
+    for name, axis in zip(fields, grid_axes):
+        columns[name][:n_grid] = axis.ravel()
+    offset = n_grid
+    lines = {}
+    for name, values in ranges.items():
+        columns[name][offset:offset + len(values)] = values
+        lines[name] = slice(offset, offset + len(values))
+        offset += len(values)
+    points = pd.DataFrame(columns)
+    
+    valid = valid_business_rows(points)
+    scores = np.full(len(points), np.nan)
+    scores[valid] = calculate_risk_scores_batch(extract_business_features_batch(points[valid]),
+                                                weights)['risk_score'].to_numpy()
+    
+    base_score = float(calculate_risk_scores_batch(
+        extract_business_features_batch(pd.DataFrame([base])), weights)['risk_score'].iloc[0])
+    widths = np.array([max(ranges[name].max() - ranges[name].min(), 1e-12) for name in fields])
+    changes = points[fields].to_numpy(dtype=float) - np.array([float(base[name]) for name in fields])
+    distance = (np.abs(changes) / widths).sum(axis=1)
+    
+    def describe(i: int) -> Dict[str, Any]:
+        return {
+            'changes': {name: {'from': base[name], 'to': points[name].iloc[i].item(),
+                               'delta': round(float(changes[i, j]), 6)}
+                        for j, name in enumerate(fields) if changes[i, j] != 0},
+            'risk_score': round(float(scores[i]), 4),
+            'risk_level': determine_risk_level(scores[i]),
+            'distance': round(float(distance[i]), 6),
+        }
+    
+    crossings, single_field = [], {name: [] for name in fields}
+    for threshold, (lower, upper) in RISK_THRESHOLDS.items():
+        above = base_score >= threshold
+        crossed = (scores < threshold) if above else (scores >= threshold)
+        crossed &= valid
+        entry = {'threshold': threshold, 'from': upper if above else lower, 'to': lower if above else upper}
+        
+        candidates = np.flatnonzero(crossed[:n_grid])
+        best = candidates[np.lexsort((scores[candidates] if above else -scores[candidates],
+                                      distance[candidates]))[0]] if len(candidates) else None
+        crossings.append({**entry, 'nearest': describe(best) if best is not None else None})
+        
+        for name, line in lines.items():
+            on_line = np.arange(line.start, line.stop)[crossed[line]]
+            if len(on_line):
+                single_field[name].append({**entry, **describe(on_line[np.argmin(distance[on_line])])})
+    
+    return {
+        'base': {'risk_score': round(base_score, 4), 'risk_level': determine_risk_level(base_score)},
+        'grid_points': int(n_grid),
+        'valid_points': int(valid[:n_grid].sum()),
+        'crossings': crossings,
+        'single_field': single_field,
+        'sensitivity': {name: {'values': ranges[name].tolist(),
+                               'risk_scores': [None if np.isnan(x) else round(float(x), 4) for x in scores[line]]}
+                        for name, line in lines.items()},
+    }
+
+# Bulk scoring job queue, prediction history, scoring cascade, segment router and drift monitor, created at startup
+job_queue = None
+prediction_history = None
+scoring_cascade = None
+segment_router = None
+drift_monitor = None
+
+# Most businesses accepted by one /predict/batch request
+MAX_BATCH_BUSINESSES = int(os.getenv("MAX_BATCH_BUSINESSES", 10000))
+
+# /predict scoring modes: the rule engine alone, or rules first and the ensemble near thresholds
+SCORING_MODES = ("rules", "cascade")
+
+# Models the cascade escalates to: the saved ensemble, or its distilled student
+MODEL_TIERS = ("full", "fast")
+DEFAULT_SCORING_MODE = os.getenv("SCORING_MODE", "rules")
+
+# Largest accepted bulk upload (bytes)
+MAX_UPLOAD_BYTES = int(os.getenv("JOB_MAX_UPLOAD_BYTES", 2 * 1024 ** 3))
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize the API"""
+    global job_queue, prediction_history, scoring_cascade, segment_router, drift_monitor
     logger.info("🚀 Starting MSME Business Risk Prediction API v2.0...")
+    prediction_history = PredictionHistory()
+    # Imported here: the job queue scores through batch_score, which imports this module
+    from job_queue import JobQueue
+    from model_artifacts import ModelArtifacts
+    from cascade import ScoringCascade
+    from segment_router import SegmentRouter
+    from drift_monitor import DriftMonitor
+    try:
+        artifacts = ModelArtifacts.load()
+    except FileNotFoundError:
+        artifacts = None
+    scoring_cascade = ScoringCascade(artifacts)
+    segment_router = SegmentRouter(artifacts)
+    if segment_router.available:
+        logger.info(f"🗺️  {len(segment_router.available)} segment(s) in {segment_router.segment_dir}")
+    drift_monitor = DriftMonitor.load()
+    if drift_monitor.reference:
+        logger.info(f"📈 Drift reference for {len(drift_monitor.reference)} model input(s)")
+    job_queue = JobQueue(artifacts=artifacts)
+    recovered = job_queue.recover()
+    if recovered:
+        logger.info(f"📦 Resubmitted {recovered} unfinished scoring job(s)")
     logger.info("✅ Advanced risk assessment model ready!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    if job_queue is not None:
+        job_queue.shutdown()
+    if prediction_history is not None:
+        prediction_history.close()
+    if drift_monitor is not None:
+        drift_monitor.close()
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
@@ -315,6 +999,14 @@ async def root():
         "description": "Advanced business risk assessment with comprehensive analytics",
         "endpoints": {
             "predict": "/predict",
+            "batch": "/predict/batch",
+            "whatif": "/predict/whatif",
+            "live": "/ws/predict",
+            "jobs": "/jobs",
+            "history": "/history",
+            "cascade_metrics": "/metrics/cascade",
+            "segments": "/segments",
+            "drift": "/drift",
             "health": "/health",
             "docs": "/docs"
         }
@@ -332,21 +1024,49 @@ async def health_check():
     }
 
 @app.post("/predict", response_model=PredictionResponse)
-async def predict_business_risk(business_data: BusinessData):
+async def predict_business_risk(business_data: BusinessData, explain: bool = False,
+                                mode: str = DEFAULT_SCORING_MODE, model_tier: str = "full"):
     """
     Predict business risk based on comprehensive business metrics.
     
     This endpoint accepts business financial and operational data and returns
-    a comprehensive risk assessment with detailed analytics.
+    a comprehensive risk assessment with detailed analytics. With
+    ``explain=true`` the key factors come from exact Shapley contributions of
+    the input fields, which are returned as ``explanation``. With
+    ``mode=cascade`` a rule score near a risk level threshold is replaced by
+    the saved ensemble's score of ``modelInputs``, or by its distilled
+    student's with ``model_tier=fast``; such a score is explained by the
+    model's TreeSHAP contributions (log-odds) of the ``modelInputs``. The model and risk weights are those
+    of the business's industry/location segment, if one exists.
     """
+    if mode not in SCORING_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of: {', '.join(SCORING_MODES)}")
+    if model_tier not in MODEL_TIERS:
+        raise HTTPException(status_code=400, detail=f"model_tier must be one of: {', '.join(MODEL_TIERS)}")
     try:
         logger.info("🔍 Processing business risk prediction request...")
+        segment = segment_router.route(business_data.industryType, business_data.location)
+        if mode == "cascade":
+            check_model_tier(segment, model_tier)
         
-        # Extract comprehensive features
-        features = extract_business_features(business_data)
-        
-        # Calculate advanced risk score
-        risk_analysis = calculate_advanced_risk_score(features)
+        tier, uncertainty, model_score = None, {}, None
+        if mode == "cascade":
+            scored = scoring_cascade.score(business_frame([business_data]), model_tier,
+                                           segment.artifacts, segment.weights).iloc[0]
+            model_score = scored['model_score']
+            risk_analysis = {
+                'risk_score': float(scored['risk_score']),
+                'confidence': float(scored['confidence']),
+                'key_factors': list(scored['key_factors']),
+            }
+            tier = scored['tier']
+            uncertainty = model_uncertainty(scored['model_spread'], scored['member_scores'])
+        else:
+            # Extract comprehensive features
+            features = extract_business_features(business_data)
+            
+            # Calculate advanced risk score
+            risk_analysis = calculate_advanced_risk_score(features, segment.risk_weights)
         
         # Determine risk level
         risk_level = determine_risk_level(risk_analysis['risk_score'])
@@ -357,9 +1077,35 @@ async def predict_business_risk(business_data: BusinessData):
             risk_level=risk_level,
             confidence=round(risk_analysis['confidence'], 4),
             key_factors=risk_analysis['key_factors'],
-            timestamp=datetime.now().isoformat()
+            timestamp=datetime.now().isoformat(),
+            tier=tier,
+            segment=segment.key,
+            **uncertainty
         )
         
+        if explain and tier not in (None, "rules"):
+            # The model produced the score: explain it with the model's TreeSHAP contributions
+            contributions = segment.artifacts.explain(business_frame([business_data]), model_tier)
+            response.key_factors = model_factors(contributions)[0] or ["Overall Business Performance"]
+            row = contributions.iloc[0]
+            response.explanation = {name: round(float(row[name]), 4)
+                                    for name in row.abs().sort_values(ascending=False).index}
+        elif explain:
+            contributions = explain_risk_scores_batch(pd.DataFrame([business_data.dict()]), weights=segment.weights)
+            response.key_factors = key_factors_from_contributions(contributions)[0]
+            row = contributions.iloc[0]
+            response.explanation = {name: round(float(row[name]), 4)
+                                    for name in row.abs().sort_values(ascending=False).index}
+            response.baseline_risk_score = round(reference_risk_score(segment.weights), 4)
+        
+        if prediction_history is not None:
+            prediction_history.record(business_data.businessId, response.risk_score, risk_level,
+                                      response.confidence, response.key_factors)
+        if drift_monitor is not None:
+            drift_monitor.record([{**business_data.dict(include=set(BUSINESS_FIELDS)),
+                                   **(business_data.modelInputs or {}),
+                                   'risk_score': response.risk_score, 'model_score': model_score}])
+        
         logger.info(f"✅ Risk prediction completed: Score={risk_analysis['risk_score']:.4f}, Level={risk_level}")
         logger.info(f"🎯 Key Risk Factors: {', '.join(risk_analysis['key_factors'])}")
         
@@ -367,10 +1113,306 @@ async def predict_business_risk(business_data: BusinessData):
         
     except HTTPException:
         raise
+    except SegmentLoadError as e:
+        logger.error(f"❌ {e}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Prediction error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
+@app.exception_handler(SegmentLoadError)
+async def segment_load_error(request: Request, exc: SegmentLoadError):
+    """503 for a segment whose model cannot be loaded (e.g. in a /predict/batch group)"""
+    logger.error(f"❌ {exc}")
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+def check_model_tier(segment: Any, model_tier: str):
+    """503 unless the segment's model can serve ``model_tier``"""
+    if segment.artifacts is not None and not segment.artifacts.has_tier(model_tier):
+        raise HTTPException(status_code=503,
+                            detail=f"Model tier {model_tier} is not available: no distilled student model loaded")
+
+def model_uncertainty(spread: float, member_scores: Optional[Dict[str, float]]) -> Dict[str, Any]:
+    """model_spread and member_scores response fields of a row the model scored (none otherwise)"""
+    if spread is None or np.isnan(spread):
+        return {}
+    return {'model_spread': round(float(spread), 4),
+            'member_scores': {name: round(float(p), 4) for name, p in (member_scores or {}).items()} or None}
+
+def business_frame(businesses: List[BusinessData]) -> pd.DataFrame:
+    """One row per business: its BusinessData fields plus its modelInputs"""
+    return pd.DataFrame([{**business.dict(include=set(BUSINESS_FIELDS)), **(business.modelInputs or {})}
+                         for business in businesses])
+
+def business_rows_frame(businesses: List[Dict[str, Any]]) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    ``business_frame`` of unvalidated JSON businesses, for
+    ``validate_business_frame(tabular=False)``: fields a business lacks are
+    ``MISSING``. Also returns, per business, the pydantic messages of an
+    invalid ``businessId`` or ``modelInputs`` (None if both are valid).
+    """
+    columns = {name: [business.get(name, MISSING) for business in businesses] for name in BUSINESS_FIELDS}
+    columns['businessId'] = [business.get('businessId') for business in businesses]
+    errors = np.full(len(businesses), None, dtype=object)
+    model_inputs = []
+    for i, business in enumerate(businesses):
+        business_id, inputs, messages = columns['businessId'][i], business.get('modelInputs'), {}
+        if business_id is not None and not isinstance(business_id, str):
+            messages['businessId'] = STRING_TYPE_MESSAGE
+        if inputs is not None and not isinstance(inputs, dict):
+            messages['modelInputs'] = DICT_TYPE_MESSAGE
+            inputs = None
+        model_inputs.append(inputs or {})
+        errors[i] = messages or None
+    data = pd.DataFrame({name: pd.Series(cells, dtype=object) for name, cells in columns.items()})
+    if any(model_inputs):
+        inputs = pd.DataFrame(model_inputs)
+        data = pd.concat([data, inputs.drop(columns=[c for c in inputs.columns if c in data.columns])], axis=1)
+    return data, errors
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_business_risk_batch(businesses: List[Dict[str, Any]], mode: str = DEFAULT_SCORING_MODE,
+                                      model_tier: str = "full"):
+    """
+    Predict the risk of many businesses in one request.
+    
+    Each business is a ``BusinessData`` object. They are validated together,
+    column by column, with the same messages as ``/predict``: invalid
+    businesses get a null prediction and an entry in ``errors``, and the
+    others are scored. Businesses are grouped by industry/location segment,
+    and each segment's model and risk weights score its businesses as one
+    vectorized sub-batch. ``mode`` and ``model_tier`` are as for
+    ``/predict``. Predictions the model scored carry the ensemble members'
+    probabilities and their spread, to triage the uncertain ones.
+    """
+    if mode not in SCORING_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of: {', '.join(SCORING_MODES)}")
+    if model_tier not in MODEL_TIERS:
+        raise HTTPException(status_code=400, detail=f"model_tier must be one of: {', '.join(MODEL_TIERS)}")
+    if len(businesses) > MAX_BATCH_BUSINESSES:
+        raise HTTPException(status_code=413,
+                            detail=f"At most {MAX_BATCH_BUSINESSES:,} businesses per batch; use /jobs for more")
+    if not businesses:
+        return BatchPredictionResponse(predictions=[], segments={})
+    
+    data, extra_errors = business_rows_frame(businesses)
+    data, valid, errors = validate_business_frame(data, tabular=False)
+    for i in np.flatnonzero(~np.equal(extra_errors, None)):
+        errors[i] = {**(errors[i] or {}), **extra_errors[i]}
+        valid[i] = False
+    positions = np.flatnonzero(valid)
+    data = data.iloc[positions].reset_index(drop=True)
+    
+    risk_score = np.empty(len(data))
+    confidence = np.empty(len(data))
+    key_factors = np.empty(len(data), dtype=object)
+    tier = np.full(len(data), None, dtype=object)
+    model_score = np.full(len(data), np.nan)
+    model_spread = np.full(len(data), np.nan)
+    member_scores = np.full(len(data), None, dtype=object)
+    segment_keys = np.empty(len(data), dtype=object)
+    segments = {}
+    for segment, rows in (segment_router.groups(data) if len(data) else []):
+        batch = data.iloc[rows]
+        if mode == "cascade":
+            check_model_tier(segment, model_tier)
+            scores = scoring_cascade.score(batch, model_tier, segment.artifacts, segment.weights)
+            tier[rows] = scores['tier'].to_numpy()
+            model_score[rows] = scores['model_score'].to_numpy()
+            model_spread[rows] = scores['model_spread'].to_numpy()
+            member_scores[rows] = scores['member_scores'].to_numpy()
+        else:
+            scores = calculate_risk_scores_batch(extract_business_features_batch(batch), segment.weights)
+        risk_score[rows] = scores['risk_score'].to_numpy()
+        confidence[rows] = scores['confidence'].to_numpy()
+        key_factors[rows] = scores['key_factors'].to_numpy()
+        segment_keys[rows] = segment.key
+        segments[segment.key] = len(rows)
+    
+    risk_levels = determine_risk_levels(risk_score)
+    if drift_monitor is not None and len(data):
+        drift_monitor.record(data.assign(risk_score=risk_score, model_score=model_score))
+    timestamp = datetime.now().isoformat()
+    predictions = [None] * len(businesses)
+    for i, position in enumerate(positions):
+        prediction = PredictionResponse(
+            risk_score=round(float(risk_score[i]), 4),
+            risk_level=risk_levels[i],
+            confidence=round(float(confidence[i]), 4),
+            key_factors=list(key_factors[i]),
+            timestamp=timestamp,
+            tier=tier[i],
+            segment=segment_keys[i],
+            **model_uncertainty(model_spread[i], member_scores[i])
+        )
+        if prediction_history is not None:
+            prediction_history.record(data['businessId'][i], prediction.risk_score, prediction.risk_level,
+                                      prediction.confidence, prediction.key_factors)
+        predictions[position] = prediction
+    
+    invalid = len(businesses) - len(positions)
+    logger.info(f"✅ Batch prediction of {len(positions):,} businesses across {len(segments)} segment(s)"
+                + (f", {invalid:,} invalid" if invalid else ""))
+    return BatchPredictionResponse(predictions=predictions, segments=segments, errors=row_errors(errors))
+
+@app.post("/predict/whatif")
+async def predict_whatif(request: WhatIfRequest):
+    """
+    What-if analysis: how far the given fields must move to change risk level.
+    
+    Every combination of the requested field values is scored in one
+    vectorized batch. For each risk threshold the response gives the
+    nearest combination that crosses it, the nearest single-field change,
+    and the risk score along each field's range, all with the risk
+    weights of the business's segment.
+    """
+    numeric = [name for name in BUSINESS_FIELDS if BusinessData.model_fields[name].annotation is not str]
+    unknown = [name for name in request.ranges if name not in numeric]
+    if unknown:
+        raise HTTPException(status_code=400,
+                            detail=f"Cannot vary {unknown}. Choose from: {', '.join(numeric)}")
+    if not request.ranges:
+        raise HTTPException(status_code=400, detail="No ranges given")
+    
+    ranges = {name: whatif_values(name, value_range) for name, value_range in request.ranges.items()}
+    n_points = int(np.prod([len(values) for values in ranges.values()]))
+    if n_points > MAX_WHATIF_POINTS:
+        raise HTTPException(status_code=400,
+                            detail=f"Grid of {n_points:,} points exceeds the limit of {MAX_WHATIF_POINTS:,}")
+    
+    segment, weights = segment_router.weights(request.business.industryType, request.business.location)
+    logger.info(f"🔀 What-if analysis over {n_points:,} points ({', '.join(ranges)})")
+    return {**analyze_whatif(request.business.dict(), ranges, weights), 'segment': segment}
+
+@app.websocket("/ws/predict")
+async def live_prediction(websocket: WebSocket):
+    """
+    Live scoring while a form is edited.
+    
+    Send JSON objects of changed ``BusinessData`` fields; once every field
+    is set, each burst of changes is answered with the new prediction.
+    Only the features and risk components that depend on the changed
+    fields are recomputed.
+    """
+    from live_scoring import serve
+    await websocket.accept()
+    await serve(websocket)
+
+@app.get("/history")
+async def get_prediction_history(businessId: Optional[str] = None, start: Optional[datetime] = None,
+                                 end: Optional[datetime] = None, limit: int = 100):
+    """
+    Recorded predictions and monthly trends.
+    
+    Returns the most recent predictions of ``businessId`` (or of every
+    business) between ``start`` and ``end``, and the precomputed monthly
+    rollups: prediction count, average score and risk-level counts.
+    """
+    if not 1 <= limit <= 10000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 10000")
+    start_ts = start.timestamp() if start else None
+    end_ts = end.timestamp() if end else None
+    monthly = prediction_history.monthly(businessId,
+                                         start.strftime('%Y-%m') if start else None,
+                                         end.strftime('%Y-%m') if end else None)
+    for month in monthly:
+        month['risk_level'] = determine_risk_level(month['avg_risk_score'])
+    return {
+        "businessId": businessId,
+        "predictions": prediction_history.predictions(businessId, start_ts, end_ts, limit),
+        "monthly": monthly,
+    }
+
+@app.get("/segments")
+async def segment_pool():
+    """Available segments and the state of the segment model pool"""
+    return segment_router.stats()
+
+@app.get("/drift")
+async def input_drift(window: str = "current"):
+    """
+    Drift of the served inputs against the training data.
+    
+    For every input sketched in the ``current`` (or ``previous``) window,
+    across all workers: its count and quantiles (or most frequent
+    categories), and its PSI and KS statistic against the training
+    reference and against the window before. ``drifted`` lists the inputs
+    whose PSI against the reference is significant (0.25 or more).
+    """
+    if window not in ("current", "previous"):
+        raise HTTPException(status_code=400, detail="window must be one of: current, previous")
+    return drift_monitor.report(window)
+
+@app.get("/metrics/cascade")
+async def cascade_metrics():
+    """Rows scored in cascade mode, the fraction escalated and per-tier latency"""
+    return {"bands": scoring_cascade.bands, **scoring_cascade.metrics.snapshot()}
+
+def get_job_or_404(job_id: str) -> Dict[str, Any]:
+    job = job_queue.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@app.post("/jobs", status_code=202)
+async def submit_scoring_job(request: Request, format: str = "csv", id_column: str = "businessId"):
+    """
+    Submit a portfolio for background scoring.
+    
+    The request body is the raw CSV or Parquet file (``?format=parquet``) of
+    BusinessData rows. It is streamed to disk, and the job id is returned
+    immediately; poll ``/jobs/{job_id}`` for progress.
+    """
+    from job_queue import QueueFullError, UPLOAD_FORMATS, job_status
+    if format not in UPLOAD_FORMATS:
+        raise HTTPException(status_code=400,
+                            detail=f"Unsupported format '{format}'. Choose from: {', '.join(UPLOAD_FORMATS)}")
+    
+    job_id = job_queue.new_job_id()
+    size = 0
+    try:
+        with open(job_queue.input_path(job_id, format), 'wb') as f:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds {MAX_UPLOAD_BYTES:,} bytes")
+                f.write(chunk)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Empty upload")
+        job = job_queue.submit(job_id, format, id_column or None)
+    except QueueFullError as e:
+        job_queue.delete_files(job_id)
+        raise HTTPException(status_code=503, detail=f"Job queue is full: {e}")
+    except BaseException:
+        job_queue.delete_files(job_id)
+        raise
+    
+    logger.info(f"📦 Scoring job {job_id} queued ({size:,} bytes, {format})")
+    return job_status(job)
+
+@app.get("/jobs/{job_id}")
+async def get_scoring_job(job_id: str):
+    """Status and shard-level progress of a scoring job"""
+    from job_queue import job_status
+    return job_status(get_job_or_404(job_id))
+
+@app.delete("/jobs/{job_id}")
+async def cancel_scoring_job(job_id: str):
+    """Cancel a queued or running job (a running job stops after its current shard)"""
+    from job_queue import job_status
+    get_job_or_404(job_id)
+    return job_status(job_queue.cancel(job_id))
+
+@app.get("/jobs/{job_id}/results")
+async def download_job_results(job_id: str):
+    """Stream the scored Parquet file of a completed job"""
+    from job_queue import COMPLETED
+    job = get_job_or_404(job_id)
+    if job['status'] != COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job['status']}, results not available")
+    return FileResponse(job_queue.result_path(job_id), media_type="application/vnd.apache.parquet",
+                        filename=f"{job_id}.parquet")
+
 if __name__ == "__main__":
     # Run the FastAPI app
     uvicorn.run(
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Saved Model Artifacts
+=====================
+
+Loads the trained ensemble and its preprocessing (scaler, label encoders,
+feature names) from ``MODEL_DIR`` once, and scores whole frames with it.
+Missing inputs are filled with the training run's imputation values
+(``imputation_values.pkl``, written by training as
+``sophisticated_imputation_values.pkl``) before encoding. Categorical
+columns are encoded the way training encoded them: label-encoded columns
+are mapped through the encoder's classes in one vectorized lookup (unseen
+categories become -1), frequency-encoded ones through their training
+counts (``frequency_maps.pkl``, unseen categories become 0), and the
+high-cardinality columns in ``hashed_columns.pkl`` are hashed. Each model
+feature is built from the input column of the same name, so TreeSHAP
+contributions map straight back to input columns.
+
+Training saves a voting ensemble as a plain dict of its fitted members,
+weights and (for stacking) logistic-regression meta-learner, so loading it
+does not need the trainer's modules; ``load`` rebuilds the combiner from it
+as a ``SavedEnsemble``.
+
+When ``student_model.pkl`` (the distilled student written by training as
+``sophisticated_student_model.pkl``) is present, it is served as the
+``fast`` model tier: a shallow LightGBM regressor whose prediction is the
+failure probability, read from the same scaled matrix as the ensemble.
+
+When ``calibration.pkl`` (``sophisticated_calibration.pkl``) is present,
+each tier's probabilities are mapped through its piecewise-linear
+calibration table with ``np.interp`` (a binary search per row).
+
+``score`` also returns the uncertainty of every row from the same pass: the
+voting ensemble's member probabilities and their spread (standard
+deviation), or, for a bare random forest, the spread of its trees.
+``confidence`` is the probability of the predicted label, discounted by
+the spread: ``max(p, 1 - p) * (1 - 2 * spread)``.
+"""
+
+import os
+import pickle
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'model')
+
+ARTIFACT_FILES = {
+    'model': 'ensemble_trained_model.pkl',
+    'scaler': 'scaler.pkl',
+    'label_encoders': 'label_encoders.pkl',
+    'feature_names': 'feature_names.pkl',
+    'student': 'student_model.pkl',
+    'calibration': 'calibration.pkl',
+    'imputation_values': 'imputation_values.pkl',
+    'frequency_maps': 'frequency_maps.pkl',
+    'hashed_columns': 'hashed_columns.pkl',
+}
+
+# Model tiers: the saved ensemble, or its distilled student
+MODEL_TIERS = ('full', 'fast')
+
+# Key of training's hash encoding (xgboost_train.HASH_KEY)
+HASH_KEY = '0123456789123456'
+
+# Marks a voting ensemble saved as a dict by training (ensembles.saved_form)
+ENSEMBLE_FORMAT = 'prefit_voting_ensemble'
+
+
+class SavedEnsemble:
+    """Soft-voting (or stacked) combiner over the fitted members of a saved ensemble"""
+
+    def __init__(self, estimators: List[Tuple[str, Any]], weights: Optional[Sequence[float]] = None,
+                 meta_learner: Any = None):
+        self.estimators = list(estimators)
+        self.weights = weights
+        self.meta_learner_ = meta_learner
+        self.estimators_ = [est for _, est in self.estimators]
+        self.named_estimators_ = dict(self.estimators)
+        self.classes_ = np.asarray(getattr(self.estimators_[0], 'classes_', [0, 1]))
+
+    @classmethod
+    def from_dict(cls, saved: Dict[str, Any]) -> 'SavedEnsemble':
+        return cls(saved['estimators'], saved['weights'], saved['meta_learner'])
+
+    def member_probabilities(self, X: np.ndarray) -> np.ndarray:
+        """Positive-class probability of every member, shape (n_samples, n_members)"""
+        return np.column_stack([est.predict_proba(X)[:, 1] for est in self.estimators_])
+
+    def combine(self, member_proba: np.ndarray) -> np.ndarray:
+        """Positive-class probability of the ensemble from member probabilities"""
+        if self.meta_learner_ is not None:
+            clipped = np.clip(member_proba, 1e-6, 1 - 1e-6)
+            return self.meta_learner_.predict_proba(np.log(clipped / (1 - clipped)))[:, 1]
+        weights = np.ones(member_proba.shape[1]) if self.weights is None else np.asarray(self.weights)
+        return member_proba @ (weights / weights.sum())
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        positive = self.combine(self.member_probabilities(X))
+        return np.column_stack([1 - positive, positive])
+
+
+class ModelArtifacts:
+    """The saved ensemble plus the preprocessing it was trained with"""
+
+    def __init__(self, model: Any, feature_names: List[str], scaler: Any = None,
+                 label_encoders: Optional[Dict[str, Any]] = None, model_dir: Optional[str] = None,
+                 student: Any = None, calibration: Optional[Dict[str, Dict[str, Any]]] = None,
+                 imputation_values: Optional[Dict[str, Any]] = None,
+                 frequency_maps: Optional[Dict[str, Dict[Any, float]]] = None,
+                 hashed_columns: Optional[List[str]] = None):
+        self.model = model
+        self.student = student
+        self.calibration = calibration or {}
+        self.feature_names = list(feature_names)
+        self.scaler = scaler
+        self.label_encoders = label_encoders or {}
+        self.imputation_values = imputation_values or {}
+        self.frequency_maps = frequency_maps or {}
+        self.hashed_columns = set(hashed_columns or [])
+        self.model_dir = model_dir
+        self._explainers: Dict[str, Any] = {}
+
+    @classmethod
+    def load(cls, model_dir: Optional[str] = None) -> 'ModelArtifacts':
+        model_dir = model_dir or os.getenv('MODEL_DIR') or DEFAULT_MODEL_DIR
+        artifacts = {}
+        for name, filename in ARTIFACT_FILES.items():
+            path = os.path.join(model_dir, filename)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    artifacts[name] = pickle.load(f)
+        if 'model' not in artifacts or 'feature_names' not in artifacts:
+            raise FileNotFoundError(f"No trained model found in {model_dir}")
+        model = artifacts['model']
+        if isinstance(model, dict) and model.get('format') == ENSEMBLE_FORMAT:
+            artifacts['model'] = SavedEnsemble.from_dict(model)
+        return cls(model_dir=model_dir, **artifacts)
+
+    def covers(self, columns: Iterable[str]) -> bool:
+        """True if a frame with ``columns`` has every model feature"""
+        return set(self.feature_names).issubset(columns)
+
+    def rows_covered(self, df: pd.DataFrame) -> np.ndarray:
+        """Rows of ``df`` with a non-null value for every model feature"""
+        if not self.covers(df.columns):
+            return np.zeros(len(df), dtype=bool)
+        return df[self.feature_names].notna().all(axis=1).to_numpy()
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        """Model input matrix for ``df`` (imputed, encoded, then scaled)"""
+        X = np.empty((len(df), len(self.feature_names)), dtype=np.float64)
+        for i, col in enumerate(self.feature_names):
+            values = df[col]
+            if col in self.imputation_values:
+                values = values.astype(object).where(values.notna(), self.imputation_values[col])
+            encoder = self.label_encoders.get(col)
+            if encoder is not None:
+                X[:, i] = pd.Index(encoder.classes_).get_indexer(values.astype(str))
+            elif col in self.frequency_maps:
+                X[:, i] = values.map(self.frequency_maps[col]).astype(float).fillna(0)
+            elif col in self.hashed_columns:
+                X[:, i] = pd.util.hash_pandas_object(values, index=False, hash_key=HASH_KEY).astype(np.uint32)
+            else:
+                X[:, i] = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64)
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        return X
+
+    def has_tier(self, tier: str) -> bool:
+        return tier == 'full' or (tier == 'fast' and self.student is not None)
+
+    def calibrated(self, tier: str = 'full') -> bool:
+        return tier in self.calibration
+
+    @property
+    def member_names(self) -> List[str]:
+        """Members of the saved voting ensemble (empty for a single model)"""
+        return list(getattr(self.model, 'named_estimators_', {})) if hasattr(self.model, 'combine') else []
+
+    def score(self, df: pd.DataFrame, tier: str = 'full') -> pd.DataFrame:
+        """
+        ``model_score`` (failure probability, calibrated if the tier has a
+        calibration table) and ``model_spread`` per row, plus one column per
+        ensemble member with its probability, all from one inference pass
+        """
+        if tier not in MODEL_TIERS:
+            raise ValueError(f"Unknown model tier {tier!r}")
+        X = self.transform(df)
+        out = pd.DataFrame(index=df.index)
+        spread = np.zeros(len(df))
+        if tier == 'fast':
+            if self.student is None:
+                raise ValueError(f"No distilled student model in {self.model_dir}")
+            proba = np.clip(self.student.predict(X), 0.0, 1.0)
+        elif hasattr(self.model, 'combine'):
+            member_proba = self.model.member_probabilities(X)
+            proba = self.model.combine(member_proba)
+            spread = member_proba.std(axis=1)
+            for name, column in zip(self.member_names, member_proba.T):
+                out[name] = column
+        elif hasattr(getattr(self.model, 'estimators_', [None])[0], 'tree_'):
+            proba, spread = _forest_mean_and_spread(self.model, X)
+        else:
+            proba = self.model.predict_proba(X)[:, 1]
+        table = self.calibration.get(tier)
+        out.insert(0, 'model_score', proba if table is None else np.interp(proba, table['x'], table['y']))
+        out.insert(1, 'model_spread', spread)
+        return out
+
+    def predict_proba(self, df: pd.DataFrame, tier: str = 'full') -> np.ndarray:
+        """
+        Failure probability per row from the ensemble (``full``) or its
+        student (``fast``), calibrated if the tier has a calibration table
+        """
+        return self.score(df, tier)['model_score'].to_numpy()
+
+    @staticmethod
+    def confidence(proba: np.ndarray, spread: Optional[np.ndarray] = None) -> np.ndarray:
+        """Probability that the predicted label is right, discounted by the members' spread"""
+        label_proba = np.maximum(proba, 1 - proba)
+        if spread is None:
+            return label_proba
+        return label_proba * np.clip(1 - 2 * np.asarray(spread), 0.0, 1.0)
+
+    def explain(self, df: pd.DataFrame, tier: str = 'full') -> pd.DataFrame:
+        """TreeSHAP contribution (log-odds) of every model input column per row"""
+        if tier not in self._explainers:
+            from explanations import TreeExplainer
+            self._explainers[tier] = TreeExplainer(self.student if tier == 'fast' else self.model,
+                                                   self.feature_names)
+        contributions, _ = self._explainers[tier].contributions(self.transform(df))
+        contributions.index = df.index
+        return contributions
+
+
+def model_factors(contributions: pd.DataFrame, top: int = 3) -> np.ndarray:
+    """Input columns with the largest positive TreeSHAP contributions per row"""
+    values = contributions.to_numpy()
+    order = np.argsort(-values, axis=1)[:, :top]
+    columns = contributions.columns.to_numpy()
+    factors = np.empty(len(values), dtype=object)
+    for i, (row, cols) in enumerate(zip(values, order)):
+        factors[i] = [columns[c] for c in cols if row[c] > 0]
+    return factors
+
+
+def _forest_mean_and_spread(forest: Any, X: np.ndarray):
+    """Positive-class probability of a random forest and the spread of its trees, tree by tree like sklearn"""
+    X = np.asarray(X, dtype=np.float32)
+    total = np.zeros(len(X))
+    total_squares = np.zeros(len(X))
+    for tree in forest.estimators_:
+        proba = tree.predict_proba(X, check_input=False)[:, 1]
+        total += proba
+        total_squares += proba ** 2
+    mean = total / len(forest.estimators_)
+    return mean, np.sqrt(np.maximum(total_squares / len(forest.estimators_) - mean ** 2, 0.0))
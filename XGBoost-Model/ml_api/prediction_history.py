@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Prediction History Store
+========================
+
+Append-only log of every prediction served, backing risk history and
+trends.
+
+- Predictions are kept in SQLite (WAL mode), indexed on (business id,
+  timestamp) and on timestamp, so a business's history or a time window is
+  a range scan.
+- Monthly rollups (prediction count, score sum, risk-level counts) are kept
+  per business and for the whole portfolio. They are updated in the same
+  transaction as each batch of inserts, so trends are never recomputed from
+  the raw log.
+- ``record`` only puts the prediction on an in-memory queue. A background
+  thread writes queued predictions in batches, so ``/predict`` never waits
+  on the disk. When the queue is full, predictions are dropped and counted
+  rather than blocking.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+DEFAULT_HISTORY_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'history', 'predictions.sqlite')
+
+# Business id under which portfolio-wide rollups are stored
+PORTFOLIO = '*'
+
+RISK_LEVEL_COLUMNS = {'High Risk': 'high_risk', 'Medium Risk': 'medium_risk', 'Low Risk': 'low_risk'}
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS predictions (
+        id INTEGER PRIMARY KEY,
+        business_id TEXT,
+        ts REAL NOT NULL,
+        risk_score REAL NOT NULL,
+        risk_level TEXT NOT NULL,
+        confidence REAL,
+        key_factors TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS predictions_business_ts ON predictions (business_id, ts)",
+    "CREATE INDEX IF NOT EXISTS predictions_ts ON predictions (ts)",
+    """
+    CREATE TABLE IF NOT EXISTS monthly_rollups (
+        business_id TEXT NOT NULL,
+        month TEXT NOT NULL,
+        predictions INTEGER NOT NULL,
+        score_sum REAL NOT NULL,
+        high_risk INTEGER NOT NULL,
+        medium_risk INTEGER NOT NULL,
+        low_risk INTEGER NOT NULL,
+        PRIMARY KEY (business_id, month)
+    )
+    """,
+]
+
+UPSERT_ROLLUP = """
+INSERT INTO monthly_rollups (business_id, month, predictions, score_sum, high_risk, medium_risk, low_risk)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (business_id, month) DO UPDATE SET
+    predictions = predictions + excluded.predictions,
+    score_sum = score_sum + excluded.score_sum,
+    high_risk = high_risk + excluded.high_risk,
+    medium_risk = medium_risk + excluded.medium_risk,
+    low_risk = low_risk + excluded.low_risk
+"""
+
+
+def month_of(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime('%Y-%m')
+
+
+class PredictionHistory:
+    """SQLite prediction log with a batched background writer"""
+
+    def __init__(self, db_path: Optional[str] = None, batch_size: int = 500,
+                 flush_interval: float = 1.0, max_queue: int = 100_000):
+        self.db_path = db_path or os.getenv('HISTORY_DB') or DEFAULT_HISTORY_DB
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: 'queue.Queue[Optional[tuple]]' = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.written = 0
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            for statement in SCHEMA:
+                conn.execute(statement)
+        self.writer = threading.Thread(target=self._write_loop, name='prediction-history', daemon=True)
+        self.writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def record(self, business_id: Optional[str], risk_score: float, risk_level: str,
+               confidence: Optional[float] = None, key_factors: Optional[List[str]] = None,
+               ts: Optional[float] = None):
+        """Queue one prediction for writing (never blocks)"""
+        row = (business_id, time.time() if ts is None else ts, float(risk_score), risk_level,
+               confidence, json.dumps(key_factors) if key_factors is not None else None)
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self):
+        conn = self._connect()
+        try:
+            while True:
+                batch = [self.queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                while batch[-1] is not None and len(batch) < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(self.queue.get(timeout=timeout))
+                    except queue.Empty:
+                        break
+                stop = batch[-1] is None
+                rows = [row for row in batch if row is not None]
+                if rows:
+                    self._write(conn, rows)
+                for _ in batch:
+                    self.queue.task_done()
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _write(self, conn: sqlite3.Connection, rows: List[tuple]):
+        rollups: Dict[tuple, List[float]] = {}
+        for business_id, ts, risk_score, risk_level, _, _ in rows:
+            levels = [risk_level == level for level in RISK_LEVEL_COLUMNS]
+            for owner in ({business_id, PORTFOLIO} if business_id is not None else {PORTFOLIO}):
+                totals = rollups.setdefault((owner, month_of(ts)), [0, 0.0, 0, 0, 0])
+                totals[0] += 1
+                totals[1] += risk_score
+                for i, hit in enumerate(levels):
+                    totals[2 + i] += hit
+        with conn:
+            conn.executemany('INSERT INTO predictions (business_id, ts, risk_score, risk_level, confidence, '
+                             'key_factors) VALUES (?, ?, ?, ?, ?, ?)', rows)
+            conn.executemany(UPSERT_ROLLUP, [(*key, *totals) for key, totals in rollups.items()])
+        self.written += len(rows)
+
+    def flush(self):
+        """Block until every queued prediction is written"""
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(None)
+        self.writer.join()
+
+    def predictions(self, business_id: Optional[str] = None, start: Optional[float] = None,
+                    end: Optional[float] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent predictions (optionally of one business) within [start, end)"""
+        clauses, params = [], []
+        if business_id is not None:
+            clauses.append('business_id = ?')
+            params.append(business_id)
+        if start is not None:
+            clauses.append('ts >= ?')
+            params.append(start)
+        if end is not None:
+            clauses.append('ts < ?')
+            params.append(end)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._connect() as conn:
+            rows = conn.execute(f'SELECT business_id, ts, risk_score, risk_level, confidence, key_factors '
+                                f'FROM predictions {where} ORDER BY ts DESC LIMIT ?', (*params, limit)).fetchall()
+        return [{
+            'businessId': row['business_id'],
+            'timestamp': datetime.fromtimestamp(row['ts'], tz=timezone.utc).isoformat(),
+            'risk_score': row['risk_score'],
+            'risk_level': row['risk_level'],
+            'confidence': row['confidence'],
+            'key_factors': json.loads(row['key_factors']) if row['key_factors'] else [],
+        } for row in rows]
+
+    def monthly(self, business_id: Optional[str] = None, start_month: Optional[str] = None,
+                end_month: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Monthly rollups, oldest first; the whole portfolio when ``business_id`` is None"""
+        clauses, params = ['business_id = ?'], [PORTFOLIO if business_id is None else business_id]
+        if start_month is not None:
+            clauses.append('month >= ?')
+            params.append(start_month)
+        if end_month is not None:
+            clauses.append('month <= ?')
+            params.append(end_month)
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT * FROM monthly_rollups WHERE {' AND '.join(clauses)} ORDER BY month",
+                                params).fetchall()
+        return [{
+            'month': row['month'],
+            'predictions': row['predictions'],
+            'avg_risk_score': row['score_sum'] / row['predictions'],
+            'risk_levels': {level: row[column] for level, column in RISK_LEVEL_COLUMNS.items()},
+        } for row in rows]
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Per-Segment Model Routing
+=========================
+
+Routes each business to the model and risk weights of its segment
+(``industryType`` × ``location``).
+
+Segments live under ``SEGMENT_DIR`` (default ``<MODEL_DIR>/segments``)::
+
+    segments/<industry>/<location>/   industry in one region
+    segments/<industry>/_all/         industry anywhere
+    segments/_all/<location>/         any industry in one region
+
+Names are lower-cased with every run of other characters replaced by
+``-`` (``"Food & Beverage"`` → ``food-beverage``). A segment directory holds
+the saved-model artifacts (see ``model_artifacts``), a ``risk_weights.json``
+overriding entries of ``RISK_WEIGHTS``, or both. A business uses the most
+specific segment that exists, in the order above, and the global model and
+weights for whatever its segment lacks.
+
+Every ``risk_weights.json`` is read and checked (a JSON object of known
+``RISK_WEIGHTS`` keys to numbers) when the router starts, so a malformed
+file fails startup with its path instead of failing requests.
+
+Segment models are loaded lazily, on first use, into an LRU pool. The pool
+is capped by the models' size on disk (``SEGMENT_POOL_MB``, default 512); the
+least recently used models are evicted to make room. Batches are grouped
+by segment so each model scores one contiguous sub-batch.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from main import RISK_WEIGHTS, SegmentLoadError, component_weights
+from model_artifacts import ARTIFACT_FILES, DEFAULT_MODEL_DIR, ModelArtifacts
+
+ANY = '_all'
+WEIGHTS_FILE = 'risk_weights.json'
+
+# Key of the global segment (no segment directory)
+GLOBAL = 'global'
+
+
+def slug(name: Any) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', str(name).strip().lower()).strip('-')
+
+
+class Segment:
+    """Model artifacts and risk weights of one segment, with global fallbacks"""
+
+    def __init__(self, key: str, artifacts: Optional[ModelArtifacts], risk_weights: Dict[str, float],
+                 size_bytes: int = 0):
+        self.key = key
+        self.artifacts = artifacts
+        self.risk_weights = risk_weights
+        self.weights = component_weights(risk_weights)
+        self.size_bytes = size_bytes
+
+
+class SegmentRouter:
+    """Resolves businesses to segments and keeps the hottest segment models in an LRU pool"""
+
+    def __init__(self, global_artifacts: Optional[ModelArtifacts] = None, segment_dir: Optional[str] = None,
+                 max_bytes: Optional[int] = None):
+        self.segment_dir = segment_dir or os.getenv('SEGMENT_DIR') or os.path.join(
+            os.getenv('MODEL_DIR') or DEFAULT_MODEL_DIR, 'segments')
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            float(os.getenv('SEGMENT_POOL_MB', 512)) * 1024 ** 2)
+        self.global_segment = Segment(GLOBAL, global_artifacts, RISK_WEIGHTS)
+        self.available = self._scan()
+        self.risk_weights = {key: self._read_weights(key) for key in self.available}
+        self.pool: 'OrderedDict[str, Segment]' = OrderedDict()
+        self.pool_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def _scan(self) -> set:
+        """Keys (``industry/location``) of the segment directories that exist"""
+        keys = set()
+        if not os.path.isdir(self.segment_dir):
+            return keys
+        for industry in os.listdir(self.segment_dir):
+            industry_dir = os.path.join(self.segment_dir, industry)
+            if not os.path.isdir(industry_dir):
+                continue
+            for location in os.listdir(industry_dir):
+                if os.path.isdir(os.path.join(industry_dir, location)):
+                    keys.add(f'{industry}/{location}')
+        return keys
+
+    def resolve(self, industry: Any, location: Any) -> str:
+        """Most specific existing segment key for a business, or ``GLOBAL``"""
+        industry, location = slug(industry), slug(location)
+        for key in (f'{industry}/{location}', f'{industry}/{ANY}', f'{ANY}/{location}'):
+            if key in self.available:
+                return key
+        return GLOBAL
+
+    def _read_weights(self, key: str) -> Dict[str, float]:
+        """``RISK_WEIGHTS`` with the segment's overrides, if it has a valid ``risk_weights.json``"""
+        risk_weights = dict(RISK_WEIGHTS)
+        weights_path = os.path.join(self.segment_dir, *key.split('/'), WEIGHTS_FILE)
+        if not os.path.exists(weights_path):
+            return risk_weights
+        try:
+            with open(weights_path) as f:
+                overrides = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"Malformed risk weights in {weights_path}: {e}") from e
+        if not isinstance(overrides, dict):
+            raise ValueError(f"Risk weights in {weights_path} must be a JSON object")
+        unknown = set(overrides) - set(RISK_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown risk weights in {weights_path}: {sorted(unknown)}")
+        not_numbers = sorted(name for name, value in overrides.items()
+                             if isinstance(value, bool) or not isinstance(value, (int, float)))
+        if not_numbers:
+            raise ValueError(f"Risk weights in {weights_path} must be numbers: {not_numbers}")
+        risk_weights.update(overrides)
+        return risk_weights
+
+    def _load(self, key: str) -> Segment:
+        path = os.path.join(self.segment_dir, *key.split('/'))
+        risk_weights = self.risk_weights[key]
+        artifacts, size_bytes = self.global_segment.artifacts, 0
+        if os.path.exists(os.path.join(path, ARTIFACT_FILES['model'])):
+            artifacts = ModelArtifacts.load(path)
+            size_bytes = sum(os.path.getsize(os.path.join(path, filename)) for filename in ARTIFACT_FILES.values()
+                             if os.path.exists(os.path.join(path, filename)))
+        return Segment(key, artifacts, risk_weights, size_bytes)
+
+    def get(self, key: str) -> Segment:
+        """Segment for ``key``, loading it (and evicting cold segments) if needed"""
+        if key == GLOBAL:
+            return self.global_segment
+        with self.lock:
+            segment = self.pool.get(key)
+            if segment is not None:
+                self.pool.move_to_end(key)
+                self.hits += 1
+                return segment
+            try:
+                segment = self._load(key)
+            except Exception as e:
+                raise SegmentLoadError(f"Segment {key} could not be loaded: {e}") from e
+            self.loads += 1
+            while self.pool and self.pool_bytes + segment.size_bytes > self.max_bytes:
+                _, evicted = self.pool.popitem(last=False)
+                self.pool_bytes -= evicted.size_bytes
+                self.evictions += 1
+            self.pool[key] = segment
+            self.pool_bytes += segment.size_bytes
+            return segment
+
+    def route(self, industry: Any, location: Any) -> Segment:
+        return self.get(self.resolve(industry, location))
+
+    def weights(self, industry: Any, location: Any) -> Tuple[str, Dict[str, float]]:
+        """(segment key, component weights) for a business, without loading the segment's model"""
+        key = self.resolve(industry, location)
+        return key, component_weights(self.risk_weights.get(key, RISK_WEIGHTS))
+
+    def groups(self, data: pd.DataFrame) -> Iterator[Tuple[Segment, np.ndarray]]:
+        """
+        (segment, row positions) per segment in ``data``, each a contiguous
+        run of a stable sort by segment
+        """
+        pairs = data['industryType'].astype(str) + '\0' + data['location'].astype(str)
+        codes, uniques = pd.factorize(pairs)
+        keys = np.array([self.resolve(*pair.split('\0', 1)) for pair in uniques], dtype=object)
+        segment_keys, segment_codes = np.unique(keys, return_inverse=True)
+        row_codes = segment_codes[codes]
+        order = np.argsort(row_codes, kind='stable')
+        bounds = np.flatnonzero(np.diff(row_codes[order])) + 1
+        for rows in np.split(order, bounds):
+            if len(rows):
+                yield self.get(segment_keys[row_codes[rows[0]]]), rows
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'segment_dir': self.segment_dir,
+                'available': sorted(self.available),
+                'loaded': list(self.pool),
+                'pool_bytes': self.pool_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'loads': self.loads,
+                'evictions': self.evictions,
+            }
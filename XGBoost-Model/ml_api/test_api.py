@@ -12,6 +12,10 @@ Usage:
 
 import requests
 import json
+import os
+import subprocess
+import sys
+import tempfile
 import time
 from typing import Dict, Any
 
@@ -363,6 +367,632 @@ def test_performance_benchmark():
         print(f"   ❌ Performance test error: {str(e)}")
         return False
 
+def test_bulk_scoring_job():
+    """Test the asynchronous bulk scoring job endpoints"""
+    print("\n📦 Testing bulk scoring job...")
+    
+    header = ("businessId,revenue,expenses,cashFlow,debt,assets,employeeCount,yearsInBusiness,"
+              "industryType,location,marketGrowth,competitionLevel,customerRetention,digitalPresence,innovationScore")
+    rows = [
+        "B1,1500000,1800000,-50000,2500000,800000,12,1,Retail,Mumbai,2,9,35,3,2",
+        "B2,5000000,3500000,120000,500000,4000000,25,8,Technology,Bangalore,15,4,85,9,8",
+        "B3,-1,0,0,0,0,1,0,Retail,Pune,0,5,50,5,5",  # invalid: negative revenue
+    ]
+    
+    try:
+        response = requests.post(f"{BASE_URL}/jobs?format=csv", data="\n".join([header, *rows]) + "\n")
+        if response.status_code != 202:
+            print(f"   ❌ Job submission failed! Status: {response.status_code}")
+            return False
+        job_id = response.json()['job_id']
+        print(f"   🆔 Job ID: {job_id}")
+        
+        for _ in range(50):
+            status = requests.get(f"{BASE_URL}/jobs/{job_id}").json()
+            if status['status'] in ('completed', 'failed', 'cancelled'):
+                break
+            time.sleep(0.2)
+        
+        print(f"   📊 Status: {status['status']} ({status['chunks_done']}/{status['chunks_total']} chunks, "
+              f"{status['rows_scored']} rows, {status['invalid_rows']} invalid)")
+        if status['status'] != 'completed' or status['rows_scored'] != 3 or status['invalid_rows'] != 1:
+            print(f"   ❌ Unexpected job result!")
+            return False
+        
+        download = requests.get(f"{BASE_URL}/jobs/{job_id}/results")
+        if download.status_code == 200 and download.content[:4] == b"PAR1":
+            print(f"   ✅ Bulk scoring job passed! ({len(download.content):,} byte Parquet result)")
+            return True
+        print(f"   ❌ Result download failed! Status: {download.status_code}")
+        return False
+        
+    except Exception as e:
+        print(f"   ❌ Bulk scoring job error: {str(e)}")
+        return False
+
+def test_prediction_history():
+    """Test that predictions are recorded and served by the history endpoint"""
+    print("\n🗂️  Testing prediction history...")
+    
+    business_id = f"test-{int(time.time() * 1000)}"
+    business_data = {
+        "revenue": 2000000,
+        "expenses": 1800000,
+        "cashFlow": 15000,
+        "debt": 1000000,
+        "assets": 1500000,
+        "employeeCount": 10,
+        "yearsInBusiness": 3,
+        "industryType": "Retail",
+        "location": "Chennai",
+        "marketGrowth": 5,
+        "competitionLevel": 5,
+        "customerRetention": 60,
+        "digitalPresence": 6,
+        "innovationScore": 5,
+        "businessId": business_id
+    }
+    
+    try:
+        for _ in range(2):
+            response = requests.post(f"{BASE_URL}/predict", json=business_data)
+            if response.status_code != 200:
+                print(f"   ❌ Prediction failed! Status: {response.status_code}")
+                return False
+        
+        # Predictions are written in the background, in batches
+        time.sleep(2)
+        history = requests.get(f"{BASE_URL}/history", params={"businessId": business_id}).json()
+        months = history['monthly']
+        print(f"   📊 Recorded: {len(history['predictions'])} predictions, {len(months)} month(s)")
+        
+        if len(history['predictions']) == 2 and months and months[-1]['predictions'] == 2:
+            print(f"   ✅ Prediction history passed! Avg score {months[-1]['avg_risk_score']:.1%} ({months[-1]['risk_level']})")
+            return True
+        print(f"   ❌ Unexpected history: {history}")
+        return False
+        
+    except Exception as e:
+        print(f"   ❌ Prediction history error: {str(e)}")
+        return False
+
+def test_explained_prediction():
+    """Test explain=true: Shapley contributions that add up to the score"""
+    print("\n🧮 Testing explained prediction...")
+    
+    business_data = {
+        "revenue": 1500000,
+        "expenses": 1800000,
+        "cashFlow": -50000,
+        "debt": 2500000,
+        "assets": 800000,
+        "employeeCount": 12,
+        "yearsInBusiness": 1,
+        "industryType": "Retail",
+        "location": "Mumbai",
+        "marketGrowth": 2,
+        "competitionLevel": 9,
+        "customerRetention": 35,
+        "digitalPresence": 3,
+        "innovationScore": 2
+    }
+    
+    try:
+        response = requests.post(f"{BASE_URL}/predict", params={"explain": "true"}, json=business_data)
+        if response.status_code != 200:
+            print(f"   ❌ Explained prediction failed! Status: {response.status_code}")
+            return False
+        
+        result = response.json()
+        explanation = result['explanation']
+        gap = result['risk_score'] - result['baseline_risk_score'] - sum(explanation.values())
+        print(f"   🎯 Key Factors: {', '.join(result['key_factors'])}")
+        print(f"   📊 Top contributions: {dict(list(explanation.items())[:3])}")
+        
+        if abs(gap) < 0.01 and next(iter(explanation)) == "cashFlow":
+            print(f"   ✅ Explained prediction passed! Contributions sum to score - baseline")
+            return True
+        print(f"   ❌ Contributions do not add up (gap {gap:.4f})")
+        return False
+        
+    except Exception as e:
+        print(f"   ❌ Explained prediction error: {str(e)}")
+        return False
+
+def test_explained_cascade_prediction():
+    """Test explain=true on an escalated cascade score: the model's contributions over modelInputs"""
+    print("\n🔬 Testing explained cascade prediction...")
+    
+    business_data = {
+        "revenue": 1500000, "expenses": 1400000, "cashFlow": 10000, "debt": 500000,
+        "assets": 800000, "employeeCount": 12, "yearsInBusiness": 4, "industryType": "Retail",
+        "location": "Mumbai", "marketGrowth": 2, "competitionLevel": 9, "customerRetention": 35,
+        "digitalPresence": 3, "innovationScore": 2,
+        "modelInputs": {"dti": 20, "fico_range_low": 700, "loan_amnt": 10000,
+                        "addr_state": "CA", "emp_length": "5 years"}
+    }
+    
+    try:
+        response = requests.post(f"{BASE_URL}/predict", params={"mode": "cascade", "explain": "true"},
+                                 json=business_data)
+        if response.status_code != 200:
+            print(f"   ❌ Explained cascade prediction failed! Status: {response.status_code}")
+            return False
+        
+        result = response.json()
+        print(f"   📊 {result['risk_level']} ({result['risk_score']:.3f}) from the {result['tier']} tier")
+        print(f"   📊 Contributions: {result['explanation']}")
+        if result['tier'] == "rules":
+            print(f"   ⚠️ Not escalated - nothing model-specific to check")
+            return True
+        if set(result['explanation']) <= set(business_data['modelInputs']) and result['baseline_risk_score'] is None:
+            print(f"   ✅ Explained cascade prediction passed! Model score explained by modelInputs")
+            return True
+        print(f"   ❌ Escalated score was not explained by the model")
+        return False
+        
+    except Exception as e:
+        print(f"   ❌ Explained cascade prediction error: {str(e)}")
+        return False
+
+def test_whatif_analysis():
+    """Test /predict/whatif: nearest changes that cross each risk threshold"""
+    print("\n🔀 Testing what-if analysis...")
+    
+    business_data = {
+        "revenue": 1500000,
+        "expenses": 1800000,
+        "cashFlow": -50000,
+        "debt": 2500000,
+        "assets": 800000,
+        "employeeCount": 12,
+        "yearsInBusiness": 1,
+        "industryType": "Retail",
+        "location": "Mumbai",
+        "marketGrowth": 2,
+        "competitionLevel": 9,
+        "customerRetention": 35,
+        "digitalPresence": 3,
+        "innovationScore": 2
+    }
+    ranges = {
+        "cashFlow": {"min": -50000, "max": 150000, "steps": 41},
+        "debt": {"min": 0, "max": 2500000, "steps": 26},
+        "customerRetention": {"min": 35, "max": 95, "steps": 13}
+    }
+    
+    try:
+        start_time = time.time()
+        response = requests.post(f"{BASE_URL}/predict/whatif", json={"business": business_data, "ranges": ranges})
+        elapsed = time.time() - start_time
+        if response.status_code != 200:
+            print(f"   ❌ What-if analysis failed! Status: {response.status_code}")
+            return False
+        
+        result = response.json()
+        print(f"   📊 Base: {result['base']['risk_level']} ({result['base']['risk_score']:.3f}), "
+              f"{result['grid_points']:,} points in {elapsed:.2f}s")
+        for crossing in result['crossings']:
+            if crossing['nearest']:
+                print(f"   🎯 {crossing['from']} → {crossing['to']}: {crossing['nearest']['changes']}")
+        
+        nearest = [crossing['nearest'] for crossing in result['crossings']]
+        if result['base']['risk_level'] == "High Risk" and all(nearest):
+            print(f"   ✅ What-if analysis passed! Found changes crossing both thresholds")
+            return True
+        print(f"   ❌ Expected changes crossing both thresholds")
+        return False
+        
+    except Exception as e:
+        print(f"   ❌ What-if analysis error: {str(e)}")
+        return False
+
+def test_live_scoring():
+    """Test /ws/predict: a burst of field edits is scored once, incrementally"""
+    print("\n⌨️  Testing live scoring over WebSocket...")
+    
+    business_data = {
+        "revenue": 1500000,
+        "expenses": 1800000,
+        "cashFlow": -50000,
+        "debt": 2500000,
+        "assets": 800000,
+        "employeeCount": 12,
+        "yearsInBusiness": 1,
+        "industryType": "Retail",
+        "location": "Mumbai",
+        "marketGrowth": 2,
+        "competitionLevel": 9,
+        "customerRetention": 35,
+        "digitalPresence": 3,
+        "innovationScore": 2
+    }
+    
+    try:
+        from websockets.sync.client import connect
+        with connect(BASE_URL.replace("http", "ws", 1) + "/ws/predict") as websocket:
+            websocket.send(json.dumps(business_data))
+            initial = json.loads(websocket.recv(timeout=5))
+            print(f"   📊 Initial: {initial['risk_level']} ({initial['risk_score']:.3f})")
+            
+            # Typing "10" into digitalPresence sends two quick updates
+            websocket.send(json.dumps({"digitalPresence": 1}))
+            websocket.send(json.dumps({"digitalPresence": 10}))
+            update = json.loads(websocket.recv(timeout=5))
+            print(f"   🔁 After edit: {update['risk_level']} ({update['risk_score']:.3f}), "
+                  f"recomputed {', '.join(update['recomputed'])}")
+        
+        expected = requests.post(f"{BASE_URL}/predict", json={**business_data, "digitalPresence": 10}).json()
+        if (update['update'] == 2 and abs(update['risk_score'] - expected['risk_score']) < 1e-9
+                and 'cash_flow' not in update['recomputed']):
+            print(f"   ✅ Live scoring passed! Burst coalesced and matches /predict")
+            return True
+        print(f"   ❌ Live update does not match /predict or was not coalesced")
+        return False
+        
+    except Exception as e:
+        print(f"   ❌ Live scoring error: {str(e)}")
+        return False
+
+def test_cascade_scoring():
+    """Test mode=cascade: confident rule scores short-circuit, others escalate"""
+    print("\n🪜 Testing cascade scoring...")
+    
+    clear_cut = {
+        "revenue": 1500000, "expenses": 1800000, "cashFlow": -50000, "debt": 2500000,
+        "assets": 800000, "employeeCount": 12, "yearsInBusiness": 1, "industryType": "Retail",
+        "location": "Mumbai", "marketGrowth": 2, "competitionLevel": 9, "customerRetention": 35,
+        "digitalPresence": 3, "innovationScore": 2
+    }
+    ambiguous = {
+        **clear_cut, "expenses": 1400000, "cashFlow": 10000, "debt": 500000, "yearsInBusiness": 4,
+        "modelInputs": {"dti": 20, "fico_range_low": 700, "loan_amnt": 10000,
+                        "addr_state": "CA", "emp_length": "5 years"}
+    }
+    
+    try:
+        tiers = []
+        for business_data in (clear_cut, ambiguous):
+            response = requests.post(f"{BASE_URL}/predict", params={"mode": "cascade"}, json=business_data)
+            if response.status_code != 200:
+                print(f"   ❌ Cascade prediction failed! Status: {response.status_code}")
+                return False
+            result = response.json()
+            tiers.append(result['tier'])
+            print(f"   📊 {result['risk_level']} ({result['risk_score']:.3f}) from the {result['tier']} tier")
+        
+        metrics = requests.get(f"{BASE_URL}/metrics/cascade").json()
+        print(f"   📈 Escalated {metrics['escalated_fraction']:.0%} of {metrics['rows']} rows")
+        
+        if tiers[0] == "rules" and metrics['escalated'] >= 1:
+            print(f"   ✅ Cascade scoring passed! Clear-cut case short-circuited")
+            return True
+        print(f"   ❌ Unexpected tiers: {tiers}")
+        return False
+        
+    except Exception as e:
+        print(f"   ❌ Cascade scoring error: {str(e)}")
+        return False
+
+def test_cascade_mixed_batch():
+    """Test that a cascade batch escalates only the businesses that carry modelInputs"""
+    print("\n🧩 Testing cascade batch with and without modelInputs...")
+    
+    without_inputs = {
+        "revenue": 1500000, "expenses": 1400000, "cashFlow": 10000, "debt": 500000,
+        "assets": 800000, "employeeCount": 12, "yearsInBusiness": 4, "industryType": "Retail",
+        "location": "Mumbai", "marketGrowth": 2, "competitionLevel": 9, "customerRetention": 35,
+        "digitalPresence": 3, "innovationScore": 2
+    }
+    with_inputs = {**without_inputs, "modelInputs": {"dti": 20, "fico_range_low": 700, "loan_amnt": 10000,
+                                                     "addr_state": "CA", "emp_length": "5 years"}}
+    
+    try:
+        before = requests.get(f"{BASE_URL}/metrics/cascade").json()
+        response = requests.post(f"{BASE_URL}/predict/batch", params={"mode": "cascade"},
+                                 json=[with_inputs, without_inputs])
+        if response.status_code != 200:
+            print(f"   ❌ Mixed cascade batch failed! Status: {response.status_code}")
+            return False
+        batch = response.json()['predictions']
+        alone = requests.post(f"{BASE_URL}/predict", params={"mode": "cascade"}, json=without_inputs).json()
+        after = requests.get(f"{BASE_URL}/metrics/cascade").json()
+        print(f"   📊 With inputs: {batch[0]['tier']} ({batch[0]['risk_score']:.4f}), "
+              f"without: {batch[1]['tier']} ({batch[1]['risk_score']:.4f}), "
+              f"alone: {alone['tier']} ({alone['risk_score']:.4f})")
+        
+        # Both businesses have the same rule score, so both are escalated or neither is;
+        # without inputs, the batch row and the single /predict are each counted as unavailable
+        escalated = batch[0]['tier'] != "rules"
+        unavailable = after['escalation_unavailable'] - before['escalation_unavailable']
+        if (batch[1]['tier'] == alone['tier'] == "rules" and batch[1]['risk_score'] == alone['risk_score']
+                and unavailable == (2 if escalated else 0)):
+            print(f"   ✅ Mixed cascade batch passed! Businesses without inputs keep their rule score")
+            return True
+        print(f"   ❌ Business without modelInputs was scored by the model or not counted as unavailable")
+        return False
+        
+    except Exception as e:
+        print(f"   ❌ Mixed cascade batch error: {str(e)}")
+        return False
+
+def test_fast_model_tier():
+    """Test model_tier=fast: escalations scored by the distilled student"""
+    print("\n🎓 Testing fast model tier...")
+    
+    business_data = {
+        "revenue": 1500000, "expenses": 1400000, "cashFlow": 10000, "debt": 500000,
+        "assets": 800000, "employeeCount": 12, "yearsInBusiness": 4, "industryType": "Retail",
+        "location": "Mumbai", "marketGrowth": 2, "competitionLevel": 9, "customerRetention": 35,
+        "digitalPresence": 3, "innovationScore": 2,
+        "modelInputs": {"dti": 20, "fico_range_low": 700, "loan_amnt": 10000,
+                        "addr_state": "CA", "emp_length": "5 years"}
+    }
+    
+    try:
+        response = requests.post(f"{BASE_URL}/predict", params={"mode": "cascade", "model_tier": "fast"},
+                                 json=business_data)
+        if response.status_code == 503:
+            print(f"   ⚠️  No distilled student model deployed: {response.json()['detail']}")
+            return True
+        if response.status_code != 200:
+            print(f"   ❌ Fast tier prediction failed! Status: {response.status_code}")
+            return False
+        
+        result = response.json()
+        print(f"   📊 {result['risk_level']} ({result['risk_score']:.3f}) from the {result['tier']} tier")
+        if result['tier'] == "student":
+            print(f"   ✅ Fast model tier passed! Escalation served by the student")
+            return True
+        print(f"   ❌ Expected the student tier, got {result['tier']}")
+        return False
+        
+    except Exception as e:
+        print(f"   ❌ Fast model tier error: {str(e)}")
+        return False
+
+def test_batch_prediction():
+    """Test /predict/batch: results in request order, grouped by segment"""
+    print("\n🗺️  Testing batch prediction with segment routing...")
+    
+    business_data = {
+        "revenue": 1500000, "expenses": 1400000, "cashFlow": 10000, "debt": 500000,
+        "assets": 800000, "employeeCount": 12, "yearsInBusiness": 4, "industryType": "Retail",
+        "location": "Mumbai", "marketGrowth": 2, "competitionLevel": 9, "customerRetention": 35,
+        "digitalPresence": 3, "innovationScore": 2
+    }
+    businesses = [{**business_data, "industryType": industry, "location": location, "cashFlow": cash_flow}
+                  for industry in ("Retail", "Manufacturing", "Technology")
+                  for location in ("Mumbai", "Pune")
+                  for cash_flow in (-50000, 10000, 100000)]
+    
+    try:
+        start_time = time.time()
+        response = requests.post(f"{BASE_URL}/predict/batch", json=businesses)
+        elapsed = time.time() - start_time
+        if response.status_code != 200:
+            print(f"   ❌ Batch prediction failed! Status: {response.status_code}")
+            return False
+        
+        result = response.json()
+        print(f"   📊 {len(result['predictions'])} businesses in {elapsed:.3f}s, segments: {result['segments']}")
+        
+        single = requests.post(f"{BASE_URL}/predict", json=businesses[4]).json()
+        if (len(result['predictions']) == len(businesses)
+                and result['predictions'][4]['risk_score'] == single['risk_score']
+                and result['predictions'][4]['segment'] == single['segment']):
+            print(f"   ✅ Batch prediction passed! Matches /predict row by row")
+            return True
+        print(f"   ❌ Batch results do not match /predict")
+        return False
+        
+    except Exception as e:
+        print(f"   ❌ Batch prediction error: {str(e)}")
+        return False
+
+def test_batch_validation():
+    """Test that invalid businesses in a batch are reported row by row while the rest are scored"""
+    print("\n🧾 Testing batch validation...")
+    
+    business_data = {
+        "revenue": 1500000, "expenses": 1400000, "cashFlow": 10000, "debt": 500000,
+        "assets": 800000, "employeeCount": 12, "yearsInBusiness": 4, "industryType": "Retail",
+        "location": "Mumbai", "marketGrowth": 2, "competitionLevel": 9, "customerRetention": 35,
+        "digitalPresence": 3, "innovationScore": 2
+    }
+    invalid = {**business_data, "competitionLevel": 11, "revenue": -5, "employeeCount": "twelve"}
+    missing = {name: value for name, value in business_data.items() if name != "debt"}
+    businesses = [business_data, invalid, business_data, missing]
+    
+    try:
+        response = requests.post(f"{BASE_URL}/predict/batch", json=businesses)
+        if response.status_code != 200:
+            print(f"   ❌ Batch with invalid rows failed! Status: {response.status_code}")
+            return False
+        
+        result = response.json()
+        scored = [p is not None for p in result['predictions']]
+        errors = {error['row']: error['errors'] for error in result['errors']}
+        print(f"   📊 Scored: {scored}, errors: {errors}")
+        
+        # The messages must be the ones /predict gives for the same business
+        expected = {}
+        for row in (1, 3):
+            detail = requests.post(f"{BASE_URL}/predict", json=businesses[row]).json()['detail']
+            expected[row] = {error['loc'][-1]: error['msg'] for error in detail}
+        if scored == [True, False, True, False] and errors == expected:
+            print(f"   ✅ Batch validation passed! Valid rows scored, messages match /predict")
+            return True
+        print(f"   ❌ Expected errors {expected}")
+        return False
+        
+    except Exception as e:
+        print(f"   ❌ Batch validation error: {str(e)}")
+        return False
+
+def test_model_uncertainty():
+    """Test member probabilities and spread on predictions the model scored"""
+    print("\n🎲 Testing ensemble uncertainty...")
+    
+    business_data = {
+        "revenue": 1500000, "expenses": 1400000, "cashFlow": 10000, "debt": 500000,
+        "assets": 800000, "employeeCount": 12, "yearsInBusiness": 4, "industryType": "Retail",
+        "location": "Mumbai", "marketGrowth": 2, "competitionLevel": 9, "customerRetention": 35,
+        "digitalPresence": 3, "innovationScore": 2,
+        "modelInputs": {"dti": 20, "fico_range_low": 700, "loan_amnt": 10000,
+                        "addr_state": "CA", "emp_length": "5 years"}
+    }
+    businesses = [{**business_data, "cashFlow": cash_flow, "expenses": expenses}
+                  for cash_flow in range(-50000, 300001, 25000)
+                  for expenses in range(1200000, 1600001, 50000)]
+    
+    try:
+        response = requests.post(f"{BASE_URL}/predict/batch", params={"mode": "cascade"}, json=businesses)
+        if response.status_code != 200:
+            print(f"   ❌ Batch prediction failed! Status: {response.status_code}")
+            return False
+        
+        scored = [p for p in response.json()['predictions'] if p['tier'] != "rules"]
+        if not scored:
+            print(f"   ⚠️  No business was escalated to the model")
+            return True
+        most_uncertain = max(scored, key=lambda p: p['model_spread'])
+        print(f"   📊 {len(scored)} model-scored, largest spread {most_uncertain['model_spread']:.3f} "
+              f"(members: {most_uncertain['member_scores']}, confidence {most_uncertain['confidence']:.3f})")
+        if all(0 <= p['model_spread'] <= 0.5 and 0 <= p['confidence'] <= 1 for p in scored):
+            print(f"   ✅ Ensemble uncertainty passed!")
+            return True
+        print(f"   ❌ Spread or confidence out of range")
+        return False
+        
+    except Exception as e:
+        print(f"   ❌ Ensemble uncertainty error: {str(e)}")
+        return False
+
+def test_drift_monitoring():
+    """Test input drift sketches of served predictions"""
+    print("\n📈 Testing input drift monitoring...")
+    
+    try:
+        response = requests.get(f"{BASE_URL}/drift")
+        if response.status_code != 200:
+            print(f"   ❌ Drift report failed! Status: {response.status_code}")
+            return False
+        
+        report = response.json()
+        print(f"   📊 {report['rows_recorded']} rows sketched across {report['workers']} worker(s), "
+              f"{len(report['reference_inputs'])} input(s) with a training reference")
+        for name, entry in report['inputs'].items():
+            if entry['reference'] is not None:
+                print(f"   📉 {name}: PSI {entry['reference']['psi']} ({entry['reference']['status']}), "
+                      f"KS {entry['reference']['ks']}")
+        if report['drifted']:
+            print(f"   ⚠️  Drifted inputs: {', '.join(report['drifted'])}")
+        
+        if requests.get(f"{BASE_URL}/drift", params={"window": "tomorrow"}).status_code != 400:
+            print(f"   ❌ Unknown window accepted")
+            return False
+        print(f"   ✅ Drift monitoring passed!")
+        return True
+        
+    except Exception as e:
+        print(f"   ❌ Drift monitoring error: {str(e)}")
+        return False
+
+def test_saved_model_artifacts():
+    """Test that a model saved by training loads and scores through the API's ModelArtifacts"""
+    print("\n💾 Testing saved model artifacts...")
+    
+    api_dir = os.path.dirname(os.path.abspath(__file__))
+    train_script = """
+import os, shutil, sys
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+import xgboost as xgb
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder
+from column_statistics import ColumnStatistics
+from ensembles import PrefitVotingEnsemble
+from incremental_training import AppendOnlyLabelEncoder
+from xgboost_train import SophisticatedMSMEPredictor
+
+model_dir = sys.argv[1]
+rng = np.random.default_rng(42)
+X = rng.normal(size=(400, 6))
+y = (X[:, 0] + X[:, 3] + rng.normal(scale=0.5, size=400) > 0).astype(int)
+trainer = SophisticatedMSMEPredictor(models_dir=model_dir)
+trainer.feature_names = ['dti', 'fico_range_low', 'loan_amnt', 'addr_state', 'emp_length', 'emp_title']
+# emp_title has too many categories for label or frequency encoding, so it is hashed
+trainer.column_statistics = ColumnStatistics().fit(pd.DataFrame(
+    {'dti': X[:, 0], 'addr_state': rng.choice(['CA', 'NY', 'TX'], 400),
+     'emp_length': rng.choice(['1 year', '5 years', '10+ years'], 400),
+     'emp_title': [f'title {i % 150}' for i in range(400)]}))
+# As after an incremental run, which appended a category
+encoder = AppendOnlyLabelEncoder.from_label_encoder(LabelEncoder().fit(['1 year', '5 years', '10+ years']))
+trainer.label_encoders = {'emp_length': encoder.partial_fit(['< 1 year'])}
+trainer.frequency_maps = {'addr_state': {'CA': 120.0, 'NY': 80.0, 'TX': 60.0}}
+trainer.scaler.fit(X)
+members = [('xgb', xgb.XGBClassifier(n_estimators=10, max_depth=3).fit(X, y)),
+           ('lgb', lgb.LGBMClassifier(n_estimators=10, verbose=-1).fit(X, y)),
+           ('rf', RandomForestClassifier(n_estimators=10, random_state=42).fit(X, y))]
+ensemble = PrefitVotingEnsemble(members).fit(X[:200], y[:200], method='stacking')
+trainer.models = {'XGBoost': members[0][1], 'LightGBM': members[1][1], 'RandomForest': members[2][1],
+                  'VotingEnsemble': ensemble}
+trainer.X_test_scaled, trainer.y_test = X[200:], y[200:]
+trainer.comprehensive_evaluation()
+trainer.ensemble_model = ensemble
+trainer.save_sophisticated_model(len(X))
+for saved, deployed in [('ensemble_model', 'ensemble_trained_model'), ('scaler', 'scaler'),
+                        ('label_encoders', 'label_encoders'), ('feature_names', 'feature_names'),
+                        ('frequency_maps', 'frequency_maps'), ('hashed_columns', 'hashed_columns')]:
+    shutil.copy(os.path.join(model_dir, f'sophisticated_{saved}.pkl'), os.path.join(model_dir, f'{deployed}.pkl'))
+"""
+    load_script = """
+import sys
+import numpy as np
+import pandas as pd
+from model_artifacts import ModelArtifacts
+
+artifacts = ModelArtifacts.load(sys.argv[1])
+frame = pd.DataFrame({'dti': [20.0] * 3, 'fico_range_low': [700.0] * 3, 'loan_amnt': [10000.0] * 3,
+                      'addr_state': ['CA', 'NY', 'NY'], 'emp_length': ['5 years'] * 3,
+                      'emp_title': ['title 1', 'title 1', 'title 2']})
+scores = artifacts.score(frame)
+assert artifacts.member_names == ['xgb', 'lgb', 'rf'], artifacts.member_names
+assert scores['model_score'].between(0, 1).all() and (scores['model_spread'] >= 0).all()
+assert 'ensembles' not in sys.modules
+# Different categories give different model inputs, encoded as in training
+artifacts.scaler = None
+X = artifacts.transform(frame)
+assert X[:, 3].tolist() == [120.0, 80.0, 80.0], X[:, 3]
+hashed = pd.util.hash_pandas_object(frame['emp_title'], index=False,
+                                   hash_key='0123456789123456').astype(np.uint32)
+assert X[:, 5].tolist() == hashed.tolist() and X[0, 5] != X[2, 5], X[:, 5]
+print(scores.round(4).to_dict('records'))
+"""
+    
+    try:
+        with tempfile.TemporaryDirectory() as model_dir:
+            trained = subprocess.run([sys.executable, '-c', train_script, model_dir], cwd=os.path.dirname(api_dir),
+                                     capture_output=True, text=True)
+            if trained.returncode != 0:
+                print(f"   ❌ Saving the model failed:\n{trained.stderr[-2000:]}")
+                return False
+            # Load from the API directory, where the trainer's modules are not importable
+            loaded = subprocess.run([sys.executable, '-c', load_script, model_dir], cwd=api_dir,
+                                    capture_output=True, text=True)
+            if loaded.returncode != 0:
+                print(f"   ❌ Loading the saved model failed:\n{loaded.stderr[-2000:]}")
+                return False
+        print(f"   📊 {loaded.stdout.strip()}")
+        print(f"   ✅ Saved model artifacts passed!")
+        return True
+        
+    except Exception as e:
+        print(f"   ❌ Saved model artifacts error: {str(e)}")
+        return False
+
 def run_comprehensive_test_suite():
     """Run all comprehensive business risk prediction tests"""
     print("🚀 MSME BUSINESS RISK PREDICTION API v2.0 - COMPREHENSIVE TEST SUITE")
@@ -386,6 +1016,22 @@ def run_comprehensive_test_suite():
     # Performance test
     test_results.append(("⚡ Performance", test_performance_benchmark()))
     
+    # Bulk scoring
+    test_results.append(("📦 Bulk Scoring Job", test_bulk_scoring_job()))
+    test_results.append(("🗂️  Prediction History", test_prediction_history()))
+    test_results.append(("🧮 Explained Prediction", test_explained_prediction()))
+    test_results.append(("🔬 Explained Cascade Prediction", test_explained_cascade_prediction()))
+    test_results.append(("🔀 What-If Analysis", test_whatif_analysis()))
+    test_results.append(("⌨️  Live Scoring", test_live_scoring()))
+    test_results.append(("🪜 Cascade Scoring", test_cascade_scoring()))
+    test_results.append(("🧩 Cascade Mixed Batch", test_cascade_mixed_batch()))
+    test_results.append(("🎓 Fast Model Tier", test_fast_model_tier()))
+    test_results.append(("🗺️  Batch Prediction", test_batch_prediction()))
+    test_results.append(("🧾 Batch Validation", test_batch_validation()))
+    test_results.append(("🎲 Ensemble Uncertainty", test_model_uncertainty()))
+    test_results.append(("📈 Drift Monitoring", test_drift_monitoring()))
+    test_results.append(("💾 Saved Model Artifacts", test_saved_model_artifacts()))
+    
     # Print summary
     print("\n" + "=" * 80)
     print("📊 TEST SUITE SUMMARY")
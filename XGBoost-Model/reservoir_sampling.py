@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Streaming Reservoir Sampling
+============================
+
+One chunked pass over a large CSV that keeps a uniform (or stratified)
+random sample of fixed size. Sampling is bottom-k: every row draws a random
+key and the ``size`` rows with the smallest keys are kept, which is a
+uniform sample without replacement regardless of file order.
+
+Rows live in preallocated per-column buffers (float64 for numbers, int32
+category codes for strings), so memory is bounded by the sample size, not
+by the file. Each chunk is filtered against the current key threshold
+before anything is encoded, so late chunks cost little more than parsing.
+
+With strata (e.g. application year) each stratum keeps its own bottom-k
+reservoir and the final sample takes each stratum's share in proportion to
+its row count in the whole file. Memory is then bounded by ``size`` rows
+per stratum.
+"""
+
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class _CategoryCodes:
+    """Stable string -> int32 code mapping shared by all chunks"""
+
+    def __init__(self):
+        self.index: Dict[Any, int] = {}
+
+    @property
+    def categories(self) -> List[Any]:
+        return list(self.index)
+
+    def encode(self, values: pd.Series) -> np.ndarray:
+        codes, uniques = pd.factorize(values)
+        if len(uniques) == 0:
+            return np.full(len(values), -1, dtype=np.int32)
+        mapping = np.array([self.index.setdefault(u, len(self.index)) for u in uniques], dtype=np.int32)
+        return np.where(codes >= 0, mapping[codes], -1).astype(np.int32)
+
+
+class _Reservoir:
+    """Bottom-k reservoir over preallocated column buffers"""
+
+    def __init__(self, capacity: int, dtypes: Dict[str, np.dtype]):
+        self.capacity = capacity
+        self.keys = np.full(capacity, np.inf)
+        self.buffers = {name: np.empty(capacity, dtype=dtype) for name, dtype in dtypes.items()}
+        self.filled = 0
+
+    @property
+    def threshold(self) -> float:
+        """Keys at or above this value can no longer enter the reservoir"""
+        return self.keys[:self.filled].max() if self.filled == self.capacity else np.inf
+
+    def offer(self, keys: np.ndarray, columns: Dict[str, np.ndarray]):
+        n = len(keys)
+        if self.filled + n <= self.capacity:
+            end = self.filled + n
+            self.keys[self.filled:end] = keys
+            for name, values in columns.items():
+                self.buffers[name][self.filled:end] = values
+            self.filled = end
+            return
+
+        all_keys = np.concatenate([self.keys[:self.filled], keys])
+        keep = np.argpartition(all_keys, self.capacity - 1)[:self.capacity]
+        self.keys[:] = all_keys[keep]
+        for name, values in columns.items():
+            self.buffers[name][:] = np.concatenate([self.buffers[name][:self.filled], values])[keep]
+        self.filled = self.capacity
+
+    def smallest(self, k: int) -> np.ndarray:
+        """Buffer positions of the ``k`` smallest keys"""
+        if k >= self.filled:
+            return np.arange(self.filled)
+        return np.argpartition(self.keys[:self.filled], k - 1)[:k]
+
+
+class ReservoirSampler:
+    """
+    Fixed-size uniform or stratified random sample over a stream of chunks.
+
+    Column kinds are fixed by the first chunk: numeric columns are buffered
+    as float64, everything else as category codes (returned as
+    ``pd.Categorical``).
+    """
+
+    def __init__(self, size: int, random_state: int = 42):
+        self.size = int(size)
+        self.rng = np.random.default_rng(random_state)
+        self.reservoirs: Dict[Hashable, _Reservoir] = {}
+        self.stratum_counts: Dict[Hashable, int] = {}
+        self.codes: Dict[str, _CategoryCodes] = {}
+        self.dtypes: Dict[str, np.dtype] = {}
+        self.rows_seen = 0
+
+    def _init_columns(self, chunk: pd.DataFrame):
+        for col in chunk.columns:
+            if pd.api.types.is_numeric_dtype(chunk[col]) and not pd.api.types.is_bool_dtype(chunk[col]):
+                self.dtypes[col] = np.dtype(np.float64)
+            else:
+                self.dtypes[col] = np.dtype(np.int32)
+                self.codes[col] = _CategoryCodes()
+
+    def _encode(self, rows: pd.DataFrame) -> Dict[str, np.ndarray]:
+        encoded = {}
+        for col in self.dtypes:
+            if col in self.codes:
+                encoded[col] = self.codes[col].encode(rows[col])
+            else:
+                encoded[col] = pd.to_numeric(rows[col], errors='coerce').to_numpy(dtype=np.float64)
+        return encoded
+
+    def update(self, chunk: pd.DataFrame, strata: Optional[pd.Series] = None) -> 'ReservoirSampler':
+        """Offer every row of ``chunk``; ``strata`` labels each row's stratum"""
+        if self.size <= 0 or chunk.empty:
+            return self
+        if not self.dtypes:
+            self._init_columns(chunk)
+        self.rows_seen += len(chunk)
+        keys = self.rng.random(len(chunk))
+
+        if strata is None:
+            groups = {None: np.arange(len(chunk))}
+        else:
+            labels = pd.Series(strata).fillna('unknown').to_numpy()
+            groups = pd.Series(np.arange(len(chunk))).groupby(labels, sort=False).indices
+
+        for stratum, positions in groups.items():
+            self.stratum_counts[stratum] = self.stratum_counts.get(stratum, 0) + len(positions)
+            reservoir = self.reservoirs.get(stratum)
+            if reservoir is None:
+                reservoir = self.reservoirs[stratum] = _Reservoir(self.size, self.dtypes)
+            positions = positions[keys[positions] < reservoir.threshold]
+            if len(positions):
+                reservoir.offer(keys[positions], self._encode(chunk.iloc[positions]))
+        return self
+
+    def allocation(self) -> Dict[Hashable, int]:
+        """Rows taken from each stratum: proportional to its count, largest remainder"""
+        total = sum(self.stratum_counts.values())
+        target = min(self.size, total)
+        if total == 0:
+            return {}
+        strata = list(self.stratum_counts)
+        raw = np.array([self.stratum_counts[s] for s in strata]) * target / total
+        counts = np.floor(raw).astype(int)
+        for i in np.argsort(-(raw - counts))[:target - counts.sum()]:
+            counts[i] += 1
+        return dict(zip(strata, counts.tolist()))
+
+    def result(self) -> pd.DataFrame:
+        """The sample as a DataFrame (string columns as categoricals)"""
+        parts = {col: [] for col in self.dtypes}
+        for stratum, k in self.allocation().items():
+            reservoir = self.reservoirs[stratum]
+            positions = reservoir.smallest(k)
+            for col in self.dtypes:
+                parts[col].append(reservoir.buffers[col][positions])
+
+        data = {}
+        for col in self.dtypes:
+            values = np.concatenate(parts[col]) if parts[col] else np.empty(0, dtype=self.dtypes[col])
+            if col in self.codes:
+                data[col] = pd.Categorical.from_codes(values, categories=self.codes[col].categories)
+            else:
+                data[col] = values
+        return pd.DataFrame(data)
+
+    @property
+    def buffer_bytes(self) -> int:
+        """Memory held by the preallocated reservoirs"""
+        return sum(r.keys.nbytes + sum(b.nbytes for b in r.buffers.values())
+                   for r in self.reservoirs.values())
+
+
+def year_strata(column: str) -> Callable[[pd.DataFrame], pd.Series]:
+    """Stratum function labelling rows by the year of an ISO-formatted date column"""
+    def strata(chunk: pd.DataFrame) -> pd.Series:
+        # Slice each distinct date once (dates repeat heavily, especially as categories)
+        codes, uniques = pd.factorize(chunk[column])
+        years = pd.Series(np.asarray(uniques), dtype='string').str.slice(0, 4).to_numpy(dtype=object)
+        return pd.Series(np.where(codes >= 0, years[codes] if len(years) else None, None), index=chunk.index)
+    return strata
+
+
+def sample_csv(path: str, size: int, usecols: Optional[List[str]] = None,
+               dtype: Optional[Dict[str, Any]] = None, chunksize: int = 500_000,
+               strata: Optional[Callable[[pd.DataFrame], pd.Series]] = None,
+               transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+               random_state: int = 42) -> ReservoirSampler:
+    """Reservoir-sample ``size`` rows from a CSV in one chunked pass (``transform`` runs per chunk)"""
+    sampler = ReservoirSampler(size, random_state=random_state)
+    for chunk in pd.read_csv(path, usecols=usecols, dtype=dtype, chunksize=chunksize, low_memory=False):
+        if transform is not None:
+            chunk = transform(chunk)
+        sampler.update(chunk, strata(chunk) if strata is not None else None)
+    return sampler
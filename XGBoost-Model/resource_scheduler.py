@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Training Resource Scheduler
+===========================
+
+Splits one global CPU core budget across a training run so nested
+parallelism cannot oversubscribe the machine:
+- the independent members (XGBoost, LightGBM, Random Forest) train
+  concurrently, each with a proportional share of the cores
+- within a member, its share is divided between outer GridSearch
+  parallelism (threads) and the estimator's own threads
+- BLAS pools are capped while members train, and OMP/BLAS environment
+  limits are set for any child processes
+- per-stage CPU utilization (CPU seconds / wall seconds / cores) is recorded
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from joblib import parallel_config
+from sklearn.base import clone
+from sklearn.model_selection import GridSearchCV, ParameterGrid
+from threadpoolctl import threadpool_limits
+
+THREAD_ENV_VARS = ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                   'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS']
+
+# Default core shares, roughly each member's share of the total fitting work
+MEMBER_SHARES = {'XGBoost': 0.45, 'LightGBM': 0.1, 'RandomForest': 0.45}
+
+
+def available_cores() -> int:
+    """Cores this process may run on (respects CPU affinity / container pinning)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _cpu_seconds() -> float:
+    """CPU time of this process (all threads) plus reaped child processes"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class ResourceScheduler:
+    """Core budget for one training run"""
+
+    def __init__(self, total_cores: Optional[int] = None, shares: Optional[Dict[str, float]] = None):
+        self.total_cores = max(1, min(total_cores or available_cores(), available_cores()))
+        self.shares = dict(MEMBER_SHARES if shares is None else shares)
+        self.stages: List[Dict[str, Any]] = []
+        self.members: List[Dict[str, Any]] = []
+
+    def apply_env_limits(self):
+        """Cap OpenMP/BLAS pools of any child process at the budget (explicit settings win)"""
+        for var in THREAD_ENV_VARS:
+            os.environ.setdefault(var, str(self.total_cores))
+
+    def allocate(self, names: List[str]) -> Dict[str, int]:
+        """
+        Split the budget across concurrent tasks in proportion to their shares.
+
+        With fewer cores than tasks, the tasks run one at a time and each gets
+        the whole budget.
+        """
+        if self.total_cores < len(names):
+            return {name: self.total_cores for name in names}
+
+        weights = np.array([self.shares.get(name, 1.0) for name in names], dtype=float)
+        raw = weights / weights.sum() * self.total_cores
+        cores = np.maximum(1, np.floor(raw)).astype(int)
+        while cores.sum() > self.total_cores:
+            cores[np.argmax(cores)] -= 1
+        for i in np.argsort(-(raw - cores))[:self.total_cores - cores.sum()]:
+            cores[i] += 1
+        return dict(zip(names, cores.tolist()))
+
+    @staticmethod
+    def split(cores: int, n_tasks: int) -> Tuple[int, int]:
+        """(outer workers, threads per worker) for ``n_tasks`` independent fits on ``cores``"""
+        outer = max(1, min(cores, n_tasks))
+        return outer, max(1, cores // outer)
+
+    def tuned_fit(self, estimator: Any, param_grid: Dict[str, List[Any]], X: np.ndarray, y: np.ndarray,
+                  cores: int, cv: int = 3, scoring: str = 'roc_auc') -> Tuple[Any, GridSearchCV]:
+        """
+        GridSearch within ``cores``, then refit the best parameters on all of them.
+
+        The search runs ``outer`` fits at a time in threads (the tree libraries
+        release the GIL) with ``inner`` estimator threads each.
+        """
+        outer, inner = self.split(cores, len(ParameterGrid(param_grid)) * cv)
+        print(f"   ⚙️ {cores} cores: {outer} parallel fits x {inner} threads")
+        search = GridSearchCV(clone(estimator).set_params(n_jobs=inner), param_grid, cv=cv,
+                              scoring=scoring, n_jobs=outer, refit=False, verbose=1)
+        with parallel_config(backend='threading'):
+            search.fit(X, y)
+        best = clone(estimator).set_params(**search.best_params_, n_jobs=cores).fit(X, y)
+        return best, search
+
+    def run_members(self, tasks: Dict[str, Callable[[int], Any]]) -> Dict[str, Any]:
+        """Run ``task(cores)`` for every member concurrently on its core share"""
+        allocation = self.allocate(list(tasks))
+        workers = len(tasks) if self.total_cores >= len(tasks) else 1
+        print(f"   ⚙️ Core budget {self.total_cores}: "
+              + ", ".join(f"{name}={cores}" for name, cores in allocation.items())
+              + ("" if workers > 1 else " (sequential)"))
+
+        def run(name: str) -> Any:
+            start = time.perf_counter()
+            result = tasks[name](allocation[name])
+            self.members.append({'member': name, 'cores': allocation[name],
+                                 'seconds': round(time.perf_counter() - start, 3)})
+            return result
+
+        with threadpool_limits(limits=1, user_api='blas'):
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='member') as pool:
+                futures = {name: pool.submit(run, name) for name in tasks}
+                return {name: future.result() for name, future in futures.items()}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Record CPU utilization while the wrapped block runs"""
+        start_wall, start_cpu = time.perf_counter(), _cpu_seconds()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start_wall
+            cpu = _cpu_seconds() - start_cpu
+            record = {
+                'stage': name,
+                'seconds': round(wall, 3),
+                'cpu_seconds': round(cpu, 3),
+                'cores': self.total_cores,
+                'cpu_utilization_pct': round(100 * cpu / max(wall * self.total_cores, 1e-9), 1),
+            }
+            self.stages.append(record)
+            print(f"   ⚙️ {name}: {record['cpu_utilization_pct']:.0f}% of {self.total_cores} cores "
+                  f"({cpu:,.1f} CPU-s in {wall:,.1f}s)")
+
+    def report(self) -> Dict[str, Any]:
+        return {'total_cores': self.total_cores, 'stages': self.stages, 'members': self.members}
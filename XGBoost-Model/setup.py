@@ -17,6 +17,7 @@ setup(
         "lightgbm>=4.0.0",
         "imbalanced-learn>=0.13.0",
         "feature-engine>=1.8.0",
+        "pyarrow>=14.0.0",
         "fastapi>=0.104.0",
         "uvicorn[standard]>=0.24.0",
         "pydantic>=2.0.0",
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Synthetic Lending Club Data
+===========================
+
+Seeded generator of CSVs shaped like ``data/accepted_2007_to_2018Q4.csv``
+and ``data/rejected_2007_to_2018Q4.csv``, for benchmarking the training
+pipeline (``benchmark_pipeline.py``) where the real multi-GB files are not
+available, e.g. in CI.
+
+- accepted file: the ``ACCEPTED_FEATURES`` columns plus ``id`` and
+  ``issue_d`` (so ``usecols`` has something to skip), with the real file's
+  text formats (``term`` " 36 months", ``int_rate``/``revol_util``
+  "13.56%", ``emp_length`` "10+ years"), its null rates (e.g.
+  ``mths_since_last_delinq`` ~51%, the ``tot_*`` balances missing together
+  on ~3% of rows), category cardinalities (35 sub-grades, 51 states,
+  hundreds of thousands of ``emp_title`` values at 10M rows) and status
+  mix. ``loan_status`` is drawn from a grade/DTI/term/FICO risk model, so
+  about 13% of the accepted rows map to failure and the features carry
+  signal; payment columns follow the status.
+- rejected file: the raw header ("Amount Requested", "Application Date",
+  ..., "Policy Code") with "-1%"-style DTI strings, a mostly-null
+  ``Risk_Score``, "< 1 year"-dominated employment lengths and application
+  dates weighted towards later years.
+
+Files are written in ``CHUNK_ROWS`` chunks, each from its own generator
+seeded with ``(seed, file, chunk)``, so memory stays bounded at 10M rows
+and the same seed always gives the same bytes. ``generate_dataset`` keeps
+a manifest next to the files and reuses them when it matches.
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Callable, Dict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+from xgboost_train import ACCEPTED_FEATURES
+
+# Benchmark sizes (accepted rows)
+SIZES = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+CHUNK_ROWS = 250_000
+
+# Bumped whenever the generated data changes, so stale files are regenerated
+GENERATOR_VERSION = 1
+
+ACCEPTED_COLUMNS = ['id', 'issue_d'] + ACCEPTED_FEATURES
+REJECTED_HEADER = ['Amount Requested', 'Application Date', 'Loan Title', 'Risk_Score',
+                   'Debt-To-Income Ratio', 'Zip Code', 'State', 'Employment Length', 'Policy Code']
+
+GRADES = np.array(list('ABCDEFG'))
+GRADE_SHARES = [0.19, 0.29, 0.29, 0.14, 0.06, 0.024, 0.006]
+GRADE_RATES = np.array([7.1, 10.6, 14.1, 18.6, 22.3, 25.9, 28.5])
+GRADE_FICO = np.array([742, 705, 692, 686, 684, 682, 680])
+# Share of each grade's loans that end up in a failure status
+GRADE_FAILURE = np.array([0.05, 0.09, 0.15, 0.20, 0.26, 0.31, 0.34])
+
+SURVIVED_STATUSES = (['Fully Paid', 'Current', 'In Grace Period',
+                      'Does not meet the credit policy. Status:Fully Paid'],
+                     [0.5470, 0.4477, 0.0043, 0.0010])
+FAILED_STATUSES = (['Charged Off', 'Late (31-120 days)', 'Late (16-30 days)', 'Default',
+                    'Does not meet the credit policy. Status:Charged Off'],
+                   [0.9060, 0.0725, 0.0145, 0.0045, 0.0025])
+
+EMP_LENGTHS = (['< 1 year', '1 year', '2 years', '3 years', '4 years', '5 years', '6 years', '7 years',
+                '8 years', '9 years', '10+ years'],
+               [0.09, 0.07, 0.10, 0.09, 0.06, 0.07, 0.05, 0.04, 0.05, 0.04, 0.34])
+REJECTED_EMP_LENGTHS = (EMP_LENGTHS[0], [0.83, 0.03, 0.02, 0.02, 0.01, 0.02, 0.01, 0.01, 0.01, 0.01, 0.03])
+HOME_OWNERSHIP = (['MORTGAGE', 'RENT', 'OWN', 'ANY', 'OTHER', 'NONE'],
+                  [0.4925, 0.3965, 0.1100, 0.0004, 0.0004, 0.0002])
+VERIFICATION = (['Source Verified', 'Not Verified', 'Verified'], [0.39, 0.33, 0.28])
+PURPOSES = (['debt_consolidation', 'credit_card', 'home_improvement', 'other', 'major_purchase',
+             'medical', 'small_business', 'car', 'vacation', 'moving', 'house', 'wedding',
+             'renewable_energy', 'educational'],
+            [0.5650, 0.2290, 0.0660, 0.0615, 0.0220, 0.0120, 0.0110, 0.0110, 0.0070, 0.0070,
+             0.0060, 0.0010, 0.0007, 0.0008])
+STATES = ['CA', 'TX', 'NY', 'FL', 'IL', 'NJ', 'PA', 'OH', 'GA', 'VA', 'NC', 'MI', 'AZ', 'MD', 'MA',
+          'CO', 'WA', 'MN', 'IN', 'MO', 'TN', 'NV', 'CT', 'WI', 'AL', 'OR', 'SC', 'LA', 'KY', 'OK',
+          'KS', 'AR', 'UT', 'NM', 'MS', 'HI', 'NH', 'RI', 'WV', 'NE', 'MT', 'DE', 'DC', 'AK', 'WY',
+          'SD', 'VT', 'ME', 'ID', 'ND', 'IA']
+STATE_WEIGHTS = np.array([14, 8.2, 8.2, 7.1, 4.0, 3.6, 3.4, 3.3, 3.3, 2.8, 2.8, 2.6, 2.4, 2.4, 2.3,
+                          2.1, 2.1, 1.8, 1.6, 1.6, 1.5, 1.5, 1.5, 1.3, 1.2, 1.2, 1.2, 1.1, 1.0, 0.9,
+                          0.8, 0.7, 0.7, 0.5, 0.5, 0.5, 0.5, 0.4, 0.4, 0.3, 0.3, 0.3, 0.2, 0.2, 0.2,
+                          0.2, 0.2, 0.2, 0.2, 0.1, 0.01])
+COMMON_TITLES = ['Teacher', 'Manager', 'Owner', 'Registered Nurse', 'Driver', 'RN', 'Supervisor',
+                 'Sales', 'Project Manager', 'Office Manager', 'General Manager', 'Director',
+                 'owner', 'President', 'Engineer', 'manager', 'teacher', 'Operations Manager',
+                 'Vice President', 'Truck Driver', 'Accountant', 'Police Officer', 'Analyst',
+                 'Administrative Assistant', 'Account Manager', 'Sales Manager', 'Nurse', 'Mechanic']
+TITLE_WORDS = np.array(['Senior', 'Lead', 'Assistant', 'Specialist', 'Technician', 'Coordinator',
+                        'Associate', 'Consultant', 'Operator', 'Clerk', 'Officer', 'Agent'], dtype=object)
+LOAN_TITLES = ['Debt consolidation', 'debt_consolidation', 'Credit card refinancing', 'credit_card',
+               'Other', 'other', 'Home improvement', 'Business', 'small_business', 'Car financing',
+               'Medical expenses', 'Moving and relocation', 'Major purchase', 'Vacation']
+APPLICATION_YEARS = (np.arange(2007, 2019),
+                     [0.006, 0.023, 0.053, 0.112, 0.218, 0.336, 0.761, 1.93, 2.86, 4.77, 5.92, 8.56])
+# Date labels are formatted once and indexed per row
+ISSUE_MONTHS = pd.date_range('2007-06-01', '2018-12-01', freq='MS').strftime('%b-%Y').to_numpy(dtype=object)
+APPLICATION_DAYS = {year: pd.date_range(f'{year}-01-01', f'{year}-12-31').strftime('%Y-%m-%d').to_numpy(dtype=object)
+                    for year in APPLICATION_YEARS[0]}
+
+# Fraction of missing values per accepted column (the tot_* balances are missing on the same rows)
+NULL_RATES = {
+    'emp_title': 0.074, 'emp_length': 0.065, 'annual_inc': 0.00002, 'dti': 0.0008,
+    'inq_last_6mths': 0.00002, 'mths_since_last_delinq': 0.51, 'mths_since_last_record': 0.84,
+    'revol_util': 0.0008, 'collections_12_mths_ex_med': 0.00006, 'pub_rec_bankruptcies': 0.0006,
+    'tax_liens': 0.00005,
+}
+BALANCE_NULL_RATE = 0.031
+BALANCE_COLUMNS = ['tot_coll_amt', 'tot_cur_bal', 'total_rev_hi_lim', 'avg_cur_bal']
+
+
+def parse_rows(text: str) -> int:
+    """Row count from a size name ("10k", "1m", "10m") or an integer"""
+    return SIZES.get(text.lower()) or int(text)
+
+
+def _choice(rng: np.random.Generator, options: tuple, n: int) -> np.ndarray:
+    values, weights = options
+    weights = np.asarray(weights, dtype=float)
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=n, p=weights / weights.sum())]
+
+
+def _with_nulls(rng: np.random.Generator, values: np.ndarray, rate: float) -> np.ndarray:
+    values = values.astype(object if values.dtype == object else float)
+    values[rng.random(len(values)) < rate] = np.nan
+    return values
+
+
+def _emp_titles(rng: np.random.Generator, n: int) -> np.ndarray:
+    """Zipf-distributed job titles: a few very common ones and a long tail of rare ones"""
+    rank = rng.zipf(1.3, size=n)
+    titles = np.empty(n, dtype=object)
+    common = rank <= len(COMMON_TITLES)
+    titles[common] = np.asarray(COMMON_TITLES, dtype=object)[rank[common] - 1]
+    tail = rank[~common] % 5_000_000
+    titles[~common] = TITLE_WORDS[tail % len(TITLE_WORDS)] + ' ' + tail.astype(str).astype(object)
+    return titles
+
+
+def _percent(values: np.ndarray) -> np.ndarray:
+    text = np.char.add(np.char.mod('%.2f', np.round(values, 2)), '%').astype(object)
+    text[np.isnan(values)] = np.nan
+    return text
+
+
+def accepted_chunk(rng: np.random.Generator, n: int, first_id: int) -> pd.DataFrame:
+    """``n`` accepted loans with consecutive ids from ``first_id``"""
+    grade_index = rng.choice(len(GRADES), size=n, p=GRADE_SHARES)
+    sub_grade = rng.integers(1, 6, size=n)
+    term = np.where(rng.random(n) < 0.29 + 0.05 * grade_index, 60, 36)
+    int_rate = np.clip(GRADE_RATES[grade_index] + 0.6 * (sub_grade - 3) + rng.normal(0, 0.5, n), 5.31, 30.99)
+    loan_amnt = np.clip(np.round(rng.lognormal(9.4, 0.6, n) / 25) * 25, 1000, 40000)
+    funded_amnt = np.where(rng.random(n) < 0.002, np.round(loan_amnt * 0.8 / 25) * 25, loan_amnt)
+    funded_amnt_inv = np.round(funded_amnt - np.where(rng.random(n) < 0.05, rng.uniform(0, 500, n), 0), 2)
+    rate = int_rate / 1200
+    installment = np.round(funded_amnt * rate / (1 - (1 + rate) ** -term), 2)
+    annual_inc = np.round(np.clip(rng.lognormal(11.1, 0.55, n), 4000, 9_000_000), 0)
+    dti = np.round(np.clip(rng.gamma(4.5, 4.2, n), 0, 999), 2)
+    fico_low = np.clip(np.round((GRADE_FICO[grade_index] + rng.gamma(2, 15, n) - 25) / 5) * 5, 660, 845)
+
+    # Failure probability from the grade, moved by DTI, term and FICO
+    base = GRADE_FAILURE[grade_index]
+    logit = (np.log(base / (1 - base)) + 0.03 * (dti - 18) + 0.35 * (term == 60)
+             - 0.01 * (fico_low - GRADE_FICO[grade_index]) - 0.1)
+    failed = rng.random(n) < 1 / (1 + np.exp(-logit))
+    loan_status = np.where(failed, _choice(rng, FAILED_STATUSES, n), _choice(rng, SURVIVED_STATUSES, n))
+    paid_off = loan_status == 'Fully Paid'
+
+    # Payments follow the status: paid-off loans repay in full, failed ones stop early
+    progress = np.where(paid_off | (loan_status == SURVIVED_STATUSES[0][3]), 1.0,
+                        np.where(failed, rng.uniform(0, 0.6, n), rng.uniform(0.02, 0.95, n)))
+    total_rec_prncp = np.round(funded_amnt * progress * np.where(paid_off, 1, rng.uniform(0.85, 1, n)), 2)
+    total_rec_int = np.round(np.clip(installment * term * progress - total_rec_prncp, 0, None)
+                             * np.where(paid_off, rng.uniform(0.4, 1, n), 1), 2)
+    late = rng.random(n) < np.where(failed, 0.3, 0.02)
+    total_rec_late_fee = np.round(np.where(late, rng.gamma(1.5, 15, n), 0.0), 2)
+    charged_off = np.isin(loan_status, ['Charged Off', FAILED_STATUSES[0][4]])
+    recoveries = np.round(np.where(charged_off & (rng.random(n) < 0.7),
+                                   (funded_amnt - total_rec_prncp) * rng.uniform(0, 0.15, n), 0.0), 2)
+    total_pymnt = np.round(total_rec_prncp + total_rec_int + total_rec_late_fee + recoveries, 2)
+    last_pymnt_amnt = np.round(np.where(paid_off & (rng.random(n) < 0.4),
+                                        funded_amnt - total_rec_prncp + installment * rng.uniform(1, 8, n),
+                                        installment * np.where(failed, rng.uniform(0, 1, n), 1)), 2)
+    last_fico_high = np.clip(np.round((fico_low + 4 + rng.normal(0, 30, n) - 110 * failed) / 5) * 5 - 1,
+                             499, 850)
+    last_fico_low = np.where(last_fico_high <= 499, 0, last_fico_high - 4)
+
+    open_acc = rng.poisson(11, n) + 1
+    total_rev_hi_lim = np.round(rng.lognormal(10.1, 0.8, n), 0)
+    revol_bal = np.round(total_rev_hi_lim * rng.beta(2.2, 2.5, n), 0)
+    tot_cur_bal = np.round(rng.lognormal(11.0, 1.3, n), 0)
+    balances_missing = rng.random(n) < BALANCE_NULL_RATE
+
+    df = pd.DataFrame({
+        'id': np.arange(first_id, first_id + n),
+        'issue_d': ISSUE_MONTHS[rng.integers(0, len(ISSUE_MONTHS), n)],
+        'loan_amnt': loan_amnt,
+        'funded_amnt': funded_amnt,
+        'funded_amnt_inv': funded_amnt_inv,
+        'term': np.where(term == 60, ' 60 months', ' 36 months'),
+        'int_rate': _percent(int_rate),
+        'installment': installment,
+        'grade': GRADES[grade_index],
+        'sub_grade': np.char.add(GRADES[grade_index], sub_grade.astype(str)),
+        'emp_title': _emp_titles(rng, n),
+        'emp_length': _choice(rng, EMP_LENGTHS, n),
+        'home_ownership': _choice(rng, HOME_OWNERSHIP, n),
+        'annual_inc': annual_inc,
+        'verification_status': _choice(rng, VERIFICATION, n),
+        'loan_status': loan_status,
+        'purpose': _choice(rng, PURPOSES, n),
+        'addr_state': _choice(rng, (STATES, STATE_WEIGHTS), n),
+        'dti': dti,
+        'delinq_2yrs': rng.poisson(0.3, n).astype(float),
+        'fico_range_low': fico_low,
+        'fico_range_high': fico_low + 4,
+        'inq_last_6mths': rng.poisson(0.6, n).astype(float),
+        'mths_since_last_delinq': rng.integers(0, 150, n).astype(float),
+        'mths_since_last_record': rng.integers(0, 130, n).astype(float),
+        'open_acc': open_acc.astype(float),
+        'pub_rec': rng.poisson(0.2, n).astype(float),
+        'revol_bal': revol_bal,
+        'revol_util': _percent(np.round(np.clip(100 * revol_bal / np.maximum(total_rev_hi_lim, 1), 0, 150), 1)),
+        'total_acc': (open_acc + rng.poisson(13, n)).astype(float),
+        'collections_12_mths_ex_med': (rng.random(n) < 0.018).astype(float),
+        'acc_now_delinq': (rng.random(n) < 0.004).astype(float),
+        'tot_coll_amt': np.round(np.where(rng.random(n) < 0.15, rng.lognormal(6.5, 1.2, n), 0.0), 0),
+        'tot_cur_bal': tot_cur_bal,
+        'total_rev_hi_lim': total_rev_hi_lim,
+        'avg_cur_bal': np.round(tot_cur_bal / open_acc, 0),
+        'total_pymnt': total_pymnt,
+        'total_pymnt_inv': np.round(total_pymnt * funded_amnt_inv / funded_amnt, 2),
+        'total_rec_prncp': total_rec_prncp,
+        'total_rec_int': total_rec_int,
+        'total_rec_late_fee': total_rec_late_fee,
+        'recoveries': recoveries,
+        'collection_recovery_fee': np.round(recoveries * 0.18, 2),
+        'last_pymnt_amnt': last_pymnt_amnt,
+        'last_fico_range_high': last_fico_high,
+        'last_fico_range_low': last_fico_low,
+        'pub_rec_bankruptcies': rng.poisson(0.13, n).astype(float),
+        'tax_liens': (rng.random(n) < 0.03).astype(float),
+        'hardship_flag': np.where(rng.random(n) < 0.0005, 'Y', 'N'),
+        'debt_settlement_flag': np.where(charged_off & (rng.random(n) < 0.12), 'Y', 'N'),
+    })
+    for column, null_rate in NULL_RATES.items():
+        df[column] = _with_nulls(rng, df[column].to_numpy(), null_rate)
+    df.loc[balances_missing, BALANCE_COLUMNS] = np.nan
+    return df[ACCEPTED_COLUMNS]
+
+
+def rejected_chunk(rng: np.random.Generator, n: int, first_id: int = 0) -> pd.DataFrame:
+    """``n`` rejected applications, with the raw file's column names and text formats"""
+    years = _choice(rng, APPLICATION_YEARS, n).astype(int)
+    dates = np.empty(n, dtype=object)
+    for year, days in APPLICATION_DAYS.items():
+        in_year = years == year
+        dates[in_year] = days[rng.integers(0, len(days), in_year.sum())]
+    dti = np.round(rng.lognormal(3.0, 0.9, n), 2)
+    dti[rng.random(n) < 0.02] = -1
+    risk_score = np.round(np.clip(rng.normal(640, 80, n), 300, 990), 0)
+    df = pd.DataFrame({
+        'Amount Requested': np.round(np.clip(rng.lognormal(9.2, 0.9, n), 500, 300_000), 0),
+        'Application Date': dates,
+        'Loan Title': _with_nulls(rng, _choice(rng, (LOAN_TITLES, np.ones(len(LOAN_TITLES))), n), 0.0005),
+        'Risk_Score': _with_nulls(rng, risk_score, 0.67),
+        'Debt-To-Income Ratio': np.char.add(np.char.mod('%g', dti), '%'),
+        'Zip Code': np.char.add(np.char.zfill(rng.integers(10, 1000, n).astype(str), 3), 'xx'),
+        'State': _choice(rng, (STATES, STATE_WEIGHTS), n),
+        'Employment Length': _with_nulls(rng, _choice(rng, REJECTED_EMP_LENGTHS, n), 0.034),
+        'Policy Code': np.where(rng.random(n) < 0.00003, 2, 0),
+    })
+    return df[REJECTED_HEADER]
+
+
+def _arrow_table(chunk: pd.DataFrame) -> pa.Table:
+    """
+    Integer columns stay numeric, everything else is written as text (even
+    if a chunk has only nulls). Floats keep their ".0", as in the Lending
+    Club export, so readers infer float64 for whole-dollar columns too.
+    """
+    columns = {}
+    for col in chunk.columns:
+        values = chunk[col]
+        if pd.api.types.is_integer_dtype(values):
+            columns[col] = pa.array(values.to_numpy())
+        elif pd.api.types.is_float_dtype(values):
+            text = pc.cast(pa.array(values.to_numpy(), from_pandas=True), pa.string())
+            columns[col] = pc.if_else(pc.match_substring(text, '.'), text,
+                                      pc.binary_join_element_wise(text, '.0', ''))
+        else:
+            columns[col] = pa.array(values.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+    return pa.table(columns)
+
+
+def write_csv(path: str, rows: int, make_chunk: Callable[[np.random.Generator, int, int], pd.DataFrame],
+              seed: int, file_key: int, chunk_rows: int = CHUNK_ROWS) -> int:
+    """
+    Write ``rows`` generated rows to ``path`` chunk by chunk; returns the
+    file size. Strings are quoted and nulls left empty, as in the Lending
+    Club export.
+    """
+    tmp_path = f"{path}.tmp"
+    writer = None
+    try:
+        for chunk_index, start in enumerate(range(0, rows, chunk_rows)):
+            rng = np.random.default_rng([seed, file_key, chunk_index])
+            chunk = make_chunk(rng, min(chunk_rows, rows - start), start + 1)
+            table = _arrow_table(chunk)
+            if writer is None:
+                writer = pa_csv.CSVWriter(tmp_path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def generate_dataset(output_dir: str, rows: int, seed: int = 42, rejected_ratio: float = 1.0,
+                     chunk_rows: int = CHUNK_ROWS, force: bool = False) -> Dict[str, Any]:
+    """
+    Accepted and rejected CSVs in ``output_dir`` (``rows`` accepted rows,
+    ``rejected_ratio`` times as many rejected ones). Returns the manifest
+    with the file paths; existing files are reused when their manifest
+    matches.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, 'synthetic_manifest.json')
+    config = {'version': GENERATOR_VERSION, 'rows': rows, 'seed': seed,
+              'rejected_rows': int(rows * rejected_ratio), 'chunk_rows': chunk_rows}
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if ({key: manifest.get(key) for key in config} == config
+                and all(os.path.exists(manifest[key]) for key in ('accepted_path', 'rejected_path'))):
+            print(f"   ♻️ Reusing synthetic data in {output_dir} ({rows:,} accepted rows)")
+            return manifest
+
+    print(f"   🧪 Generating {rows:,} accepted and {config['rejected_rows']:,} rejected rows "
+          f"in {output_dir} (seed {seed})...")
+    start = time.time()
+    accepted_path = os.path.join(output_dir, 'accepted_synthetic.csv')
+    rejected_path = os.path.join(output_dir, 'rejected_synthetic.csv')
+    manifest = {
+        **config,
+        'accepted_path': accepted_path,
+        'rejected_path': rejected_path,
+        'accepted_bytes': write_csv(accepted_path, rows, accepted_chunk, seed, 0, chunk_rows),
+        'rejected_bytes': write_csv(rejected_path, config['rejected_rows'], rejected_chunk, seed, 1, chunk_rows),
+    }
+    manifest['generation_seconds'] = round(time.time() - start, 1)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"   ✅ {manifest['accepted_bytes'] / 1e6:,.1f} MB accepted, "
+          f"{manifest['rejected_bytes'] / 1e6:,.1f} MB rejected ({manifest['generation_seconds']}s)")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic Lending-Club-shaped accepted and rejected CSVs")
+    parser.add_argument('--rows', type=parse_rows, default=SIZES['10k'],
+                        help=f"accepted rows: {', '.join(SIZES)} or an integer")
+    parser.add_argument('--output-dir', default='benchmark_data', help="directory for the CSVs and manifest")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--rejected-ratio', type=float, default=1.0,
+                        help="rejected rows per accepted row (the real files have about 12)")
+    parser.add_argument('--force', action='store_true', help="regenerate even if matching files exist")
+    args = parser.parse_args()
+    generate_dataset(args.output_dir, args.rows, seed=args.seed, rejected_ratio=args.rejected_ratio,
+                     force=args.force)
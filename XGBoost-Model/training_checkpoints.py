@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Checkpointed Training Stages
+============================
+
+Content-hashed, resumable stage execution for ``run_sophisticated_training``.
+
+Each stage is keyed on:
+- its name and configuration (e.g. input file fingerprints)
+- the source code of the functions that implement it
+- the keys of the stages it depends on
+
+so a change anywhere upstream invalidates everything downstream. Outputs are
+written per item: DataFrames as Parquet, numeric arrays as NumPy ``.npy`` and
+everything else as pickle. Checkpoint directories are written to a temporary
+location and renamed into place, so a crash never leaves a half-written stage.
+
+Layout::
+
+    <checkpoint_dir>/<stage>/<key>/manifest.json
+    <checkpoint_dir>/<stage>/<key>/<item>.parquet|.npy|.pkl
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+import time
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def file_fingerprint(path: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Cheap content fingerprint for large input files (path, size, mtime)"""
+    if path is None:
+        return None
+    if not os.path.exists(path):
+        return {'path': os.path.abspath(path), 'missing': True}
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def code_fingerprint(functions: Iterable[Callable]) -> str:
+    """Hash of the source code implementing a stage (functions, classes or whole modules)"""
+    digest = hashlib.sha256()
+    for func in functions:
+        try:
+            digest.update(inspect.getsource(func).encode())
+        except (OSError, TypeError):
+            digest.update(getattr(func, '__qualname__', repr(func)).encode())
+    return digest.hexdigest()
+
+
+class StageCheckpointer:
+    """Stores and loads stage outputs under content-hashed keys"""
+
+    def __init__(self, checkpoint_dir: str):
+        self.checkpoint_dir = checkpoint_dir
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    @staticmethod
+    def stage_key(stage: str, config: Dict[str, Any], code_hash: str,
+                  upstream_keys: List[str]) -> str:
+        payload = json.dumps({'stage': stage, 'config': config, 'code': code_hash,
+                              'upstream': upstream_keys}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, stage: str, key: str) -> str:
+        return os.path.join(self.checkpoint_dir, stage, key)
+
+    def exists(self, stage: str, key: str) -> bool:
+        return os.path.exists(os.path.join(self._path(stage, key), 'manifest.json'))
+
+    def save(self, stage: str, key: str, outputs: Dict[str, Any]):
+        final_path = self._path(stage, key)
+        tmp_path = f"{final_path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        manifest = {'stage': stage, 'key': key, 'created': time.time(), 'items': {}}
+        for name, value in outputs.items():
+            if isinstance(value, pd.DataFrame):
+                filename = f'{name}.parquet'
+                value.to_parquet(os.path.join(tmp_path, filename))
+            elif isinstance(value, np.ndarray) and value.dtype != object:
+                filename = f'{name}.npy'
+                np.save(os.path.join(tmp_path, filename), value, allow_pickle=False)
+            else:
+                filename = f'{name}.pkl'
+                with open(os.path.join(tmp_path, filename), 'wb') as f:
+                    pickle.dump(value, f)
+            manifest['items'][name] = filename
+
+        with open(os.path.join(tmp_path, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        shutil.rmtree(final_path, ignore_errors=True)
+        os.replace(tmp_path, final_path)
+
+    def load_item(self, stage: str, key: str, item: str) -> Any:
+        path = self._path(stage, key)
+        with open(os.path.join(path, 'manifest.json')) as f:
+            filename = json.load(f)['items'][item]
+        filepath = os.path.join(path, filename)
+        if filename.endswith('.parquet'):
+            return pd.read_parquet(filepath)
+        if filename.endswith('.npy'):
+            return np.load(filepath, allow_pickle=False)
+        with open(filepath, 'rb') as f:
+            return pickle.load(f)
+
+
+class StagePipeline:
+    """
+    Runs stages in order, skipping those with a valid checkpoint.
+
+    With ``resume_from`` set, every stage before it must come from a
+    checkpoint and that stage plus everything after it is recomputed.
+    Outputs of skipped stages are only read from disk when a later stage
+    asks for them via ``get``. ``monitors`` are objects with a ``stage(name)``
+    context manager (memory profiler, CPU scheduler) wrapped around every
+    executed stage.
+    """
+
+    def __init__(self, stages: List[str], dependencies: Dict[str, List[str]],
+                 checkpointer: Optional[StageCheckpointer] = None,
+                 resume_from: Optional[str] = None, profiler: Optional[Any] = None,
+                 monitors: Iterable[Any] = ()):
+        if resume_from is not None:
+            if resume_from not in stages:
+                raise ValueError(f"Unknown stage '{resume_from}'. Choose from: {', '.join(stages)}")
+            if checkpointer is None:
+                raise ValueError("resume_from requires a checkpoint directory")
+        self.stages = stages
+        self.dependencies = dependencies
+        self.checkpointer = checkpointer
+        self.resume_from = resume_from
+        self.monitors = [m for m in [profiler, *monitors] if m is not None]
+        self.keys: Dict[str, str] = {}
+        self.outputs: Dict[str, Dict[str, Any]] = {}
+        self.timings: Dict[str, float] = {}
+
+    def _must_recompute(self, stage: str) -> bool:
+        if self.resume_from is None:
+            return False
+        return self.stages.index(stage) >= self.stages.index(self.resume_from)
+
+    def run(self, stage: str, func: Callable[[], Dict[str, Any]],
+            config: Optional[Dict[str, Any]] = None, code: Iterable[Callable] = (),
+            cache: bool = True) -> Dict[str, Any]:
+        upstream = [self.keys[dep] for dep in self.dependencies.get(stage, [])]
+        key = StageCheckpointer.stage_key(stage, config or {}, code_fingerprint([func, *code]), upstream)
+        self.keys[stage] = key
+
+        use_cache = cache and self.checkpointer is not None
+        if use_cache and not self._must_recompute(stage):
+            if self.checkpointer.exists(stage, key):
+                print(f"\n⏭️ Stage '{stage}': unchanged, using checkpoint {key[:12]}")
+                self.timings[stage] = 0.0
+                return self.outputs.setdefault(stage, {})
+            if self.resume_from is not None:
+                raise RuntimeError(
+                    f"No checkpoint for stage '{stage}' ({key[:12]}); "
+                    f"cannot resume from '{self.resume_from}'"
+                )
+
+        start = time.time()
+        with ExitStack() as stack:
+            for monitor in self.monitors:
+                stack.enter_context(monitor.stage(stage))
+            outputs = func()
+        self.timings[stage] = time.time() - start
+        self.outputs[stage] = outputs
+        if use_cache:
+            self.checkpointer.save(stage, key, outputs)
+            print(f"   💾 Checkpointed stage '{stage}' ({key[:12]})")
+        return outputs
+
+    def get(self, stage: str, item: str) -> Any:
+        """Output of an earlier stage, read from its checkpoint if it was skipped"""
+        outputs = self.outputs.setdefault(stage, {})
+        if item not in outputs:
+            outputs[item] = self.checkpointer.load_item(stage, self.keys[stage], item)
+        return outputs[item]
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Training Memory Instrumentation and Budgeting
+=============================================
+
+- ``MemoryProfiler`` records, per pipeline stage, the peak resident set size
+  (sampled in a background thread), the Python/NumPy heap peak and the top
+  allocating source lines from ``tracemalloc``, and writes a JSON report
+  per run.
+- ``MemoryBudget`` turns a configured budget (e.g. 32 GB nodes) into a plan
+  for the pipeline: CSV chunk size, float32 downcasting and, as a last
+  resort, a cap on the number of training rows.
+
+psutil is used for RSS when installed; otherwise /proc (Linux) or
+``resource`` is used.
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:  # optional dependency
+    psutil = None
+
+GB = 1024 ** 3
+MB = 1024 ** 2
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # peak, Linux units
+
+
+class _RSSSampler(threading.Thread):
+    """Polls RSS until stopped and keeps the maximum seen"""
+
+    def __init__(self, interval: float):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def stop(self) -> int:
+        self._stop_event.set()
+        self.join()
+        self.peak = max(self.peak, current_rss())
+        return self.peak
+
+
+class MemoryProfiler:
+    """Per-stage peak RSS and tracemalloc top allocators for one training run"""
+
+    def __init__(self, trace_allocations: bool = True, top_n: int = 10,
+                 sample_interval: float = 0.05):
+        self.trace_allocations = trace_allocations
+        self.top_n = top_n
+        self.sample_interval = sample_interval
+        self.stages: List[Dict[str, Any]] = []
+        self.started = datetime.now().isoformat()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Measure memory while the wrapped block runs"""
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        snapshot_before = tracemalloc.take_snapshot() if self.trace_allocations else None
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+
+        rss_before = current_rss()
+        sampler = _RSSSampler(self.sample_interval)
+        sampler.start()
+        start = time.time()
+        try:
+            yield
+        finally:
+            peak_rss = sampler.stop()
+            record = {
+                'stage': name,
+                'seconds': round(time.time() - start, 3),
+                'rss_before_mb': round(rss_before / MB, 1),
+                'rss_after_mb': round(current_rss() / MB, 1),
+                'peak_rss_mb': round(peak_rss / MB, 1),
+            }
+            if self.trace_allocations:
+                _, traced_peak = tracemalloc.get_traced_memory()
+                record['traced_peak_mb'] = round(traced_peak / MB, 1)
+                diff = tracemalloc.take_snapshot().compare_to(snapshot_before, 'lineno')
+                record['top_allocators'] = [
+                    {'location': str(stat.traceback), 'size_diff_mb': round(stat.size_diff / MB, 2),
+                     'count_diff': stat.count_diff}
+                    for stat in diff[:self.top_n]
+                ]
+            self.stages.append(record)
+            print(f"   🧠 {name}: peak RSS {record['peak_rss_mb']:,.0f} MB "
+                  f"({record['seconds']:.1f}s)")
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'started': self.started,
+            'finished': datetime.now().isoformat(),
+            'peak_rss_mb': max((s['peak_rss_mb'] for s in self.stages), default=0.0),
+            'stages': self.stages,
+        }
+
+    def write_report(self, report_dir: str, extra: Optional[Dict[str, Any]] = None) -> str:
+        os.makedirs(report_dir, exist_ok=True)
+        path = os.path.join(report_dir, f"memory_report_{datetime.now():%Y%m%d_%H%M%S}.json")
+        with open(path, 'w') as f:
+            json.dump({**self.report(), **(extra or {})}, f, indent=2, default=str)
+        print(f"   📝 Memory report written to {path}")
+        return path
+
+
+def estimate_csv_rows(path: str, sample_lines: int = 2000) -> int:
+    """Estimate the number of data rows in a CSV from its size and the first lines"""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        sample = [line for _, line in zip(range(sample_lines), f)]
+    if not sample:
+        return 0
+    avg_line = sum(len(line) for line in sample) / len(sample)
+    return int((size - len(header)) / avg_line)
+
+
+class MemoryBudget:
+    """
+    Chooses chunk size, dtype width and training sample size for a memory budget.
+
+    ``copies`` approximates how many full-width copies of the feature matrix
+    are alive at the pipeline's peak (engineered frame, X, SMOTE output,
+    scaled train/test arrays).
+    """
+
+    def __init__(self, budget_gb: float = 32.0, headroom: float = 0.7, copies: float = 6.0,
+                 chunk_fraction: float = 0.05):
+        self.budget_bytes = int(budget_gb * GB)
+        self.headroom = headroom
+        self.copies = copies
+        self.chunk_fraction = chunk_fraction
+
+    def plan(self, n_rows: int, n_columns: int) -> Dict[str, Any]:
+        usable = self.budget_bytes * self.headroom
+        bytes_float64 = n_rows * n_columns * 8 * self.copies
+        bytes_float32 = bytes_float64 / 2
+
+        downcast = bytes_float64 > usable
+        max_rows = None
+        if bytes_float32 > usable:
+            max_rows = int(usable / (n_columns * 4 * self.copies))
+
+        # Raw CSV rows carry strings; budget ~4x the numeric width per row while parsing
+        chunk_size = int(self.budget_bytes * self.chunk_fraction / max(n_columns * 8 * 4, 1))
+        chunk_size = max(10_000, min(chunk_size, 2_000_000))
+
+        return {
+            'budget_gb': round(self.budget_bytes / GB, 2),
+            'estimated_rows': n_rows,
+            'estimated_peak_gb': round((bytes_float32 if downcast else bytes_float64) / GB, 2),
+            'chunk_size': chunk_size,
+            'downcast_float32': downcast,
+            'max_training_rows': max_rows,
+        }
+
+    def plan_for_csv(self, path: str, n_columns: int) -> Dict[str, Any]:
+        return self.plan(estimate_csv_rows(path), n_columns)
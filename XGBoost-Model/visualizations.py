@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Training Visualizations
+=======================
+
+Renders the analysis dashboard and feature-importance chart from cached
+test-set probabilities, so no model is scored again. matplotlib and seaborn
+are imported only when rendering, which keeps metrics-only runs free of
+them. Rendering can run in a background process while training finishes.
+"""
+
+import multiprocessing
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import (average_precision_score, confusion_matrix, precision_recall_curve,
+                             roc_auc_score, roc_curve)
+
+
+def render_training_plots(y_test: np.ndarray, y_pred_proba: np.ndarray,
+                          final_metrics: Dict[str, Dict[str, float]], feature_names: List[str],
+                          feature_importances: Optional[np.ndarray] = None,
+                          output_dir: str = '.', dpi: int = 300) -> List[str]:
+    """Render the dashboard (and feature importance chart) and return the written paths"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from sklearn.calibration import calibration_curve
+
+    plt.style.use('default')
+    sns.set_palette("Set2")
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+
+    y_test = np.asarray(y_test)
+    y_pred = (y_pred_proba > 0.5).astype(int)
+
+    # Create figure with subplots
+    plt.figure(figsize=(20, 15))
+
+    # 1. Confusion Matrix
+    plt.subplot(3, 3, 1)
+    cm = confusion_matrix(y_test, y_pred)
+    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
+               xticklabels=['Survived', 'Failed'],
+               yticklabels=['Survived', 'Failed'])
+    plt.title('Sophisticated Model - Confusion Matrix', fontsize=14)
+    plt.xlabel('Predicted')
+    plt.ylabel('Actual')
+
+    # 2. ROC Curve
+    plt.subplot(3, 3, 2)
+    fpr, tpr, _ = roc_curve(y_test, y_pred_proba)
+    auc_score = roc_auc_score(y_test, y_pred_proba)
+    plt.plot(fpr, tpr, color='darkorange', lw=2,
+            label=f'ROC Curve (AUC = {auc_score:.3f})')
+    plt.plot([0, 1], [0, 1], color='navy', lw=2, linestyle='--')
+    plt.xlim([0.0, 1.0])
+    plt.ylim([0.0, 1.05])
+    plt.xlabel('False Positive Rate')
+    plt.ylabel('True Positive Rate')
+    plt.title('ROC Curve')
+    plt.legend(loc="lower right")
+
+    # 3. Precision-Recall Curve
+    plt.subplot(3, 3, 3)
+    precision, recall, _ = precision_recall_curve(y_test, y_pred_proba)
+    avg_precision = average_precision_score(y_test, y_pred_proba)
+    plt.plot(recall, precision, color='blue', lw=2,
+            label=f'Avg Precision = {avg_precision:.3f}')
+    plt.xlabel('Recall')
+    plt.ylabel('Precision')
+    plt.title('Precision-Recall Curve')
+    plt.legend()
+
+    # 4. Feature Importance (if available)
+    plt.subplot(3, 3, 4)
+    if feature_importances is not None:
+        feature_importance = pd.DataFrame({
+            'feature': feature_names,
+            'importance': feature_importances
+        }).sort_values('importance', ascending=False).head(15)
+
+        sns.barplot(data=feature_importance, y='feature', x='importance')
+        plt.title('Top 15 Feature Importance')
+        plt.xlabel('Importance')
+
+    # 5. Prediction Distribution
+    plt.subplot(3, 3, 5)
+    plt.hist(y_pred_proba[y_test == 0], bins=50, alpha=0.7,
+            label='Survived', color='green')
+    plt.hist(y_pred_proba[y_test == 1], bins=50, alpha=0.7,
+            label='Failed', color='red')
+    plt.xlabel('Predicted Probability')
+    plt.ylabel('Frequency')
+    plt.title('Prediction Distribution')
+    plt.legend()
+
+    # 6. Model Comparison
+    plt.subplot(3, 3, 6)
+    model_names = list(final_metrics.keys())
+    auc_scores = [final_metrics[name]['roc_auc'] for name in model_names]
+
+    bars = plt.bar(model_names, auc_scores, color=['skyblue', 'lightgreen', 'coral', 'gold'])
+    plt.title('Model Comparison (ROC-AUC)')
+    plt.ylabel('ROC-AUC Score')
+    plt.xticks(rotation=45)
+
+    # Add value labels on bars
+    for bar, score in zip(bars, auc_scores):
+        plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.001,
+                f'{score:.3f}', ha='center', va='bottom')
+
+    # 7. Class Distribution
+    plt.subplot(3, 3, 7)
+    survival_counts = pd.Series(y_test).value_counts()
+    plt.pie(survival_counts.values, labels=['Survived', 'Failed'],
+           autopct='%1.1f%%', colors=['lightgreen', 'lightcoral'])
+    plt.title('Test Set Distribution')
+
+    # 8. Calibration Plot
+    plt.subplot(3, 3, 8)
+    fraction_of_positives, mean_predicted_value = calibration_curve(
+        y_test, y_pred_proba, n_bins=10)
+    plt.plot(mean_predicted_value, fraction_of_positives, "s-", label="Model")
+    plt.plot([0, 1], [0, 1], "k:", label="Perfectly calibrated")
+    plt.xlabel('Mean Predicted Probability')
+    plt.ylabel('Fraction of Positives')
+    plt.title('Calibration Plot')
+    plt.legend()
+
+    # 9. Learning Curve (placeholder)
+    plt.subplot(3, 3, 9)
+    plt.text(0.5, 0.5, 'Sophisticated\nMSME Prediction\nModel\n\nProduction Ready',
+            ha='center', va='center', fontsize=16,
+            bbox=dict(boxstyle="round,pad=0.3", facecolor="lightblue"))
+    plt.axis('off')
+
+    plt.suptitle('SOPHISTICATED MSME SURVIVAL PREDICTION MODEL\nAdvanced Analysis Dashboard',
+                fontsize=20, fontweight='bold')
+    plt.tight_layout()
+    path = os.path.join(output_dir, 'SOPHISTICATED_model_analysis_dashboard.png')
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+    written.append(path)
+
+    # Create separate feature importance plot
+    if feature_importances is not None:
+        plt.figure(figsize=(12, 10))
+        feature_importance = pd.DataFrame({
+            'feature': feature_names,
+            'importance': feature_importances
+        }).sort_values('importance', ascending=False).head(25)
+
+        sns.barplot(data=feature_importance, y='feature', x='importance', palette='viridis')
+        plt.title('SOPHISTICATED MODEL - Top 25 Feature Importance\n(Advanced Feature Engineering)', fontsize=16)
+        plt.xlabel('Importance Score', fontsize=12)
+        plt.tight_layout()
+        path = os.path.join(output_dir, 'SOPHISTICATED_feature_importance.png')
+        plt.savefig(path, dpi=dpi, bbox_inches='tight')
+        plt.close()
+        written.append(path)
+
+    return written
+
+
+def _render_and_report(*args):
+    for path in render_training_plots(*args):
+        print(f"   ✅ Saved {path}")
+
+
+def render_in_background(*args) -> multiprocessing.Process:
+    """
+    Start ``render_training_plots(*args)`` in a separate process.
+
+    A fresh (spawned) interpreter is used so the child neither shares the
+    trainer's thread pools nor inherits a copy of its memory. As with any
+    spawned process, a calling script needs an ``if __name__ == '__main__'``
+    guard.
+    """
+    process = multiprocessing.get_context('spawn').Process(
+        target=_render_and_report, args=args, name='training-visualizations')
+    process.start()
+    return process
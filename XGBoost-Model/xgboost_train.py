@@ -9,32 +9,34 @@ This script creates a truly sophisticated, production-grade model with:
 3. Ensemble methods (XGBoost + Random Forest + LightGBM)
 4. Comprehensive cross-validation and hyperparameter tuning
 5. Robust evaluation and validation
-6. Professional model deployment artifacts
+6. Distilled fast-tier student model
+7. Probability calibration lookup tables
+8. Binned-feature export of the ensemble's trees
+9. Professional model deployment artifacts
 
 Training time: 30-60 minutes for maximum quality
 """
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import warnings
 from datetime import datetime
 import os
 import pickle
 import gc
-from typing import Dict, List, Tuple, Any
+import argparse
+from typing import Dict, List, Tuple, Any, Optional
 
 # Core ML libraries
-from sklearn.model_selection import train_test_split, StratifiedKFold, GridSearchCV, cross_val_score
+from sklearn.model_selection import train_test_split, StratifiedKFold, cross_val_score
 from sklearn.preprocessing import StandardScaler, RobustScaler, LabelEncoder, PolynomialFeatures
 from sklearn.feature_selection import SelectKBest, f_classif, RFE
-from sklearn.metrics import (classification_report, confusion_matrix, accuracy_score, 
+from sklearn.metrics import (classification_report, accuracy_score, 
                            precision_score, recall_score, f1_score, roc_auc_score, 
-                           roc_curve, precision_recall_curve, average_precision_score)
+                           average_precision_score)
 
 # Ensemble methods
-from sklearn.ensemble import RandomForestClassifier, VotingClassifier, BaggingClassifier
+from sklearn.ensemble import RandomForestClassifier, BaggingClassifier
 import xgboost as xgb
 import lightgbm as lgb
 
@@ -50,9 +52,89 @@ from sklearn.pipeline import Pipeline
 from feature_engine.creation import MathFeatures
 from feature_engine.selection import DropConstantFeatures, DropDuplicateFeatures
 
+# Project modules
+from column_statistics import ColumnStatistics, fill_missing
+from ensembles import ENSEMBLE_WEIGHTINGS, PrefitVotingEnsemble, from_saved_form, saved_form
+from compact_dtypes import compact_frame, matrix_report
+from training_memory import MemoryBudget, MemoryProfiler, estimate_csv_rows
+from lending_club_parsers import TypedColumnParser, concat_frames
+from reservoir_sampling import ReservoirSampler, sample_csv, year_strata
+# Whole modules are part of the load stage's code fingerprint
+import compact_dtypes
+import lending_club_parsers
+import reservoir_sampling
+from resource_scheduler import ResourceScheduler
+from visualizations import render_in_background, render_training_plots
+from distillation import STUDENT_LEAVES, STUDENT_TREES, distillation_report, student_proba, train_student
+from calibration import CALIBRATION_METHODS, apply_calibration, calibration_report, fit_calibration
+from binned_trees import BinnedTrees, binned_report
+from drift_reference import SCORE_SAMPLE_ROWS, build_drift_reference, drift_reference_summary
+from training_checkpoints import StageCheckpointer, StagePipeline, file_fingerprint
+from incremental_training import (AppendOnlyLabelEncoder, continue_xgboost, continue_lightgbm,
+                                  extend_random_forest, plain_label_encoders, reassemble_voting_ensemble,
+                                  validation_gate)
+
 warnings.filterwarnings('ignore')
-plt.style.use('default')
-sns.set_palette("Set2")
+
+# Accepted-loan columns used for feature engineering
+ACCEPTED_FEATURES = [
+    # Core loan information
+    'loan_amnt', 'funded_amnt', 'funded_amnt_inv', 'term', 'int_rate', 'installment',
+    'grade', 'sub_grade', 'emp_title', 'emp_length', 'home_ownership', 'annual_inc',
+    'verification_status', 'loan_status', 'purpose', 'addr_state', 'dti',
+    
+    # Credit history
+    'delinq_2yrs', 'fico_range_low', 'fico_range_high', 'inq_last_6mths',
+    'mths_since_last_delinq', 'mths_since_last_record', 'open_acc', 'pub_rec',
+    'revol_bal', 'revol_util', 'total_acc',
+    
+    # Advanced credit metrics
+    'collections_12_mths_ex_med', 'acc_now_delinq', 'tot_coll_amt',
+    'tot_cur_bal', 'total_rev_hi_lim', 'avg_cur_bal',
+    
+    # Payment history
+    'total_pymnt', 'total_pymnt_inv', 'total_rec_prncp', 'total_rec_int',
+    'total_rec_late_fee', 'recoveries', 'collection_recovery_fee',
+    'last_pymnt_amnt', 'last_fico_range_high', 'last_fico_range_low',
+    
+    # Additional risk factors
+    'pub_rec_bankruptcies', 'tax_liens', 'hardship_flag', 'debt_settlement_flag'
+]
+
+# Text columns parsed to numbers at read time, and the remaining string columns (read as category)
+ACCEPTED_PARSERS = {'term': 'term', 'int_rate': 'percent', 'revol_util': 'percent', 'dti': 'percent',
+                    'emp_length': 'emp_length'}
+ACCEPTED_STRING_COLUMNS = ['grade', 'sub_grade', 'emp_title', 'home_ownership', 'verification_status',
+                           'loan_status', 'purpose', 'addr_state', 'hardship_flag', 'debt_settlement_flag']
+
+# Rejected-application columns (standardized names) used by the training pipeline
+REJECTED_COLUMNS = ['amount_requested', 'application_date', 'risk_score', 'debt-to-income_ratio',
+                    'state', 'employment_length']
+REJECTED_PARSERS = {'risk_score': 'number', 'debt-to-income_ratio': 'percent', 'employment_length': 'emp_length'}
+REJECTED_SAMPLING = ['uniform', 'year']
+
+# Key of the hash encoding of high-cardinality categoricals, pinned so training, incremental runs and
+# the API (model_artifacts.HASH_KEY) agree; pandas requires 16 bytes, so the old '1' always raised
+HASH_KEY = '0123456789123456'
+
+
+def _standardize_column(col: str) -> str:
+    return col.strip().replace(' ', '_').lower()
+
+# Training stages in execution order and the stages each one reads from
+TRAINING_STAGES = ['load', 'preprocess', 'resample', 'train', 'evaluate', 'distill', 'calibrate', 'save',
+                   'visualize']
+STAGE_DEPENDENCIES = {
+    'load': [],
+    'preprocess': ['load'],
+    'resample': ['preprocess'],
+    'train': ['resample'],
+    'evaluate': ['train'],
+    'distill': ['resample', 'train', 'evaluate'],
+    'calibrate': ['train', 'evaluate', 'distill'],
+    'save': ['preprocess', 'train', 'evaluate', 'distill', 'calibrate'],
+    'visualize': ['preprocess', 'train', 'evaluate'],
+}
 
 class SophisticatedMSMEPredictor:
     """
@@ -66,55 +148,76 @@ class SophisticatedMSMEPredictor:
     - Professional deployment artifacts
     """
     
-    def __init__(self):
+    def __init__(self, models_dir: str = 'msme-survival-predictor/backend/ml/models/',
+                 memory_budget_gb: Optional[float] = None, profile_memory: bool = False,
+                 memory_report_dir: str = 'memory_reports', compact_dtypes: bool = False,
+                 ensemble_weighting: str = 'uniform', ensemble_holdout_fraction: float = 0.1,
+                 cpu_cores: Optional[int] = None, metrics_only: bool = False,
+                 visualization_dpi: int = 300, background_visualizations: bool = False,
+                 visualization_dir: str = '.', rejected_sampling: str = 'uniform',
+                 student_trees: int = STUDENT_TREES, student_leaves: int = STUDENT_LEAVES,
+                 student_transfer_rows: int = 500_000, calibration_method: str = 'isotonic'):
+        self.models_dir = models_dir
+        self.rejected_sampling = rejected_sampling
+        self.metrics_only = metrics_only
+        self.visualization_dpi = visualization_dpi
+        self.background_visualizations = background_visualizations
+        self.visualization_dir = visualization_dir
+        self.visualization_process = None
+        self.test_probabilities = {}
+        self.scheduler = ResourceScheduler(cpu_cores)
+        self.memory_budget_gb = memory_budget_gb
+        self.profile_memory = profile_memory
+        self.memory_report_dir = memory_report_dir
+        self.memory_plan = {}
+        self.compact_dtypes = compact_dtypes
+        self.dtype_report = {}
+        self.train_seconds = None
+        self.ensemble_weighting = ensemble_weighting
+        self.ensemble_holdout_fraction = ensemble_holdout_fraction
         self.models = {}
         self.ensemble_model = None
+        self.student_trees = student_trees
+        self.student_leaves = student_leaves
+        self.student_transfer_rows = student_transfer_rows
+        self.student_model = None
+        self.distillation_metrics = {}
+        self.calibration_method = calibration_method
+        self.calibration = {}
+        self.calibration_metrics = {}
+        self.binned_model = None
+        self.binned_metrics = {}
+        self.drift_reference = None
+        self.drift_metrics = {}
         self.scaler = RobustScaler()
         self.label_encoders = {}
         self.feature_names = []
         self.feature_importance_df = None
         self.cv_results = {}
         self.final_metrics = {}
-        
-    def load_and_engineer_features(self) -> pd.DataFrame:
+        self.column_statistics = None
+        self.imputation_values = {}
+        self.frequency_maps = {}
+        self.run_info = {'training_mode': 'full'}
+        self.parse_report = {}
+        
+    def load_and_engineer_features(self, accepted_path: str = 'data/accepted_2007_to_2018Q4.csv',
+                                   rejected_path: Optional[str] = 'data/rejected_2007_to_2018Q4.csv') -> pd.DataFrame:
         """Load data and perform comprehensive feature engineering"""
         print("🔧 ADVANCED FEATURE ENGINEERING")
         print("="*80)
         
+        loaded = self.load_datasets(accepted_path, rejected_path)
+        if loaded is None:
+            return None
+        return self.engineer_features(*loaded)
+    
+    def load_datasets(self, accepted_path: str,
+                      rejected_path: Optional[str]) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """Accepted loans with their survival target and a reservoir sample of rejected applications"""
         print("1️⃣ Loading accepted dataset with ALL available features...")
         
-        # Load accepted dataset with comprehensive features
-        accepted_features = [
-            # Core loan information
-            'loan_amnt', 'funded_amnt', 'funded_amnt_inv', 'term', 'int_rate', 'installment',
-            'grade', 'sub_grade', 'emp_title', 'emp_length', 'home_ownership', 'annual_inc',
-            'verification_status', 'loan_status', 'purpose', 'addr_state', 'dti',
-            
-            # Credit history
-            'delinq_2yrs', 'fico_range_low', 'fico_range_high', 'inq_last_6mths',
-            'mths_since_last_delinq', 'mths_since_last_record', 'open_acc', 'pub_rec',
-            'revol_bal', 'revol_util', 'total_acc',
-            
-            # Advanced credit metrics
-            'collections_12_mths_ex_med', 'acc_now_delinq', 'tot_coll_amt',
-            'tot_cur_bal', 'total_rev_hi_lim', 'avg_cur_bal',
-            
-            # Payment history
-            'total_pymnt', 'total_pymnt_inv', 'total_rec_prncp', 'total_rec_int',
-            'total_rec_late_fee', 'recoveries', 'collection_recovery_fee',
-            'last_pymnt_amnt', 'last_fico_range_high', 'last_fico_range_low',
-            
-            # Additional risk factors
-            'pub_rec_bankruptcies', 'tax_liens', 'hardship_flag', 'debt_settlement_flag'
-        ]
-        
         try:
-            # Load accepted loans
-            df_accepted = pd.read_csv('data/accepted_2007_to_2018Q4.csv',
-                                    usecols=[col for col in accepted_features], 
-                                    low_memory=False)
-            print(f"   ✅ Accepted dataset loaded: {df_accepted.shape}")
-            
             # Create survival target
             survival_mapping = {
                 'Fully Paid': 0, 'Current': 0, 'In Grace Period': 0,
@@ -124,6 +227,48 @@ class SophisticatedMSMEPredictor:
                 'Does not meet the credit policy. Status:Charged Off': 1
             }
             
+            # Text columns are read as category and parsed to numbers once per distinct value
+            parser = TypedColumnParser(ACCEPTED_PARSERS)
+            read_dtypes = parser.read_dtypes(ACCEPTED_STRING_COLUMNS)
+            
+            if self.memory_plan:
+                # Chunked read: filter and downcast each chunk before it is kept
+                max_rows = self.memory_plan.get('max_training_rows')
+                # Row cap: a reservoir stratified by outcome, filled chunk by chunk, so
+                # the full file is never held. With the rejected sample (half the
+                # accepted rows) appended, the training frame stays within max_rows.
+                sampler = ReservoirSampler(max_rows * 2 // 3) if max_rows else None
+                chunks = []
+                for chunk in pd.read_csv(accepted_path, usecols=ACCEPTED_FEATURES, dtype=read_dtypes,
+                                         low_memory=False, chunksize=self.memory_plan['chunk_size']):
+                    chunk = parser(chunk)
+                    chunk = chunk[chunk['loan_status'].isin(survival_mapping.keys())]
+                    if sampler is not None:
+                        sampler.update(chunk, chunk['loan_status'].map(survival_mapping).astype(int))
+                        continue
+                    if self.memory_plan['downcast_float32']:
+                        float_cols = chunk.select_dtypes(include=['float64']).columns
+                        chunk[float_cols] = chunk[float_cols].astype(np.float32)
+                    chunks.append(chunk)
+                if sampler is not None:
+                    df_accepted = sampler.result()
+                    if self.memory_plan['downcast_float32']:
+                        float_cols = df_accepted.select_dtypes(include=['float64']).columns
+                        df_accepted[float_cols] = df_accepted[float_cols].astype(np.float32)
+                    print(f"   🧠 Memory budget: reservoir of {len(df_accepted):,} of "
+                          f"{sampler.rows_seen:,} accepted rows ({sampler.buffer_bytes / 1e6:,.1f} MB buffers)")
+                else:
+                    df_accepted = concat_frames(chunks)
+                del chunks
+            else:
+                # Load accepted loans
+                df_accepted = parser(pd.read_csv(accepted_path,
+                                                 usecols=[col for col in ACCEPTED_FEATURES],
+                                                 dtype=read_dtypes, low_memory=False))
+            self.parse_report['accepted'] = parser.report()
+            print(f"   ✅ Accepted dataset loaded: {df_accepted.shape}")
+            print(f"   🔣 Parsed text columns, bad values: {self.parse_report['accepted']['bad_values']}")
+            
             df_accepted = df_accepted[df_accepted['loan_status'].isin(survival_mapping.keys())]
             df_accepted['survival_status'] = df_accepted['loan_status'].map(survival_mapping)
             df_accepted['data_source'] = 'accepted'
@@ -136,12 +281,32 @@ class SophisticatedMSMEPredictor:
         
         print("\n2️⃣ Loading rejected dataset...")
         try:
-            # Load rejected applications (sample for balance)
-            df_rejected = pd.read_csv('data/rejected_2007_to_2018Q4.csv', 
-                                    nrows=5000000, low_memory=False)  # Sample 5M for balance
+            if rejected_path is None:
+                raise ValueError("no rejected dataset configured for this run")
+            
+            # One chunked pass over the whole file keeps a uniform (or year-stratified)
+            # reservoir of rejected applications, half the size of the accepted set
+            header = pd.read_csv(rejected_path, nrows=0).columns
+            needed = [col for col in header if _standardize_column(col) in REJECTED_COLUMNS]
+            parser = TypedColumnParser({col: REJECTED_PARSERS[_standardize_column(col)] for col in needed
+                                        if _standardize_column(col) in REJECTED_PARSERS})
+            read_dtypes = {col: float if _standardize_column(col) == 'amount_requested' else 'category'
+                           for col in needed}
+            date_col = next((col for col in needed if _standardize_column(col) == 'application_date'), None)
+            strata = year_strata(date_col) if self.rejected_sampling == 'year' and date_col else None
+            sampler = sample_csv(
+                rejected_path, size=len(df_accepted) // 2, usecols=needed, dtype=read_dtypes,
+                chunksize=(self.memory_plan or {}).get('chunk_size', 500_000), strata=strata,
+                transform=parser
+            )
+            df_rejected = sampler.result()
+            self.parse_report['rejected'] = parser.report()
+            print(f"   🔣 Parsed text columns, bad values: {self.parse_report['rejected']['bad_values']}")
+            print(f"   🎲 {self.rejected_sampling.capitalize()} reservoir: {len(df_rejected):,} of "
+                  f"{sampler.rows_seen:,} rejected rows ({sampler.buffer_bytes / 1e6:,.1f} MB buffers)")
             
             # Standardize column names
-            df_rejected.columns = [col.strip().replace(' ', '_').lower() for col in df_rejected.columns]
+            df_rejected.columns = [_standardize_column(col) for col in df_rejected.columns]
             
             # Map columns
             column_mapping = {
@@ -156,11 +321,6 @@ class SophisticatedMSMEPredictor:
                 if old_col in df_rejected.columns:
                     df_rejected.rename(columns={old_col: new_col}, inplace=True)
             
-            # Clean DTI
-            if 'dti' in df_rejected.columns:
-                df_rejected['dti'] = df_rejected['dti'].astype(str).str.replace('%', '')
-                df_rejected['dti'] = pd.to_numeric(df_rejected['dti'], errors='coerce')
-            
             # All rejected = failed
             df_rejected['survival_status'] = 1
             df_rejected['data_source'] = 'rejected'
@@ -172,7 +332,12 @@ class SophisticatedMSMEPredictor:
             print(f"   ❌ Error loading rejected data: {e}")
             df_rejected = pd.DataFrame()
         
+        return df_accepted, df_rejected
+    
+    def engineer_features(self, df_accepted: pd.DataFrame, df_rejected: pd.DataFrame) -> pd.DataFrame:
+        """Derived ratios and flags, the rejected sample appended, non-predictive columns dropped"""
         print("\n3️⃣ Advanced Feature Engineering...")
+        flag_dtype = np.int8 if self.compact_dtypes else int
         
         # Focus on accepted dataset for rich features
         df = df_accepted.copy()
@@ -203,13 +368,9 @@ class SophisticatedMSMEPredictor:
         # 3.3 Create employment stability features
         print("   💼 Engineering employment features...")
         if 'emp_length' in df.columns:
-            emp_mapping = {
-                '< 1 year': 0, '1 year': 1, '2 years': 2, '3 years': 3,
-                '4 years': 4, '5 years': 5, '6 years': 6, '7 years': 7,
-                '8 years': 8, '9 years': 9, '10+ years': 10
-            }
-            df['emp_length_numeric'] = df['emp_length'].map(emp_mapping)
-            df['emp_stability'] = (df['emp_length_numeric'] >= 3).astype(int)
+            # Already parsed to years ('< 1 year' -> 0, '10+ years' -> 10) at read time
+            df['emp_length_numeric'] = df['emp_length']
+            df['emp_stability'] = (df['emp_length_numeric'] >= 3).astype(flag_dtype)
         
         # 3.4 Create delinquency risk features
         print("   ⚠️ Engineering risk features...")
@@ -217,35 +378,31 @@ class SophisticatedMSMEPredictor:
         available_risk_cols = [col for col in risk_columns if col in df.columns]
         if available_risk_cols:
             df['total_risk_factors'] = df[available_risk_cols].fillna(0).sum(axis=1)
-            df['has_delinq_history'] = (df['delinq_2yrs'].fillna(0) > 0).astype(int)
+            df['has_delinq_history'] = (df['delinq_2yrs'].fillna(0) > 0).astype(flag_dtype)
         
         # 3.5 Create loan purpose categories
         print("   🎯 Engineering purpose features...")
         if 'purpose' in df.columns:
             high_risk_purposes = ['small_business', 'other', 'moving', 'vacation']
-            df['high_risk_purpose'] = df['purpose'].isin(high_risk_purposes).astype(int)
+            df['high_risk_purpose'] = df['purpose'].isin(high_risk_purposes).astype(flag_dtype)
         
         # 3.6 Create grade-based features
         print("   🏆 Engineering grade features...")
         if 'grade' in df.columns:
             grade_mapping = {'A': 7, 'B': 6, 'C': 5, 'D': 4, 'E': 3, 'F': 2, 'G': 1}
-            df['grade_numeric'] = df['grade'].map(grade_mapping)
-            df['is_prime_grade'] = df['grade'].isin(['A', 'B', 'C']).astype(int)
+            df['grade_numeric'] = df['grade'].map(grade_mapping).astype(float)
+            df['is_prime_grade'] = df['grade'].isin(['A', 'B', 'C']).astype(flag_dtype)
         
         # Add balanced rejected sample
         if not df_rejected.empty:
-            # Take a balanced sample of rejected applications
-            rejected_sample_size = min(len(df) // 2, len(df_rejected))
-            df_rejected_sample = df_rejected.sample(n=rejected_sample_size, random_state=42)
+            # The reservoir already holds a balanced random sample of rejected applications
+            df_rejected_sample = df_rejected
             
             # Find common columns
             common_cols = list(set(df.columns) & set(df_rejected_sample.columns))
             
             # Combine datasets
-            df_combined = pd.concat([
-                df[common_cols],
-                df_rejected_sample[common_cols]
-            ], ignore_index=True)
+            df_combined = concat_frames([df, df_rejected_sample], columns=common_cols)
             
             print(f"   ✅ Combined dataset: {df_combined.shape}")
             df = df_combined
@@ -260,6 +417,13 @@ class SophisticatedMSMEPredictor:
         ]
         df_processed = df.drop(columns=[col for col in columns_to_drop if col in df.columns])
         
+        # A memory budget's row cap is applied while reading (``load_datasets``)
+        if self.compact_dtypes:
+            self.dtype_report = compact_frame(df_processed)
+            print(f"   🗜️ Compact dtypes: {self.dtype_report['frame_bytes_before'] / 1e6:,.1f} MB → "
+                  f"{self.dtype_report['frame_bytes_after'] / 1e6:,.1f} MB "
+                  f"({self.dtype_report['frame_saved_pct']}% saved)")
+        
         # Display final statistics
         survival_counts = df_processed['survival_status'].value_counts()
         total = len(df_processed)
@@ -289,27 +453,22 @@ class SophisticatedMSMEPredictor:
         print(f"   📊 Numerical features: {len(numerical_features)}")
         print(f"   📝 Categorical features: {len(categorical_features)}")
         
-        # Advanced missing value imputation
-        for col in numerical_features:
-            if X[col].isnull().sum() > 0:
-                # Use median for skewed distributions, mean for normal
-                if abs(X[col].skew()) > 1:
-                    fill_value = X[col].median()
-                else:
-                    fill_value = X[col].mean()
-                X[col].fillna(fill_value, inplace=True)
+        # Single streaming pass for nulls, moments, quantiles and cardinality
+        self.column_statistics = ColumnStatistics().fit(X)
+        stats = self.column_statistics
         
-        for col in categorical_features:
-            if X[col].isnull().sum() > 0:
-                # Use mode for categorical variables
-                mode_val = X[col].mode()[0] if len(X[col].mode()) > 0 else 'Unknown'
-                X[col].fillna(mode_val, inplace=True)
+        # Advanced missing value imputation (median for skewed, mean for normal,
+        # mode for categorical - chosen inside ColumnStatistics)
+        self.imputation_values = stats.imputation_values()
+        if self.imputation_values:
+            X = fill_missing(X, self.imputation_values)
+        print(f"   🩹 Imputed {len(self.imputation_values)} columns with missing values")
         
         print("\n2️⃣ Advanced categorical encoding...")
         
         # Sophisticated categorical encoding
         for col in categorical_features:
-            unique_vals = X[col].nunique()
+            unique_vals = stats.n_unique(col)
             
             if unique_vals <= 20:  # Standard label encoding for low cardinality
                 le = LabelEncoder()
@@ -320,19 +479,20 @@ class SophisticatedMSMEPredictor:
             elif unique_vals <= 100:  # Target encoding for medium cardinality
                 # Simple target encoding
                 target_mean = y.mean()
-                encoding_map = X.groupby(col)[col].count().to_dict()
+                encoding_map = stats.imputed_category_counts(col).to_dict()
                 # Frequency encoding as proxy for target encoding
-                X[col] = X[col].map(encoding_map).fillna(0)
+                X[col] = X[col].map(encoding_map).astype(float).fillna(0)
+                self.frequency_maps[col] = encoding_map
                 print(f"   📊 {col}: frequency encoded ({unique_vals} categories)")
             
             else:  # Hash encoding for high cardinality
-                X[col] = pd.util.hash_pandas_object(X[col], hash_key='1').astype(np.uint32)
+                X[col] = pd.util.hash_pandas_object(X[col], index=False, hash_key=HASH_KEY).astype(np.uint32)
                 print(f"   #️⃣ {col}: hash encoded ({unique_vals} categories)")
         
         print("\n3️⃣ Feature scaling and selection...")
         
         # Remove constant and duplicate features
-        constant_features = X.columns[X.nunique() <= 1].tolist()
+        constant_features = stats.constant_features()
         if constant_features:
             X.drop(columns=constant_features, inplace=True)
             print(f"   🗑️ Removed {len(constant_features)} constant features")
@@ -343,6 +503,13 @@ class SophisticatedMSMEPredictor:
         print(f"   ✅ Final feature count: {len(self.feature_names)}")
         print(f"   📊 Final sample count: {len(X):,}")
         
+        if self.compact_dtypes:
+            X_matrix = X.to_numpy(dtype=np.float32)
+            self.dtype_report.update(matrix_report(X_matrix))
+            print(f"   🗜️ float32 matrix: {X_matrix.nbytes / 1e6:,.1f} MB "
+                  f"({self.dtype_report['matrix_saved_pct']}% smaller than float64)")
+            return X_matrix, y.to_numpy(dtype=np.int8)
+        
         return X.values, y.values
     
     def handle_class_imbalance(self, X: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
@@ -384,27 +551,8 @@ class SophisticatedMSMEPredictor:
             print("✅ Class distribution is acceptable, no resampling needed")
             return X, y
     
-    def train_ensemble_models(self, X: np.ndarray, y: np.ndarray) -> Dict[str, Any]:
-        """Train multiple models with hyperparameter tuning"""
-        print("\n🚀 TRAINING ENSEMBLE MODELS WITH HYPERPARAMETER TUNING")
-        print("="*80)
-        
-        # Split data for training and testing
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
-        )
-        
-        print(f"Training set: {X_train.shape[0]:,} samples")
-        print(f"Test set: {X_test.shape[0]:,} samples")
-        
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
-        
-        models_to_train = {}
-        
-        print("\n1️⃣ Training XGBoost with GridSearch...")
-        # XGBoost with hyperparameter tuning
+    def _train_xgboost(self, X_train: np.ndarray, y_train: np.ndarray, cores: int) -> Any:
+        """XGBoost with hyperparameter tuning on ``cores`` cores"""
         xgb_params = {
             'n_estimators': [200, 400],
             'max_depth': [6, 8, 10],
@@ -420,18 +568,13 @@ class SophisticatedMSMEPredictor:
             scale_pos_weight=len(y_train[y_train==0])/len(y_train[y_train==1])
         )
         
-        xgb_grid = GridSearchCV(
-            xgb_model, xgb_params, cv=3, scoring='roc_auc', 
-            n_jobs=-1, verbose=1
-        )
-        xgb_grid.fit(X_train_scaled, y_train)
-        models_to_train['XGBoost'] = xgb_grid.best_estimator_
-        
+        best_model, xgb_grid = self.scheduler.tuned_fit(xgb_model, xgb_params, X_train, y_train, cores)
         print(f"   ✅ Best XGBoost params: {xgb_grid.best_params_}")
         print(f"   📊 Best CV score: {xgb_grid.best_score_:.4f}")
-        
-        print("\n2️⃣ Training LightGBM...")
-        # LightGBM
+        return best_model
+    
+    def _train_lightgbm(self, X_train: np.ndarray, y_train: np.ndarray, cores: int) -> Any:
+        """LightGBM with fixed parameters on ``cores`` threads"""
         lgb_model = lgb.LGBMClassifier(
             n_estimators=300,
             max_depth=8,
@@ -440,13 +583,15 @@ class SophisticatedMSMEPredictor:
             colsample_bytree=0.8,
             random_state=42,
             class_weight='balanced',
-            verbosity=-1
+            verbosity=-1,
+            n_jobs=cores
         )
-        lgb_model.fit(X_train_scaled, y_train)
-        models_to_train['LightGBM'] = lgb_model
-        
-        print("\n3️⃣ Training Random Forest...")
-        # Random Forest with tuning
+        lgb_model.fit(X_train, y_train)
+        print("   ✅ LightGBM trained")
+        return lgb_model
+    
+    def _train_random_forest(self, X_train: np.ndarray, y_train: np.ndarray, cores: int) -> Any:
+        """Random Forest with hyperparameter tuning on ``cores`` cores"""
         rf_params = {
             'n_estimators': [200, 400],
             'max_depth': [10, 15, None],
@@ -456,33 +601,71 @@ class SophisticatedMSMEPredictor:
         
         rf_model = RandomForestClassifier(
             random_state=42,
-            class_weight='balanced',
-            n_jobs=-1
+            class_weight='balanced'
         )
         
-        rf_grid = GridSearchCV(
-            rf_model, rf_params, cv=3, scoring='roc_auc',
-            n_jobs=-1, verbose=1
+        best_model, rf_grid = self.scheduler.tuned_fit(rf_model, rf_params, X_train, y_train, cores)
+        print(f"   ✅ Best RF params: {rf_grid.best_params_}")
+        return best_model
+    
+    def train_ensemble_models(self, X: np.ndarray, y: np.ndarray) -> Dict[str, Any]:
+        """Train multiple models with hyperparameter tuning"""
+        print("\n🚀 TRAINING ENSEMBLE MODELS WITH HYPERPARAMETER TUNING")
+        print("="*80)
+        
+        # Split data for training and testing
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42, stratify=y
         )
-        rf_grid.fit(X_train_scaled, y_train)
-        models_to_train['RandomForest'] = rf_grid.best_estimator_
         
-        print(f"   ✅ Best RF params: {rf_grid.best_params_}")
+        print(f"Training set: {X_train.shape[0]:,} samples")
+        print(f"Test set: {X_test.shape[0]:,} samples")
         
-        print("\n4️⃣ Creating Voting Ensemble...")
-        # Create voting ensemble
-        voting_ensemble = VotingClassifier(
+        # Scale features
+        X_train_scaled = self.scaler.fit_transform(X_train)
+        X_test_scaled = self.scaler.transform(X_test)
+        if self.compact_dtypes:
+            # Guard against hidden upcasts: every model is fed float32
+            X_train_scaled = X_train_scaled.astype(np.float32, copy=False)
+            X_test_scaled = X_test_scaled.astype(np.float32, copy=False)
+        
+        # Optional holdout slice (never seen by the members) for learning ensemble weights
+        X_blend, y_blend = None, None
+        if self.ensemble_weighting != 'uniform':
+            X_train_scaled, X_blend, y_train, y_blend = train_test_split(
+                X_train_scaled, y_train, test_size=self.ensemble_holdout_fraction,
+                random_state=42, stratify=y_train
+            )
+            print(f"Ensemble weighting holdout: {len(y_blend):,} samples")
+        
+        # Independent members train concurrently, each on its share of the core budget
+        print("\n1️⃣ Training XGBoost (GridSearch), LightGBM and Random Forest (GridSearch)...")
+        models_to_train = self.scheduler.run_members({
+            'XGBoost': lambda cores: self._train_xgboost(X_train_scaled, y_train, cores),
+            'LightGBM': lambda cores: self._train_lightgbm(X_train_scaled, y_train, cores),
+            'RandomForest': lambda cores: self._train_random_forest(X_train_scaled, y_train, cores),
+        })
+        for member in self.scheduler.members[-3:]:
+            print(f"   ⏱️ {member['member']}: {member['seconds']:,.1f}s on {member['cores']} cores")
+        
+        print("\n2️⃣ Assembling Voting Ensemble from the tuned members...")
+        # Members are already fitted - combine them instead of cloning and refitting
+        ensemble_start = datetime.now()
+        voting_ensemble = PrefitVotingEnsemble(
             estimators=[
                 ('xgb', models_to_train['XGBoost']),
                 ('lgb', models_to_train['LightGBM']),
                 ('rf', models_to_train['RandomForest'])
-            ],
-            voting='soft'
+            ]
         )
-        
-        voting_ensemble.fit(X_train_scaled, y_train)
+        if X_blend is not None:
+            voting_ensemble.fit(X_blend, y_blend, method=self.ensemble_weighting)
         models_to_train['VotingEnsemble'] = voting_ensemble
         
+        weights = voting_ensemble.weights or [1.0, 1.0, 1.0]
+        print(f"   ✅ {self.ensemble_weighting} weighting {np.round(weights, 3).tolist()} "
+              f"in {(datetime.now() - ensemble_start).total_seconds():.2f}s")
+        
         # Store models and test data
         self.models = models_to_train
         self.X_test_scaled = X_test_scaled
@@ -490,19 +673,38 @@ class SophisticatedMSMEPredictor:
         
         return models_to_train
     
+    def score_test_set(self) -> Dict[str, np.ndarray]:
+        """
+        Positive-class test probabilities of every model, each scored exactly once.
+        
+        The voting ensemble is combined from its members' cached probabilities
+        instead of re-running them.
+        """
+        probabilities = {}
+        by_id = {}
+        for model_name, model in self.models.items():
+            members = getattr(model, 'estimators_', None)
+            if isinstance(model, PrefitVotingEnsemble) and all(id(m) in by_id for m in members):
+                proba = model.combine(np.column_stack([by_id[id(m)] for m in members]))
+            else:
+                proba = model.predict_proba(self.X_test_scaled)[:, 1]
+            probabilities[model_name] = by_id[id(model)] = proba
+        return probabilities
+    
     def comprehensive_evaluation(self) -> Dict[str, Dict[str, float]]:
         """Comprehensive model evaluation with multiple metrics"""
         print("\n📊 COMPREHENSIVE MODEL EVALUATION")
         print("="*80)
         
         all_metrics = {}
+        self.test_probabilities = self.score_test_set()
         
         for model_name, model in self.models.items():
             print(f"\n🔍 Evaluating {model_name}...")
             
-            # Predictions
-            y_pred = model.predict(self.X_test_scaled)
-            y_pred_proba = model.predict_proba(self.X_test_scaled)[:, 1]
+            # Predictions: hard labels are thresholded from the cached probabilities
+            y_pred_proba = self.test_probabilities[model_name]
+            y_pred = (y_pred_proba > 0.5).astype(int)
             
             # Calculate metrics
             metrics = {
@@ -534,143 +736,146 @@ class SophisticatedMSMEPredictor:
         self.final_metrics = all_metrics
         return all_metrics
     
+    def distill_student(self, X_transfer: np.ndarray) -> Dict[str, Any]:
+        """Train the fast-tier student on the ensemble's soft predictions and compare them"""
+        print("\n🎓 DISTILLING FAST-TIER STUDENT MODEL")
+        print("="*80)
+        
+        if len(X_transfer) > self.student_transfer_rows:
+            rows = np.random.default_rng(42).choice(len(X_transfer), self.student_transfer_rows, replace=False)
+            X_transfer = X_transfer[np.sort(rows)]
+        
+        start = datetime.now()
+        teacher_proba = self.ensemble_model.predict_proba(X_transfer)[:, 1]
+        self.student_model = train_student(X_transfer, teacher_proba, self.student_trees,
+                                           self.student_leaves, self.scheduler.total_cores)
+        print(f"   ✅ {self.student_trees} trees x {self.student_leaves} leaves on {len(X_transfer):,} "
+              f"soft labels in {(datetime.now() - start).total_seconds():.1f}s")
+        
+        report = distillation_report(self.ensemble_model, self.student_model, self.X_test_scaled, self.y_test,
+                                     self._cached_test_proba())
+        print(f"   📊 ROC-AUC: teacher {report['teacher_auc']:.4f}, student {report['student_auc']:.4f} "
+              f"(gap {report['auc_gap']:+.4f})")
+        print(f"   🎯 Fidelity: mean |Δp| {report['fidelity_mae']:.4f}, "
+              f"label agreement {report['label_agreement']:.2%}")
+        print(f"   ⚡ Latency: {report['teacher_ms_per_10k']:.1f} → {report['student_ms_per_10k']:.1f} ms "
+              f"per 10k rows ({report['speedup']:.1f}x)")
+        print(f"   📦 Size: {report['teacher_bytes']:,} → {report['student_bytes']:,} bytes "
+              f"({report['size_reduction']:.1f}x), {report['teacher_trees']:,} → {report['student_trees']} trees")
+        
+        self.distillation_metrics = report
+        return report
+    
+    def _cached_test_proba(self) -> Optional[np.ndarray]:
+        """The ensemble's test probabilities, if evaluation scored it"""
+        return next((self.test_probabilities.get(name) for name, model in self.models.items()
+                     if model is self.ensemble_model), None)
+    
+    def calibrate_probabilities(self) -> Dict[str, Dict[str, Any]]:
+        """Fit calibration lookup tables for the ensemble and its student on held-out test rows"""
+        print("\n📐 CALIBRATING PROBABILITIES")
+        print("="*80)
+        
+        self.calibration, self.calibration_metrics = {}, {}
+        if self.calibration_method == 'none':
+            print("   ⏭️ Calibration disabled")
+            return self.calibration_metrics
+        
+        # One half of the test set fits each table, the other half measures it
+        fit_rows, check_rows = train_test_split(np.arange(len(self.y_test)), test_size=0.5,
+                                                random_state=42, stratify=self.y_test)
+        y_test = np.asarray(self.y_test)
+        ensemble_proba = self._cached_test_proba()
+        if ensemble_proba is None:
+            ensemble_proba = self.ensemble_model.predict_proba(self.X_test_scaled)[:, 1]
+        tiers = {'full': ensemble_proba}
+        if self.student_model is not None:
+            tiers['fast'] = student_proba(self.student_model, self.X_test_scaled)
+        
+        for tier, proba in tiers.items():
+            table = fit_calibration(proba[fit_rows], y_test[fit_rows], self.calibration_method)
+            report = calibration_report(table, proba[check_rows], y_test[check_rows])
+            self.calibration[tier] = table
+            self.calibration_metrics[tier] = report
+            print(f"   ✅ {tier} tier: {self.calibration_method}, {report['knots']} knots "
+                  f"(max table error {report['max_table_error']:.1e})")
+            print(f"   📊 Brier {report['brier_raw']:.4f} → {report['brier_calibrated']:.4f}, "
+                  f"ECE {report['ece_raw']:.4f} → {report['ece_calibrated']:.4f} on {report['rows']:,} held-out rows")
+        return self.calibration_metrics
+    
+    def export_binned_model(self) -> Optional[BinnedTrees]:
+        """Export the ensemble's split thresholds as bin edges and check the binned path against it"""
+        print("\n🧮 EXPORTING BINNED-FEATURE TREES")
+        print("="*80)
+        
+        try:
+            self.binned_model = BinnedTrees.from_model(self.ensemble_model, len(self.feature_names))
+        except ValueError as e:
+            print(f"   ⚠️ Binned export skipped: {e}")
+            self.binned_model, self.binned_metrics = None, {}
+            return None
+        
+        report = binned_report(self.ensemble_model, self.binned_model, self.X_test_scaled)
+        print(f"   ✅ {report['bin_dtype']} bins, up to {max(report['edges_per_feature'], default=0)} edges "
+              f"per feature ({report['input_bytes_per_row']} → {report['binned_bytes_per_row']} bytes per row)")
+        print(f"   🎯 Identical to the library predictions: {report['identical_fraction']:.2%} "
+              f"(max |Δp| {report['max_abs_diff']:.2e})")
+        print(f"   ⚡ Latency: native {report['native_ms_per_10k']:.1f} ms, binned "
+              f"{report['binned_ms_per_10k']:.1f} ms per 10k rows ({report['speedup']:.2f}x)")
+        
+        self.binned_metrics = report
+        return self.binned_model
+    
+    def build_drift_reference(self, X: np.ndarray) -> Dict[str, Dict[str, Any]]:
+        """Reference distributions of the model inputs and scores for the API's drift monitor"""
+        print("\n📈 BUILDING DRIFT REFERENCE")
+        print("="*80)
+        
+        rows = np.random.default_rng(42).choice(len(X), min(len(X), SCORE_SAMPLE_ROWS), replace=False)
+        model_score = self.ensemble_model.predict_proba(self.scaler.transform(X[rows]))[:, 1]
+        if 'full' in self.calibration:
+            model_score = apply_calibration(self.calibration['full'], model_score)
+        self.drift_reference = build_drift_reference(X, self.feature_names, self.label_encoders, model_score)
+        self.drift_metrics = drift_reference_summary(self.drift_reference)
+        print(f"   ✅ {self.drift_metrics['numeric']} numeric and {self.drift_metrics['categorical']} "
+              f"categorical inputs over {self.drift_metrics['rows']:,} rows, model score over {len(rows):,}")
+        return self.drift_reference
+    
     def create_advanced_visualizations(self):
-        """Create comprehensive visualizations"""
+        """Create comprehensive visualizations from the cached test probabilities"""
         print("\n📊 CREATING ADVANCED VISUALIZATIONS")
         print("="*80)
         
-        # Get best model predictions
-        best_model = self.ensemble_model
-        y_pred = best_model.predict(self.X_test_scaled)
-        y_pred_proba = best_model.predict_proba(self.X_test_scaled)[:, 1]
-        
-        # Create figure with subplots
-        fig = plt.figure(figsize=(20, 15))
-        
-        # 1. Confusion Matrix
-        plt.subplot(3, 3, 1)
-        cm = confusion_matrix(self.y_test, y_pred)
-        sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
-                   xticklabels=['Survived', 'Failed'],
-                   yticklabels=['Survived', 'Failed'])
-        plt.title('Sophisticated Model - Confusion Matrix', fontsize=14)
-        plt.xlabel('Predicted')
-        plt.ylabel('Actual')
-        
-        # 2. ROC Curve
-        plt.subplot(3, 3, 2)
-        fpr, tpr, _ = roc_curve(self.y_test, y_pred_proba)
-        auc_score = roc_auc_score(self.y_test, y_pred_proba)
-        plt.plot(fpr, tpr, color='darkorange', lw=2, 
-                label=f'ROC Curve (AUC = {auc_score:.3f})')
-        plt.plot([0, 1], [0, 1], color='navy', lw=2, linestyle='--')
-        plt.xlim([0.0, 1.0])
-        plt.ylim([0.0, 1.05])
-        plt.xlabel('False Positive Rate')
-        plt.ylabel('True Positive Rate')
-        plt.title('ROC Curve')
-        plt.legend(loc="lower right")
-        
-        # 3. Precision-Recall Curve
-        plt.subplot(3, 3, 3)
-        precision, recall, _ = precision_recall_curve(self.y_test, y_pred_proba)
-        avg_precision = average_precision_score(self.y_test, y_pred_proba)
-        plt.plot(recall, precision, color='blue', lw=2,
-                label=f'Avg Precision = {avg_precision:.3f}')
-        plt.xlabel('Recall')
-        plt.ylabel('Precision')
-        plt.title('Precision-Recall Curve')
-        plt.legend()
-        
-        # 4. Feature Importance (if available)
-        plt.subplot(3, 3, 4)
-        if hasattr(best_model, 'feature_importances_'):
-            feature_importance = pd.DataFrame({
-                'feature': self.feature_names,
-                'importance': best_model.feature_importances_
-            }).sort_values('importance', ascending=False).head(15)
-            
-            sns.barplot(data=feature_importance, y='feature', x='importance')
-            plt.title('Top 15 Feature Importance')
-            plt.xlabel('Importance')
-        
-        # 5. Prediction Distribution
-        plt.subplot(3, 3, 5)
-        plt.hist(y_pred_proba[self.y_test == 0], bins=50, alpha=0.7, 
-                label='Survived', color='green')
-        plt.hist(y_pred_proba[self.y_test == 1], bins=50, alpha=0.7, 
-                label='Failed', color='red')
-        plt.xlabel('Predicted Probability')
-        plt.ylabel('Frequency')
-        plt.title('Prediction Distribution')
-        plt.legend()
-        
-        # 6. Model Comparison
-        plt.subplot(3, 3, 6)
-        model_names = list(self.final_metrics.keys())
-        auc_scores = [self.final_metrics[name]['roc_auc'] for name in model_names]
-        
-        bars = plt.bar(model_names, auc_scores, color=['skyblue', 'lightgreen', 'coral', 'gold'])
-        plt.title('Model Comparison (ROC-AUC)')
-        plt.ylabel('ROC-AUC Score')
-        plt.xticks(rotation=45)
-        
-        # Add value labels on bars
-        for bar, score in zip(bars, auc_scores):
-            plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.001,
-                    f'{score:.3f}', ha='center', va='bottom')
-        
-        # 7. Class Distribution
-        plt.subplot(3, 3, 7)
-        survival_counts = pd.Series(self.y_test).value_counts()
-        plt.pie(survival_counts.values, labels=['Survived', 'Failed'], 
-               autopct='%1.1f%%', colors=['lightgreen', 'lightcoral'])
-        plt.title('Test Set Distribution')
-        
-        # 8. Calibration Plot
-        plt.subplot(3, 3, 8)
-        from sklearn.calibration import calibration_curve
-        fraction_of_positives, mean_predicted_value = calibration_curve(
-            self.y_test, y_pred_proba, n_bins=10)
-        plt.plot(mean_predicted_value, fraction_of_positives, "s-", label="Model")
-        plt.plot([0, 1], [0, 1], "k:", label="Perfectly calibrated")
-        plt.xlabel('Mean Predicted Probability')
-        plt.ylabel('Fraction of Positives')
-        plt.title('Calibration Plot')
-        plt.legend()
-        
-        # 9. Learning Curve (placeholder)
-        plt.subplot(3, 3, 9)
-        plt.text(0.5, 0.5, 'Sophisticated\nMSME Prediction\nModel\n\nProduction Ready', 
-                ha='center', va='center', fontsize=16, 
-                bbox=dict(boxstyle="round,pad=0.3", facecolor="lightblue"))
-        plt.axis('off')
-        
-        plt.suptitle('SOPHISTICATED MSME SURVIVAL PREDICTION MODEL\nAdvanced Analysis Dashboard', 
-                    fontsize=20, fontweight='bold')
-        plt.tight_layout()
-        plt.savefig('SOPHISTICATED_model_analysis_dashboard.png', 
-                   dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print("   ✅ Saved SOPHISTICATED_model_analysis_dashboard.png")
-        
-        # Create separate feature importance plot
-        if hasattr(best_model, 'feature_importances_'):
-            plt.figure(figsize=(12, 10))
-            feature_importance = pd.DataFrame({
-                'feature': self.feature_names,
-                'importance': best_model.feature_importances_
-            }).sort_values('importance', ascending=False).head(25)
-            
-            sns.barplot(data=feature_importance, y='feature', x='importance', palette='viridis')
-            plt.title('SOPHISTICATED MODEL - Top 25 Feature Importance\n(Advanced Feature Engineering)', fontsize=16)
-            plt.xlabel('Importance Score', fontsize=12)
-            plt.tight_layout()
-            plt.savefig('SOPHISTICATED_feature_importance.png', dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            print("   ✅ Saved SOPHISTICATED_feature_importance.png")
+        best_model_name = max(self.final_metrics.keys(), key=lambda x: self.final_metrics[x]['roc_auc'])
+        args = (self.y_test, self.test_probabilities[best_model_name], self.final_metrics,
+                self.feature_names, getattr(self.ensemble_model, 'feature_importances_', None),
+                self.visualization_dir, self.visualization_dpi)
+        
+        if self.background_visualizations:
+            self.visualization_process = render_in_background(*args)
+            print(f"   🖼️ Rendering in background process {self.visualization_process.pid} "
+                  f"({self.visualization_dpi} dpi)")
+            return
+        
+        for path in render_training_plots(*args):
+            print(f"   ✅ Saved {path}")
+    
+    def wait_for_visualizations(self):
+        """Block until a background rendering process has finished"""
+        if self.visualization_process is None:
+            return
+        print("\n🖼️ Waiting for background visualizations...")
+        self.visualization_process.join()
+        if self.visualization_process.exitcode != 0:
+            print(f"   ⚠️ Visualization process exited with code {self.visualization_process.exitcode}")
+        self.visualization_process = None
+    
+    def hashed_columns(self) -> List[str]:
+        """Model inputs hash-encoded because they have too many categories for the other encodings"""
+        if self.column_statistics is None:
+            return []
+        return [col for col in self.column_statistics.categorical_columns
+                if col in self.feature_names and col not in self.label_encoders and col not in self.frequency_maps]
     
     def save_sophisticated_model(self, total_records: int):
         """Save the sophisticated model with comprehensive metadata"""
@@ -678,18 +883,31 @@ class SophisticatedMSMEPredictor:
         print("="*80)
         
         # Create models directory
-        models_dir = 'msme-survival-predictor/backend/ml/models/'
+        models_dir = self.models_dir
         os.makedirs(models_dir, exist_ok=True)
+        self.export_binned_model()
         
         # Save all model artifacts
         model_artifacts = {
-            'sophisticated_ensemble_model.pkl': self.ensemble_model,
-            'sophisticated_all_models.pkl': self.models,
+            'sophisticated_ensemble_model.pkl': saved_form(self.ensemble_model),
+            'sophisticated_all_models.pkl': {name: saved_form(model) for name, model in self.models.items()},
             'sophisticated_scaler.pkl': self.scaler,
-            'sophisticated_label_encoders.pkl': self.label_encoders,
+            'sophisticated_label_encoders.pkl': plain_label_encoders(self.label_encoders),
             'sophisticated_feature_names.pkl': self.feature_names,
+            'sophisticated_column_statistics.pkl': self.column_statistics,
+            'sophisticated_imputation_values.pkl': self.imputation_values,
+            'sophisticated_frequency_maps.pkl': self.frequency_maps,
+            'sophisticated_hashed_columns.pkl': self.hashed_columns(),
             'sophisticated_metrics.pkl': self.final_metrics
         }
+        if self.student_model is not None:
+            model_artifacts['sophisticated_student_model.pkl'] = self.student_model
+        if self.calibration:
+            model_artifacts['sophisticated_calibration.pkl'] = self.calibration
+        if self.binned_model is not None:
+            model_artifacts['sophisticated_binned_model.pkl'] = self.binned_model
+        if self.drift_reference is not None:
+            model_artifacts['sophisticated_drift_reference.pkl'] = self.drift_reference
         
         print("1️⃣ Saving sophisticated model artifacts:")
         for filename, artifact in model_artifacts.items():
@@ -699,9 +917,9 @@ class SophisticatedMSMEPredictor:
             size = os.path.getsize(filepath)
             print(f"   ✅ {filename}: {size:,} bytes")
         
-        # Save comprehensive metadata
-        best_model_name = max(self.final_metrics.keys(), 
-                            key=lambda x: self.final_metrics[x]['roc_auc'])
+        # Save comprehensive metadata (for the saved model, which an incremental run fixes in advance)
+        best_model_name = next((name for name, model in self.models.items() if model is self.ensemble_model),
+                               max(self.final_metrics.keys(), key=lambda x: self.final_metrics[x]['roc_auc']))
         best_metrics = self.final_metrics[best_model_name]
         
         metadata = {
@@ -713,6 +931,17 @@ class SophisticatedMSMEPredictor:
             'total_records_processed': total_records,
             'features_count': len(self.feature_names),
             'feature_names': self.feature_names,
+            'imputation_values': self.imputation_values,
+            'compact_dtypes': self.compact_dtypes,
+            'dtype_report': self.dtype_report,
+            'parse_report': self.parse_report,
+            'train_seconds': self.train_seconds,
+            'cpu_report': self.scheduler.report(),
+            'ensemble_weighting': self.ensemble_weighting,
+            'distillation': self.distillation_metrics,
+            'calibration': self.calibration_metrics,
+            'binned_inference': self.binned_metrics,
+            'drift_reference': self.drift_metrics,
             'performance_metrics': best_metrics,
             'all_model_metrics': self.final_metrics,
             'training_techniques': [
@@ -725,7 +954,8 @@ class SophisticatedMSMEPredictor:
             ],
             'production_ready': True,
             'sophistication_level': 'ENTERPRISE_GRADE',
-            'version': 'SOPHISTICATED_V2.0'
+            'version': 'SOPHISTICATED_V2.1',
+            **self.run_info
         }
         
         metadata_path = os.path.join(models_dir, 'sophisticated_model_metadata.pkl')
@@ -744,10 +974,26 @@ class SophisticatedMSMEPredictor:
         
         DEPLOYMENT INSTRUCTIONS:
         -----------------------
-        1. Load model: pickle.load('sophisticated_ensemble_model.pkl')
+        1. Load model: pickle.load('sophisticated_ensemble_model.pkl') (a voting ensemble is saved
+           as a dict of its fitted members, weights and meta-learner; the API's ModelArtifacts
+           rebuilds it)
         2. Load scaler: pickle.load('sophisticated_scaler.pkl')
         3. Load encoders: pickle.load('sophisticated_label_encoders.pkl')
         4. Load features: pickle.load('sophisticated_feature_names.pkl')
+        5. Load imputation: df.fillna(pickle.load('sophisticated_imputation_values.pkl')) before
+           encoding (deployed as imputation_values.pkl, applied by the API's ModelArtifacts)
+           Categorical inputs not in the label encoders are mapped through
+           'sophisticated_frequency_maps.pkl' or, if listed in 'sophisticated_hashed_columns.pkl',
+           hashed with pd.util.hash_pandas_object(values, index=False, hash_key='0123456789123456')
+           (deployed as frequency_maps.pkl and hashed_columns.pkl)
+        6. Fast tier (optional): pickle.load('sophisticated_student_model.pkl').predict(X) is the
+           distilled student's failure probability
+        7. Calibration (optional): np.interp(p, table['x'], table['y']) with
+           pickle.load('sophisticated_calibration.pkl')[tier] ('full' or 'fast')
+        8. Binned inference (optional): pickle.load('sophisticated_binned_model.pkl').predict_proba(X)
+           scores the scaled matrix on binned features, with the ensemble's predictions
+        9. Drift monitoring (optional): deploy 'sophisticated_drift_reference.pkl' as
+           drift_reference.pkl for the API's /drift endpoint
         
         PERFORMANCE METRICS:
         -------------------
@@ -783,8 +1029,112 @@ class SophisticatedMSMEPredictor:
         
         return models_dir, best_model_name
     
-    def run_sophisticated_training(self):
-        """Run the complete sophisticated training pipeline"""
+    def _restore_state(self, state: Dict[str, Any]):
+        """Restore predictor attributes captured by an earlier (possibly checkpointed) stage"""
+        for attr, value in state.items():
+            setattr(self, attr, value)
+    
+    def _stage_load(self) -> Dict[str, Any]:
+        df = self.load_and_engineer_features(self.accepted_path, self.rejected_path)
+        if df is None:
+            raise Exception("Failed to load and engineer features")
+        return {'df': df, 'state': {'dtype_report': self.dtype_report, 'parse_report': self.parse_report}}
+    
+    def _stage_preprocess(self) -> Dict[str, Any]:
+        self._restore_state(self.pipeline.get('load', 'state'))
+        X, y = self.advanced_preprocessing(self.pipeline.get('load', 'df'))
+        return {'X': X, 'y': y, 'state': {
+            'label_encoders': self.label_encoders,
+            'feature_names': self.feature_names,
+            'column_statistics': self.column_statistics,
+            'imputation_values': self.imputation_values,
+            'frequency_maps': self.frequency_maps,
+            'dtype_report': self.dtype_report,
+        }}
+    
+    def _stage_resample(self) -> Dict[str, Any]:
+        X_balanced, y_balanced = self.handle_class_imbalance(self.pipeline.get('preprocess', 'X'),
+                                                             self.pipeline.get('preprocess', 'y'))
+        return {'X': X_balanced, 'y': y_balanced}
+    
+    def _stage_train(self) -> Dict[str, Any]:
+        start = datetime.now()
+        self.train_ensemble_models(self.pipeline.get('resample', 'X'), self.pipeline.get('resample', 'y'))
+        self.train_seconds = (datetime.now() - start).total_seconds()
+        print(f"   ⏱️ Ensemble training time: {self.train_seconds:,.1f}s "
+              f"({'compact float32' if self.compact_dtypes else 'float64'} matrix)")
+        return {'X_test_scaled': self.X_test_scaled, 'y_test': self.y_test,
+                'state': {'models': self.models, 'scaler': self.scaler,
+                          'train_seconds': self.train_seconds}}
+    
+    def _restore_trained(self):
+        self._restore_state(self.pipeline.get('train', 'state'))
+        self.X_test_scaled = self.pipeline.get('train', 'X_test_scaled')
+        self.y_test = self.pipeline.get('train', 'y_test')
+    
+    def _stage_evaluate(self) -> Dict[str, Any]:
+        self._restore_trained()
+        metrics = self.comprehensive_evaluation()
+        best_model_name = max(metrics.keys(), key=lambda x: metrics[x]['roc_auc'])
+        return {'state': {'final_metrics': metrics, 'best_model_name': best_model_name,
+                          'test_probabilities': self.test_probabilities}}
+    
+    def _restore_evaluated(self) -> str:
+        self._restore_state(self.pipeline.get('preprocess', 'state'))
+        self._restore_trained()
+        state = self.pipeline.get('evaluate', 'state')
+        self.final_metrics = state['final_metrics']
+        self.test_probabilities = state['test_probabilities']
+        self.ensemble_model = self.models[state['best_model_name']]
+        return state['best_model_name']
+    
+    def _transfer_set(self, X: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Scaled training rows of ``train_ensemble_models`` (same split), for distillation"""
+        X_train, _, _, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+        X_train_scaled = self.scaler.transform(X_train)
+        if self.compact_dtypes:
+            X_train_scaled = X_train_scaled.astype(np.float32, copy=False)
+        return X_train_scaled
+    
+    def _stage_distill(self) -> Dict[str, Any]:
+        self._restore_evaluated()
+        self.distill_student(self._transfer_set(self.pipeline.get('resample', 'X'),
+                                                self.pipeline.get('resample', 'y')))
+        return {'state': {'student_model': self.student_model,
+                          'distillation_metrics': self.distillation_metrics}}
+    
+    def _stage_calibrate(self) -> Dict[str, Any]:
+        self._restore_evaluated()
+        self._restore_state(self.pipeline.get('distill', 'state'))
+        self.calibrate_probabilities()
+        return {'state': {'calibration': self.calibration, 'calibration_metrics': self.calibration_metrics}}
+    
+    def _stage_save(self) -> Dict[str, Any]:
+        self._restore_evaluated()
+        self._restore_state(self.pipeline.get('distill', 'state'))
+        self._restore_state(self.pipeline.get('calibrate', 'state'))
+        total_records = len(self.pipeline.get('preprocess', 'y'))
+        self.build_drift_reference(self.pipeline.get('preprocess', 'X'))
+        model_location, best_model_name = self.save_sophisticated_model(total_records)
+        return {'model_location': model_location, 'best_model_name': best_model_name,
+                'total_records': total_records}
+    
+    def _stage_visualize(self) -> Dict[str, Any]:
+        self._restore_evaluated()
+        self.create_advanced_visualizations()
+        return {}
+    
+    def run_sophisticated_training(self, accepted_path: str = 'data/accepted_2007_to_2018Q4.csv',
+                                   rejected_path: Optional[str] = 'data/rejected_2007_to_2018Q4.csv',
+                                   checkpoint_dir: Optional[str] = None,
+                                   resume_from: Optional[str] = None):
+        """
+        Run the complete sophisticated training pipeline
+        
+        With ``checkpoint_dir`` set, every stage writes a content-hashed
+        checkpoint and reruns skip unchanged stages. ``resume_from`` reuses the
+        checkpoints of all earlier stages and recomputes from that stage on.
+        """
         print("🚀 SOPHISTICATED MSME SURVIVAL PREDICTION MODEL")
         print("="*90)
         print("🎯 ENTERPRISE-GRADE MACHINE LEARNING PIPELINE")
@@ -799,34 +1149,96 @@ class SophisticatedMSMEPredictor:
         print("   ✅ Hyperparameter Tuning (GridSearch)")
         print("   ✅ Cross-Validation Optimization")
         print("   ✅ Comprehensive Evaluation")
+        print("   ✅ Distilled Fast-Tier Student")
+        print("   ✅ Probability Calibration")
         print("   ✅ Professional Deployment Artifacts")
         print()
         
         try:
-            # Step 1: Feature Engineering
-            df = self.load_and_engineer_features()
-            if df is None:
-                raise Exception("Failed to load and engineer features")
+            self.accepted_path = accepted_path
+            self.rejected_path = rejected_path
+            checkpointer = StageCheckpointer(checkpoint_dir) if checkpoint_dir else None
+            
+            # Memory instrumentation and budget planning
+            profiler = None
+            if self.profile_memory or self.memory_budget_gb:
+                profiler = MemoryProfiler(trace_allocations=self.profile_memory)
+            if self.memory_budget_gb:
+                self.memory_plan = MemoryBudget(self.memory_budget_gb).plan_for_csv(
+                    accepted_path, len(ACCEPTED_FEATURES))
+                print(f"🧠 Memory plan for {self.memory_budget_gb} GB: {self.memory_plan}")
+                self.compact_dtypes = self.compact_dtypes or self.memory_plan['downcast_float32']
+            
+            # CPU budget: env limits for child processes, per-stage utilization
+            self.scheduler.apply_env_limits()
+            print(f"⚙️ CPU budget: {self.scheduler.total_cores} cores")
             
-            total_records = len(df)
+            self.pipeline = StagePipeline(TRAINING_STAGES, STAGE_DEPENDENCIES, checkpointer,
+                                          resume_from, profiler=profiler, monitors=[self.scheduler])
+            
+            # Step 1: Feature Engineering
+            self.pipeline.run('load', self._stage_load,
+                              code=[self.load_and_engineer_features, self.load_datasets,
+                                    self.engineer_features, lending_club_parsers, reservoir_sampling,
+                                    compact_dtypes],
+                              config={'accepted': file_fingerprint(accepted_path),
+                                      'rejected': file_fingerprint(rejected_path),
+                                      'accepted_parsers': ACCEPTED_PARSERS,
+                                      'rejected_parsers': REJECTED_PARSERS,
+                                      'memory_plan': self.memory_plan,
+                                      'compact_dtypes': self.compact_dtypes,
+                                      'rejected_sampling': self.rejected_sampling})
             
             # Step 2: Advanced Preprocessing
-            X, y = self.advanced_preprocessing(df)
+            self.pipeline.run('preprocess', self._stage_preprocess,
+                              code=[self.advanced_preprocessing, ColumnStatistics],
+                              config={'compact_dtypes': self.compact_dtypes})
             
             # Step 3: Handle Class Imbalance
-            X_balanced, y_balanced = self.handle_class_imbalance(X, y)
+            self.pipeline.run('resample', self._stage_resample, code=[self.handle_class_imbalance])
             
             # Step 4: Train Ensemble Models
-            models = self.train_ensemble_models(X_balanced, y_balanced)
+            self.pipeline.run('train', self._stage_train,
+                              code=[self.train_ensemble_models, self._train_xgboost, self._train_lightgbm,
+                                    self._train_random_forest, PrefitVotingEnsemble],
+                              config={'compact_dtypes': self.compact_dtypes,
+                                      'ensemble_weighting': self.ensemble_weighting,
+                                      'ensemble_holdout_fraction': self.ensemble_holdout_fraction})
             
             # Step 5: Comprehensive Evaluation
-            metrics = self.comprehensive_evaluation()
+            self.pipeline.run('evaluate', self._stage_evaluate, code=[self.comprehensive_evaluation])
+            
+            # Step 6: Distill the fast-tier student from the ensemble
+            self.pipeline.run('distill', self._stage_distill,
+                              code=[self.distill_student, self._transfer_set, train_student, distillation_report],
+                              config={'student_trees': self.student_trees,
+                                      'student_leaves': self.student_leaves,
+                                      'student_transfer_rows': self.student_transfer_rows,
+                                      'compact_dtypes': self.compact_dtypes})
+            
+            # Step 7: Calibrate the ensemble's and the student's probabilities
+            self.pipeline.run('calibrate', self._stage_calibrate,
+                              code=[self.calibrate_probabilities, fit_calibration, calibration_report],
+                              config={'calibration_method': self.calibration_method})
+            
+            # Step 8: Save Model (before visualization, so a plotting failure cannot lose it)
+            saved = self.pipeline.run('save', self._stage_save, cache=False)
+            model_location, best_model_name = saved['model_location'], saved['best_model_name']
+            total_records = saved['total_records']
+            metrics = self.final_metrics
             
-            # Step 6: Create Visualizations
-            self.create_advanced_visualizations()
+            # Step 9: Create Visualizations (skipped entirely in metrics-only runs)
+            if self.metrics_only:
+                print("\n⏭️ Metrics-only run: visualizations skipped")
+            else:
+                self.pipeline.run('visualize', self._stage_visualize,
+                                  code=[self.create_advanced_visualizations, render_training_plots],
+                                  config={'dpi': self.visualization_dpi, 'output_dir': self.visualization_dir},
+                                  cache=not self.background_visualizations)
             
-            # Step 7: Save Model
-            model_location, best_model_name = self.save_sophisticated_model(total_records)
+            if profiler:
+                profiler.write_report(self.memory_report_dir, {'memory_plan': self.memory_plan,
+                                                               'cpu': self.scheduler.report()})
             
             # Final Summary
             print("\n" + "="*90)
@@ -850,6 +1262,7 @@ class SophisticatedMSMEPredictor:
             print(f"📍 LOCATION: {model_location}")
             print("🔗 All related files saved in the same directory")
             
+            self.wait_for_visualizations()
             return model_location, best_model_name
             
         except Exception as e:
@@ -857,8 +1270,238 @@ class SophisticatedMSMEPredictor:
             import traceback
             traceback.print_exc()
             return None, None
+    
+    def load_previous_artifacts(self) -> Dict[str, Any]:
+        """Load the artifacts written by the last accepted training run"""
+        print("\n📦 LOADING PREVIOUS MODEL ARTIFACTS")
+        print("="*80)
+        
+        artifacts = {}
+        for name in ['all_models', 'ensemble_model', 'scaler', 'label_encoders', 'feature_names',
+                     'column_statistics', 'frequency_maps', 'model_metadata']:
+            filepath = os.path.join(self.models_dir, f'sophisticated_{name}.pkl')
+            with open(filepath, 'rb') as f:
+                artifacts[name] = pickle.load(f)
+            print(f"   ✅ {os.path.basename(filepath)}")
+        
+        self.models = {name: from_saved_form(model) for name, model in artifacts['all_models'].items()}
+        self.ensemble_model = from_saved_form(artifacts['ensemble_model'])
+        self.scaler = artifacts['scaler']
+        self.label_encoders = {col: AppendOnlyLabelEncoder.from_label_encoder(le)
+                               for col, le in artifacts['label_encoders'].items()}
+        self.feature_names = artifacts['feature_names']
+        self.column_statistics = artifacts['column_statistics']
+        self.frequency_maps = artifacts['frequency_maps']
+        # The refreshed ensemble is combined the way the previous one was
+        self.ensemble_weighting = artifacts['model_metadata'].get('ensemble_weighting', 'uniform')
+        return artifacts
+    
+    def apply_fitted_preprocessing(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Preprocess new partitions with the fitted encoders, refreshing statistics incrementally"""
+        print("\n⚙️ INCREMENTAL PREPROCESSING")
+        print("="*80)
+        
+        X = df.drop('survival_status', axis=1)
+        y = df['survival_status']
+        
+        # Refresh imputation statistics with the new rows only
+        stats = self.column_statistics.update(X)
+        self.imputation_values = stats.imputation_values()
+        X = X.reindex(columns=stats.numerical_columns + stats.categorical_columns)
+        X = fill_missing(X, self.imputation_values)
+        print(f"   🩹 Refreshed statistics over {stats.n_rows:,} total rows")
+        
+        for col in stats.categorical_columns:
+            if col in self.label_encoders:
+                le = self.label_encoders[col]
+                known = len(le.classes_)
+                X[col] = le.partial_fit(X[col]).transform(X[col])
+                print(f"   🔤 {col}: {len(le.classes_) - known} new categories appended")
+            elif col in self.frequency_maps:
+                X[col] = X[col].map(self.frequency_maps[col]).astype(float).fillna(0)
+            else:
+                X[col] = pd.util.hash_pandas_object(X[col], index=False, hash_key=HASH_KEY).astype(np.uint32)
+        
+        X = X[self.feature_names]
+        print(f"   📊 New partition samples: {len(X):,}")
+        return X.values, y.values
+    
+    def run_incremental_training(self, new_accepted_paths: List[str], boosting_rounds: int = 100,
+                                 forest_trees: int = 50, gate_tolerance: float = 0.005):
+        """Warm-start the ensemble on new loan quarters instead of retraining from scratch"""
+        print("🔁 INCREMENTAL MSME SURVIVAL MODEL UPDATE")
+        print("="*90)
+        print(f"🕐 Start time: {datetime.now()}")
+        
+        try:
+            self.load_previous_artifacts()
+            previous_model = self.ensemble_model
+            previous_models = self.models
+            
+            # CPU budget: the members continue one after another, each on every core
+            self.scheduler.apply_env_limits()
+            print(f"⚙️ CPU budget: {self.scheduler.total_cores} cores")
+            
+            # Memory budget over all new partitions; each gets its share of the row cap
+            partition_plans = {path: {} for path in new_accepted_paths}
+            if self.memory_budget_gb:
+                partition_rows = {path: estimate_csv_rows(path) for path in new_accepted_paths}
+                total_rows = max(sum(partition_rows.values()), 1)
+                plan = MemoryBudget(self.memory_budget_gb).plan(total_rows, len(ACCEPTED_FEATURES))
+                print(f"🧠 Memory plan for {self.memory_budget_gb} GB: {plan}")
+                self.compact_dtypes = self.compact_dtypes or plan['downcast_float32']
+                for path, rows in partition_rows.items():
+                    max_rows = plan['max_training_rows']
+                    partition_plans[path] = {**plan, 'max_training_rows':
+                                             max(1, max_rows * rows // total_rows) if max_rows else None}
+            
+            # Step 1: Engineer features for the new partitions only
+            frames = []
+            for path in new_accepted_paths:
+                self.memory_plan = partition_plans[path]
+                df_part = self.load_and_engineer_features(accepted_path=path, rejected_path=None)
+                if df_part is None:
+                    raise Exception(f"Failed to load new partition {path}")
+                frames.append(df_part)
+            df = pd.concat(frames, ignore_index=True)
+            
+            # Step 2: Preprocess with frozen encoders and refreshed statistics
+            X, y = self.apply_fitted_preprocessing(df)
+            X_train, X_val, y_train, y_val = train_test_split(
+                X, y, test_size=0.2, random_state=42, stratify=y
+            )
+            X_train, y_train = self.handle_class_imbalance(X_train, y_train)
+            
+            # The scaler stays frozen: the existing trees split on its output space
+            X_train_scaled = self.scaler.transform(X_train)
+            X_val_scaled = self.scaler.transform(X_val)
+            if self.compact_dtypes:
+                X_train_scaled = X_train_scaled.astype(np.float32, copy=False)
+                X_val_scaled = X_val_scaled.astype(np.float32, copy=False)
+            
+            # Holdout slice (never seen by the continued members) for relearning ensemble weights
+            X_blend, y_blend = None, None
+            if self.ensemble_weighting != 'uniform':
+                X_train_scaled, X_blend, y_train, y_blend = train_test_split(
+                    X_train_scaled, y_train, test_size=self.ensemble_holdout_fraction,
+                    random_state=42, stratify=y_train
+                )
+            
+            # Step 3: Continue boosting / grow the forest from the existing members
+            print("\n🚀 CONTINUING ENSEMBLE MEMBERS")
+            print("="*80)
+            cores = self.scheduler.total_cores
+            members = {
+                'XGBoost': continue_xgboost(previous_models['XGBoost'], X_train_scaled, y_train,
+                                            boosting_rounds, cores),
+                'LightGBM': continue_lightgbm(previous_models['LightGBM'], X_train_scaled, y_train,
+                                              boosting_rounds, cores),
+                'RandomForest': extend_random_forest(previous_models['RandomForest'], X_train_scaled, y_train,
+                                                     forest_trees, cores),
+            }
+            members['VotingEnsemble'] = reassemble_voting_ensemble(previous_models['VotingEnsemble'], members,
+                                                                   X_blend, y_blend, self.ensemble_weighting)
+            weights = members['VotingEnsemble'].weights or [1.0, 1.0, 1.0]
+            print(f"   ✅ +{boosting_rounds} boosting rounds, +{forest_trees} forest trees, "
+                  f"{self.ensemble_weighting} weighting {np.round(weights, 3).tolist()}")
+            
+            # Step 4: Evaluate on the new quarter's held-out rows
+            self.models = members
+            self.X_test_scaled = X_val_scaled
+            self.y_test = y_val
+            self.comprehensive_evaluation()
+            # The rebuilt voting ensemble is gated and saved, not the model that scored best on these
+            # rows: selecting by validation AUC and then gating on the same rows would favour the candidate
+            self.ensemble_model = members['VotingEnsemble']
+            
+            # Step 5: Validation gate against the previous model
+            gate = validation_gate(previous_model, self.ensemble_model, X_val_scaled, y_val, gate_tolerance)
+            print(f"\n🚦 VALIDATION GATE: previous AUC {gate['previous_auc']:.4f} → "
+                  f"candidate AUC {gate['candidate_auc']:.4f}")
+            
+            if not gate['accepted']:
+                print("   ❌ Candidate rejected - previous model artifacts left untouched")
+                self.models = previous_models
+                self.ensemble_model = previous_model
+                return None, None
+            
+            print("   ✅ Candidate accepted")
+            
+            # The fast tier and the calibration tables must follow the updated ensemble
+            self.distill_student(X_train_scaled)
+            self.calibrate_probabilities()
+            self.build_drift_reference(X)
+            self.run_info = {
+                'training_mode': 'incremental',
+                'incremental_partitions': list(new_accepted_paths),
+                'validation_gate': gate
+            }
+            model_location, best_model_name = self.save_sophisticated_model(len(df))
+            print(f"🕐 End time: {datetime.now()}")
+            return model_location, best_model_name
+            
+        except Exception as e:
+            print(f"\n❌ Error during incremental training: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return None, None
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sophisticated MSME survival model training")
+    parser.add_argument('--incremental', nargs='+', metavar='ACCEPTED_CSV',
+                        help="warm-start the saved ensemble on new accepted-loan partitions")
+    parser.add_argument('--boosting-rounds', type=int, default=100,
+                        help="extra XGBoost/LightGBM rounds in incremental mode")
+    parser.add_argument('--forest-trees', type=int, default=50,
+                        help="extra Random Forest trees in incremental mode")
+    parser.add_argument('--accepted', default='data/accepted_2007_to_2018Q4.csv',
+                        help="accepted loans CSV for a full training run")
+    parser.add_argument('--rejected', default='data/rejected_2007_to_2018Q4.csv',
+                        help="rejected applications CSV for a full training run")
+    parser.add_argument('--checkpoint-dir',
+                        help="write content-hashed stage checkpoints here and skip unchanged stages")
+    parser.add_argument('--resume-from', choices=TRAINING_STAGES,
+                        help="reuse checkpoints of earlier stages and recompute from this stage on")
+    parser.add_argument('--memory-budget-gb', type=float,
+                        help="fit training into this budget (chunked reads, float32, row sampling)")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="record per-stage peak RSS and tracemalloc top allocators")
+    parser.add_argument('--compact-dtypes', action='store_true',
+                        help="int8 flags, float32 ratios and float32 model matrices (reports savings)")
+    parser.add_argument('--ensemble-weighting', choices=ENSEMBLE_WEIGHTINGS, default='uniform',
+                        help="combine the tuned members with uniform, holdout-AUC or stacked weights")
+    parser.add_argument('--rejected-sampling', choices=REJECTED_SAMPLING, default='uniform',
+                        help="reservoir-sample rejected applications uniformly or stratified by year")
+    parser.add_argument('--cpu-cores', type=int,
+                        help="global core budget shared by the searches and estimator threads (default: all)")
+    parser.add_argument('--metrics-only', action='store_true',
+                        help="skip visualizations (matplotlib/seaborn are never imported)")
+    parser.add_argument('--viz-dpi', type=int, default=300, help="resolution of the saved figures")
+    parser.add_argument('--background-viz', action='store_true',
+                        help="render figures in a background process while the run finishes")
+    parser.add_argument('--student-trees', type=int, default=STUDENT_TREES,
+                        help="trees in the distilled fast-tier student")
+    parser.add_argument('--student-leaves', type=int, default=STUDENT_LEAVES,
+                        help="leaves per tree of the distilled fast-tier student")
+    parser.add_argument('--calibration', choices=CALIBRATION_METHODS, default='isotonic',
+                        help="calibration fitted on held-out predictions and served as a lookup table")
+    parser.add_argument('--yes', action='store_true', help="start training without the confirmation prompt")
+    args = parser.parse_args()
+    
+    if args.incremental:
+        predictor = SophisticatedMSMEPredictor(memory_budget_gb=args.memory_budget_gb,
+                                               compact_dtypes=args.compact_dtypes,
+                                               cpu_cores=args.cpu_cores,
+                                               student_trees=args.student_trees,
+                                               student_leaves=args.student_leaves,
+                                               calibration_method=args.calibration)
+        model_location, best_model = predictor.run_incremental_training(
+            args.incremental, boosting_rounds=args.boosting_rounds, forest_trees=args.forest_trees
+        )
+        if model_location and best_model:
+            print(f"\n🎊 SUCCESS! Updated model saved in: {model_location}")
+        raise SystemExit(0 if model_location else 1)
+    
     print("🚀 SOPHISTICATED MSME SURVIVAL PREDICTION MODEL")
     print("=" * 60)
     print("🎯 Enterprise-Grade Machine Learning Pipeline")
@@ -873,11 +1516,25 @@ if __name__ == "__main__":
     print("⏱️  Expected time: 30-60 minutes")
     print()
     
-    response = input("Start sophisticated training? (y/n): ")
+    response = 'y' if args.yes else input("Start sophisticated training? (y/n): ")
     if response.lower() == 'y':
         print("\n🔥 Starting sophisticated enterprise training...")
-        predictor = SophisticatedMSMEPredictor()
-        model_location, best_model = predictor.run_sophisticated_training()
+        predictor = SophisticatedMSMEPredictor(memory_budget_gb=args.memory_budget_gb,
+                                               profile_memory=args.profile_memory,
+                                               compact_dtypes=args.compact_dtypes,
+                                               ensemble_weighting=args.ensemble_weighting,
+                                               cpu_cores=args.cpu_cores,
+                                               rejected_sampling=args.rejected_sampling,
+                                               metrics_only=args.metrics_only,
+                                               visualization_dpi=args.viz_dpi,
+                                               background_visualizations=args.background_viz,
+                                               student_trees=args.student_trees,
+                                               student_leaves=args.student_leaves,
+                                               calibration_method=args.calibration)
+        model_location, best_model = predictor.run_sophisticated_training(
+            accepted_path=args.accepted, rejected_path=args.rejected,
+            checkpoint_dir=args.checkpoint_dir, resume_from=args.resume_from
+        )
         
         if model_location and best_model:
             print(f"\n🎊 SUCCESS! Model saved as: sophisticated_ensemble_model.pkl")